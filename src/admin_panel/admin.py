@@ -12,6 +12,7 @@ from .models import (
     PostImage,
     PostVideo,
     PromoCode,
+    RewriteBatch,
     Subscription,
     Tariff,
     TariffPeriod,
@@ -116,6 +117,14 @@ class PostAdmin(admin.ModelAdmin):
     inlines: ClassVar[list[admin.TabularInline]] = [PostImageInline, PostVideoInline]
 
 
+@admin.register(RewriteBatch)
+class RewriteBatchAdmin(admin.ModelAdmin):
+    list_display = ("openai_batch_id", "flow", "status", "created_at", "completed_at")
+    list_filter = ("status", "created_at")
+    search_fields = ("openai_batch_id", "flow__name")
+    readonly_fields = ("created_at", "completed_at")
+
+
 @admin.register(Draft)
 class DraftAdmin(admin.ModelAdmin):
     list_display = ("user", "post", "created_at")
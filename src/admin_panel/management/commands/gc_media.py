@@ -0,0 +1,82 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from admin_panel.models import PostImage, PostVideo, RewriteBatch, TelegramMediaFile
+
+
+class Command(BaseCommand):
+    help = "Delete stored post media that no post references"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--min-age",
+            type=float,
+            default=24,
+            help="Keep files modified within this many hours (default: 24)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report what would be deleted",
+        )
+
+    def handle(self, *args, **options):
+        # A file's references are the PostImage/PostVideo rows pointing at it.
+        referenced = {
+            os.path.normpath(path.lstrip("/"))
+            for path in [
+                *PostImage.objects.exclude(image="").values_list("image", flat=True),
+                *PostVideo.objects.exclude(video="").values_list("video", flat=True),
+            ]
+        }
+        # Files are stored before their post's rows are created, so recent
+        # ones may just not be referenced yet.
+        cutoff = time.time() - options["min_age"] * 3600
+
+        # Staged downloads are only stored once their post is created; the
+        # ones of posts waiting in a pending rewrite batch must stay.
+        staged = {
+            os.path.abspath(media["url"])
+            for posts in RewriteBatch.objects.filter(
+                status=RewriteBatch.PENDING
+            ).values_list("posts", flat=True)
+            for post in posts
+            for media in [*post.get("images", []), *post.get("videos", [])]
+            if media.get("url")
+        }
+
+        removed, freed = [], 0
+        fields = (PostImage._meta.get_field("image"), PostVideo._meta.get_field("video"))
+        roots = [os.path.join(settings.MEDIA_ROOT, field.upload_to) for field in fields]
+        for root in [*roots, settings.MEDIA_STAGING_DIR]:
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    full_path = os.path.join(dirpath, filename)
+                    path = os.path.relpath(full_path, settings.MEDIA_ROOT)
+                    if path in referenced or os.path.abspath(full_path) in staged:
+                        continue
+                    try:
+                        stat = os.stat(full_path)
+                        if stat.st_mtime > cutoff:
+                            continue
+                        if not options["dry_run"]:
+                            os.remove(full_path)
+                    except FileNotFoundError:
+                        continue
+                    removed.append(path)
+                    freed += stat.st_size
+
+        if not options["dry_run"]:
+            for i in range(0, len(removed), 500):
+                TelegramMediaFile.objects.filter(path__in=removed[i : i + 500]).delete()
+
+        verb = "Would delete" if options["dry_run"] else "Deleted"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {len(removed)} unreferenced files "
+                f"({freed / 1024 / 1024:.1f} MB), {len(referenced)} files in use"
+            )
+        )
@@ -0,0 +1,18 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admin_panel", "0009_normalize_tariff_codes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="flow",
+            name="generation_lease_until",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Генерація виконується до"
+            ),
+        ),
+    ]
@@ -0,0 +1,84 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admin_panel", "0010_flow_generation_lease_until"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RewriteBatch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "openai_batch_id",
+                    models.CharField(
+                        max_length=255, unique=True, verbose_name="ID batch в OpenAI"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Очікує"),
+                            ("completed", "Завершено"),
+                            ("failed", "Помилка"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "requests",
+                    models.JSONField(default=dict, verbose_name="Запити на обробку"),
+                ),
+                (
+                    "posts",
+                    models.JSONField(default=list, verbose_name="Пости, що очікують"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата створення"
+                    ),
+                ),
+                (
+                    "completed_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Дата завершення"
+                    ),
+                ),
+                (
+                    "flow",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="rewrite_batches",
+                        to="admin_panel.flow",
+                        verbose_name="Флоу",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Пакетна обробка AI",
+                "verbose_name_plural": "Пакетні обробки AI",
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_at"],
+                        name="admin_panel_status_a9ea49_idx",
+                    )
+                ],
+            },
+        ),
+    ]
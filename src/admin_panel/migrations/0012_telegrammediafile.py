@@ -0,0 +1,51 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("admin_panel", "0011_rewritebatch"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TelegramMediaFile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "path",
+                    models.CharField(
+                        max_length=500, unique=True, verbose_name="Шлях до файлу"
+                    ),
+                ),
+                (
+                    "media_type",
+                    models.CharField(
+                        choices=[("image", "Зображення"), ("video", "Вiдео")],
+                        max_length=10,
+                        verbose_name="Тип медіа",
+                    ),
+                ),
+                (
+                    "file_id",
+                    models.CharField(max_length=255, verbose_name="Telegram file_id"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Дата оновлення"),
+                ),
+            ],
+            options={
+                "verbose_name": "Файл у Telegram",
+                "verbose_name_plural": "Файли у Telegram",
+            },
+        ),
+    ]
@@ -126,6 +126,9 @@ class Flow(models.Model):
     last_generated_at = models.DateTimeField(
         null=True, blank=True, verbose_name="Остання генерація"
     )
+    generation_lease_until = models.DateTimeField(
+        null=True, blank=True, verbose_name="Генерація виконується до"
+    )
 
     class Meta:
         verbose_name = "Флоу"
@@ -183,6 +186,30 @@ class PostVideo(models.Model):
         return f"Вiдео для поста {self.post.id}"
 
 
+class TelegramMediaFile(models.Model):
+    IMAGE: ClassVar[str] = "image"
+    VIDEO: ClassVar[str] = "video"
+
+    MEDIA_TYPE_CHOICES: ClassVar[list[tuple[str, str]]] = [
+        (IMAGE, "Зображення"),
+        (VIDEO, "Вiдео"),
+    ]
+
+    path = models.CharField(max_length=500, unique=True, verbose_name="Шлях до файлу")
+    media_type = models.CharField(
+        max_length=10, choices=MEDIA_TYPE_CHOICES, verbose_name="Тип медіа"
+    )
+    file_id = models.CharField(max_length=255, verbose_name="Telegram file_id")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата оновлення")
+
+    class Meta:
+        verbose_name = "Файл у Telegram"
+        verbose_name_plural = "Файли у Telegram"
+
+    def __str__(self):
+        return self.path
+
+
 class Post(models.Model):
     DRAFT: ClassVar[str] = "draft"
     SCHEDULED: ClassVar[str] = "scheduled"
@@ -259,6 +286,47 @@ class Post(models.Model):
         return list(self.images.all())
 
 
+class RewriteBatch(models.Model):
+    PENDING: ClassVar[str] = "pending"
+    COMPLETED: ClassVar[str] = "completed"
+    FAILED: ClassVar[str] = "failed"
+
+    STATUS_CHOICES: ClassVar[list[tuple[str, str]]] = [
+        (PENDING, "Очікує"),
+        (COMPLETED, "Завершено"),
+        (FAILED, "Помилка"),
+    ]
+
+    flow = models.ForeignKey(
+        Flow,
+        on_delete=models.CASCADE,
+        related_name="rewrite_batches",
+        verbose_name="Флоу",
+    )
+    openai_batch_id = models.CharField(
+        max_length=255, unique=True, verbose_name="ID batch в OpenAI"
+    )
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=PENDING, verbose_name="Статус"
+    )
+    requests = models.JSONField(default=dict, verbose_name="Запити на обробку")
+    posts = models.JSONField(default=list, verbose_name="Пости, що очікують")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата створення")
+    completed_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Дата завершення"
+    )
+
+    class Meta:
+        verbose_name = "Пакетна обробка AI"
+        verbose_name_plural = "Пакетні обробки AI"
+        indexes: ClassVar[list[models.Index]] = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"Batch {self.openai_batch_id} ({self.get_status_display()})"
+
+
 class Draft(models.Model):
     user = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name="drafts", verbose_name="Користувач"
@@ -1,5 +1,7 @@
 import logging
 import os
+from collections.abc import Callable
+from typing import Any
 
 from aiogram import Bot
 from aiogram.client.session.aiohttp import AiohttpSession
@@ -34,20 +36,79 @@ from bot.services import (
     WebScraperService,
     WebService,
 )
+from bot.services.content_processing.llm_cache_service import LLMCacheService
+from bot.services.content_processing.openai_client import create_openai_client
+from bot.services.content_processing.rate_limiter import OpenAIRateLimiter
+from bot.services.content_processing.rewrite_batcher import RewriteBatcher
+from bot.services.flow_executor import FlowExecutor
 from bot.services.limit_service import LimitService
+from bot.services.media_service import MediaService
+from bot.services.post.batch_rewrite import BatchRewriteService
+from bot.services.telegram_media_cache import TelegramMediaCache
+from bot.services.web.page_cache_service import PageCacheService
 from bot.services.web.rss_url_manager import RssUrlManager
 
+# Closable singletons built in this process; shutdown closes only these.
+_started: dict[str, Any] = {}
+
+
+def _tracked(name: str, factory: Callable[..., Any]) -> Callable[..., Any]:
+    def build(*args, **kwargs):
+        instance = factory(*args, **kwargs)
+        _started[name] = instance
+        return instance
+
+    return build
+
 
 class Container(containers.DeclarativeContainer):
     wiring_config = containers.WiringConfiguration(
         modules=["bot.handlers", "bot.dialogs", "bot.services.post.post_service"]
     )
 
-    session = providers.Singleton(AiohttpSession)
+    session = providers.Singleton(_tracked("session", AiohttpSession))
     bot = providers.Singleton(
         Bot, token=os.getenv("TELEGRAM_BOT_TOKEN"), session=session
     )
 
+    openai_client = providers.Singleton(
+        _tracked("openai_client", create_openai_client),
+        api_key=os.getenv("OPENAI_API_KEY"),
+        base_url=os.getenv("OPENAI_BASE_URL"),
+        timeout=float(os.getenv("OPENAI_TIMEOUT", "30")),
+        max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "20")),
+        max_keepalive_connections=int(
+            os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "10")
+        ),
+        keepalive_expiry=float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60")),
+    )
+
+    llm_cache_service = providers.Singleton(
+        LLMCacheService,
+        cache_path=os.getenv("LLM_CACHE_PATH", "cache/llm_cache.sqlite3"),
+        ttl=float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 3600))),
+        max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000")),
+        logger=providers.Singleton(logging.getLogger, "llm_cache"),
+    )
+
+    openai_rate_limiter = providers.Singleton(
+        OpenAIRateLimiter,
+        state_path=os.getenv(
+            "OPENAI_RATE_LIMIT_PATH", "cache/openai_rate_limit.sqlite3"
+        ),
+        requests_per_minute=int(os.getenv("OPENAI_RPM", "500")),
+        tokens_per_minute=int(os.getenv("OPENAI_TPM", "200000")),
+        max_in_flight=int(os.getenv("OPENAI_MAX_IN_FLIGHT", "8")),
+        logger=providers.Singleton(logging.getLogger, "openai_rate_limiter"),
+    )
+
+    rewrite_batcher = providers.Singleton(
+        RewriteBatcher,
+        max_batch_size=int(os.getenv("OPENAI_BATCH_SIZE", "1")),
+        max_wait=float(os.getenv("OPENAI_BATCH_WAIT", "0.2")),
+        logger=providers.Singleton(logging.getLogger, "rewrite_batcher"),
+    )
+
     user_repository = providers.Factory(UserRepository)
     channel_repository = providers.Factory(ChannelRepository)
     flow_repository = providers.Factory(FlowRepository)
@@ -79,17 +140,6 @@ class Container(containers.DeclarativeContainer):
         subscription_service=subscription_service,
     )
 
-    userbot_service = providers.Singleton(
-        EnhancedUserbotService,
-        aisettings_service=ai_settings_service,
-        user_service=user_service,
-        bot=bot,
-        api_id=os.getenv("USERBOT_API_ID"),
-        api_hash=os.getenv("USERBOT_API_HASH"),
-        phone=os.getenv("TELEGRAM_PHONE"),
-        openai_key=os.getenv("OPENAI_API_KEY"),
-        logger=providers.Singleton(logging.getLogger, "userbot_service"),
-    )
     limit_service = providers.Factory(
         LimitService,
         logger=providers.Singleton(logging.getLogger, "limit_service"),
@@ -117,6 +167,21 @@ class Container(containers.DeclarativeContainer):
         channel_repository=channel_repository,
     )
 
+    userbot_service = providers.Singleton(
+        _tracked("userbot_service", EnhancedUserbotService),
+        aisettings_service=ai_settings_service,
+        user_service=user_service,
+        bot=bot,
+        api_id=os.getenv("USERBOT_API_ID"),
+        api_hash=os.getenv("USERBOT_API_HASH"),
+        phone=os.getenv("TELEGRAM_PHONE"),
+        openai_client=openai_client,
+        llm_cache=llm_cache_service,
+        rate_limiter=openai_rate_limiter,
+        batcher=rewrite_batcher,
+        logger=providers.Singleton(logging.getLogger, "userbot_service"),
+    )
+
     rss_url_manager = providers.Factory(
         RssUrlManager, rss_service=rss_service_factory, flow_service=flow_service
     )
@@ -125,17 +190,25 @@ class Container(containers.DeclarativeContainer):
         logger=providers.Singleton(logging.getLogger, "cloudflare_bypass"),
     )
 
+    image_extractor_service = providers.Factory(
+        ImageExtractorService,
+        logger=providers.Singleton(logging.getLogger, "image_extractor"),
+    )
+
+    page_cache_service = providers.Singleton(
+        PageCacheService,
+        cache_path=os.getenv("PAGE_CACHE_PATH", "cache/page_cache.sqlite3"),
+        logger=providers.Singleton(logging.getLogger, "page_cache"),
+    )
+
     web_scraper_service = providers.Factory(
         WebScraperService,
         cf_bypass=cloudflare_bypass,
+        image_extractor=image_extractor_service,
+        page_cache=page_cache_service,
         logger=providers.Singleton(logging.getLogger, "web_scraper"),
     )
 
-    image_extractor_service = providers.Factory(
-        ImageExtractorService,
-        logger=providers.Singleton(logging.getLogger, "image_extractor"),
-    )
-
     post_builder_service = providers.Factory(
         PostBuilderService,
         logger=providers.Singleton(logging.getLogger, "post_builder"),
@@ -144,7 +217,10 @@ class Container(containers.DeclarativeContainer):
     content_processor_service = providers.Factory(
         ContentProcessorService,
         aisettings_service=ai_settings_service,
-        openai_key=os.getenv("OPENAI_API_KEY"),
+        openai_client=openai_client,
+        llm_cache=llm_cache_service,
+        rate_limiter=openai_rate_limiter,
+        batcher=rewrite_batcher,
         logger=providers.Singleton(logging.getLogger, "content_processor"),
     )
 
@@ -162,6 +238,30 @@ class Container(containers.DeclarativeContainer):
         logger=providers.Singleton(logging.getLogger, "web_service"),
     )
 
+    batch_rewrite_service = providers.Factory(
+        BatchRewriteService,
+        aisettings_service=ai_settings_service,
+        client=openai_client,
+        llm_cache=llm_cache_service,
+        rate_limiter=openai_rate_limiter,
+        enabled=os.getenv("OPENAI_BATCH_API", "0") == "1",
+        logger=providers.Singleton(logging.getLogger, "batch_rewrite"),
+    )
+
+    media_service = providers.Singleton(
+        _tracked("media_service", MediaService),
+        max_download_size=int(
+            os.getenv("MEDIA_MAX_DOWNLOAD_SIZE", str(50 * 1024 * 1024))
+        ),
+        max_concurrent_downloads=int(os.getenv("MEDIA_DOWNLOAD_CONCURRENCY", "4")),
+        logger=providers.Singleton(logging.getLogger, "media_service"),
+    )
+
+    telegram_media_cache = providers.Singleton(
+        TelegramMediaCache,
+        logger=providers.Singleton(logging.getLogger, "telegram_media_cache"),
+    )
+
     post_service = providers.Factory(
         PostService,
         post_repository=post_repository,
@@ -169,6 +269,9 @@ class Container(containers.DeclarativeContainer):
         bot=bot,
         userbot_service=userbot_service,
         web_service=web_service,
+        batch_rewrite_service=batch_rewrite_service,
+        media_cache=telegram_media_cache,
+        media_service=media_service,
     )
 
     payment_service = providers.Factory(
@@ -190,10 +293,21 @@ class Container(containers.DeclarativeContainer):
         logger=providers.Singleton(logging.getLogger, "statistics_service"),
     )
 
+    flow_executor = providers.Factory(
+        FlowExecutor,
+        max_concurrency=int(os.getenv("FLOW_CONCURRENCY", "3")),
+        per_user_limit=int(os.getenv("FLOW_CONCURRENCY_PER_USER", "1")),
+        flow_timeout=float(os.getenv("FLOW_TIMEOUT", "900")),
+        logger=providers.Singleton(logging.getLogger, "flow_executor"),
+    )
+
     @staticmethod
     async def shutdown_resources():
-        container = Container()
-        if container.session.provided:
-            await container.session().close()
-        if container.userbot_service.provided:
-            await container.userbot_service().stop()
+        if userbot_service := _started.get("userbot_service"):
+            await userbot_service.stop()
+        if session := _started.get("session"):
+            await session.close()
+        if media_service := _started.get("media_service"):
+            await media_service.close()
+        if client := _started.get("openai_client"):
+            await client.close()
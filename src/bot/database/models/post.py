@@ -88,6 +88,33 @@ class PostDTO(BaseModel):
             created_at=datetime.now(),
         )
 
+    @classmethod
+    def from_prefetched(cls, obj: Any) -> "PostDTO":
+        """
+        Build the DTO from a Post whose images and videos were prefetched in
+        order (see PostRepository.list), without further queries.
+        """
+        images = [
+            PostImageDTO(url=str(img.image) if img.image else img.url, order=img.order)
+            for img in obj.images.all()
+        ]
+        videos = [
+            PostVideoDTO(url=str(video.video), order=video.order)
+            for video in obj.videos.all()
+        ]
+
+        data = {
+            field: getattr(obj, field, None)
+            for field in cls.model_fields
+            if field not in ("images", "videos", "media_type")
+        }
+        data["images"] = images
+        data["videos"] = videos
+        data["media_type"] = (
+            MediaType.VIDEO if videos else MediaType.IMAGE if images else None
+        )
+        return cls.model_validate(data, from_attributes=True)
+
     @classmethod
     async def from_orm_async(cls, obj: Any) -> "PostDTO":
         data = {}
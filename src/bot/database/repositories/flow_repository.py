@@ -3,7 +3,8 @@ import operator
 from datetime import datetime
 from functools import reduce
 
-from django.db import models
+from asgiref.sync import sync_to_async
+from django.db import models, transaction
 
 from admin_panel.models import Flow
 from bot.database.exceptions import FlowNotFoundError
@@ -68,17 +69,107 @@ class FlowRepository:
         except Flow.DoesNotExist as e:
             raise FlowNotFoundError(f"No flow found for channel {channel_id}") from e
 
+    async def claim_due_flows(
+        self, now: datetime, lease_until: datetime
+    ) -> list[FlowDTO]:
+        """
+        Lease every due flow that no one else is generating.
+
+        Rows locked by a concurrent claim are skipped, so several workers
+        split the due flows between them instead of generating one twice.
+        """
+
+        @sync_to_async
+        def _claim_in_transaction():
+            with transaction.atomic():
+                flows = list(
+                    Flow.objects.select_for_update(skip_locked=True, of=("self",))
+                    .select_related("channel")
+                    .filter(
+                        models.Q(next_generation_time__lte=now)
+                        | models.Q(next_generation_time__isnull=True)
+                    )
+                    .filter(self._lease_free(now))
+                    .order_by(models.F("next_generation_time").asc(nulls_first=True))
+                )
+                Flow.objects.filter(id__in=[flow.id for flow in flows]).update(
+                    generation_lease_until=lease_until
+                )
+                return flows
+
+        return [self._to_dto(flow) for flow in await _claim_in_transaction()]
+
+    async def acquire_generation_lease(
+        self, flow_id: int, now: datetime, lease_until: datetime
+    ) -> bool:
+        updated = await Flow.objects.filter(
+            self._lease_free(now), id=flow_id
+        ).aupdate(generation_lease_until=lease_until)
+        return updated == 1
+
+    async def extend_generation_lease(self, flow_id: int, lease_until: datetime):
+        await Flow.objects.filter(
+            id=flow_id, generation_lease_until__isnull=False
+        ).aupdate(generation_lease_until=lease_until)
+
+    async def release_generation_lease(self, flow_id: int):
+        await Flow.objects.filter(id=flow_id).aupdate(generation_lease_until=None)
+
+    @staticmethod
+    def _lease_free(now: datetime) -> models.Q:
+        return models.Q(generation_lease_until__isnull=True) | models.Q(
+            generation_lease_until__lte=now
+        )
+
+    async def get_owner_ids(self, flow_ids: list[int]) -> dict[int, int]:
+        return {
+            flow_id: user_id
+            async for flow_id, user_id in Flow.objects.filter(
+                id__in=flow_ids
+            ).values_list("id", "channel__user_id")
+        }
+
     async def get_flows_by_channel_id(self, channel_id: int) -> list[Flow]:
         return await Flow.objects.filter(channel_id=channel_id).first()
 
     async def update_flow(self, flow: Flow) -> Flow:
+        # The generation lease is owned by the lease queries; an instance
+        # loaded before a run started must not write it back.
+        fields = [
+            field.name
+            for field in Flow._meta.concrete_fields
+            if not field.primary_key and field.name != "generation_lease_until"
+        ]
         try:
-            await flow.asave()
+            await flow.asave(update_fields=fields)
             return flow
         except Exception as e:
             logging.error(f"Error saving flow {flow.id}: {e}")
             raise
 
+    async def update_source_fields(
+        self, flow_id: int, link: str, fields: dict
+    ) -> None:
+        """
+        Merge fields into the matching Flow.sources entry under a row lock,
+        so concurrent source fetches don't overwrite each other's updates.
+        """
+
+        @sync_to_async
+        def _update_in_transaction():
+            with transaction.atomic():
+                flow = Flow.objects.select_for_update().get(id=flow_id)
+                flow.sources = [
+                    {**source, **fields} if source.get("link") == link else source
+                    for source in flow.sources
+                ]
+                flow.save(update_fields=["sources", "updated_at"])
+
+        try:
+            await _update_in_transaction()
+        except Flow.DoesNotExist as e:
+            raise FlowNotFoundError(f"No flow found with id {flow_id}") from e
+
     async def delete_flow(self, flow: Flow):
         await flow.adelete()
 
@@ -1,9 +1,10 @@
 import logging
 from datetime import datetime
 
+from django.db.models import Prefetch
 from django.utils import timezone
 
-from admin_panel.models import Post
+from admin_panel.models import Post, PostImage, PostVideo
 from bot.database.exceptions import PostNotFoundError
 from bot.database.models import MediaType
 from bot.database.models.post import PostStatus
@@ -54,10 +55,14 @@ class PostRepository:
         if scheduled_before:
             query = query.filter(scheduled_time__lte=scheduled_before)
 
+        # One query for the page plus one each for its images and videos.
         return [
             post
             async for post in query.select_related("flow")
-            .prefetch_related("images")
+            .prefetch_related(
+                Prefetch("images", queryset=PostImage.objects.order_by("order")),
+                Prefetch("videos", queryset=PostVideo.objects.order_by("order")),
+            )
             .order_by("-original_date", "-created_at")[offset : offset + limit]
         ]
 
@@ -17,6 +17,7 @@ from aiogram_dialog.widgets.link_preview import LinkPreview
 from aiogram_dialog.widgets.media import DynamicMedia
 from aiogram_dialog.widgets.text import Const, Format
 
+from bot.containers import Container
 from bot.dialogs.buffer.getters import (
     edit_post_getter,
     edit_schedule_getter,
@@ -151,7 +152,9 @@ def create_buffer_dialog():
     ):
         data = await paging_getter(manager)
         if data["post"].get("is_selected") and data["post"].get("is_album"):
-            await send_media_album(manager, data["post"])
+            await send_media_album(
+                manager, data["post"], Container.telegram_media_cache()
+            )
 
     return Dialog(
         Window(
@@ -9,6 +9,8 @@ from aiogram.types import FSInputFile, InputMediaPhoto, Message
 from aiogram_dialog import DialogManager
 from django.conf import settings
 
+from bot.services.telegram_media_cache import TelegramMediaCache
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,7 +30,9 @@ async def safe_delete_messages(bot, chat_id: int, message_ids: Sequence[int]) ->
 
 
 async def send_media_album(
-    dialog_manager: DialogManager, post_data: dict[str, Any]
+    dialog_manager: DialogManager,
+    post_data: dict[str, Any],
+    media_cache: TelegramMediaCache,
 ) -> Message:
     from aiogram.fsm.context import FSMContext
 
@@ -84,7 +88,7 @@ async def send_media_album(
                 exc_info=True,
             )
 
-        new_messages = await bot.send_media_group(chat_id=chat_id, media=media_group)
+        new_messages = await media_cache.send_media_group(bot, chat_id, media_group)
         message_ids = [m.message_id for m in new_messages]
         logger.info(f"📤 Sent media group, got {len(message_ids)} message IDs: {message_ids}")
 
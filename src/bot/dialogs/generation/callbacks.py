@@ -14,6 +14,7 @@ from bot.dialogs.generation.add_channel.states import AddChannelMenu
 from bot.dialogs.generation.create_flow.states import CreateFlowMenu
 from bot.dialogs.generation.flow.states import FlowMenu
 from bot.dialogs.generation.states import GenerationMenu
+from bot.generator_worker import EXIT_BUSY
 
 logger = logging.getLogger(__name__)
 
@@ -208,6 +209,15 @@ async def show_generated_posts(
 
         logger.info(f"Generation process finished with returncode: {process.returncode}")
 
+        if process.returncode == EXIT_BUSY:
+            # The worker has already told the user the flow is being generated.
+            logger.info(f"Flow {flow_id} is already being generated")
+            try:
+                await bot.delete_message(chat_id, status_msg_id)
+            except Exception as e:
+                logger.debug(f"Could not delete status message {status_msg_id}: {e}")
+            return
+
         if process.returncode != 0:
             logger.warning(f"Generation failed with returncode {process.returncode}, deleting status message")
             try:
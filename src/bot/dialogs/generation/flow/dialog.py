@@ -16,6 +16,7 @@ from aiogram_dialog.widgets.link_preview import LinkPreview
 from aiogram_dialog.widgets.media import DynamicMedia
 from aiogram_dialog.widgets.text import Const, Format
 
+from bot.containers import Container
 from bot.dialogs.generation.flow.states import FlowMenu
 from bot.utils.calendar import UkrainianCalendar
 from bot.utils.constants.buttons import BACK_BUTTON
@@ -134,7 +135,9 @@ def flow_dialog() -> Dialog:
     ):
         data = await paging_getter(manager)
         if data["post"].get("is_album"):
-            await send_media_album(manager, data["post"])
+            await send_media_album(
+                manager, data["post"], Container.telegram_media_cache()
+            )
             return
 
     return Dialog(
@@ -102,9 +102,13 @@ def build_post_dict(post: Any, idx: int) -> dict[str, Any]:
     return post_dict
 
 
-async def load_raw_posts(flow_id: int, status: PostStatus) -> list[Any]:
+async def load_raw_posts(
+    flow_id: int, status: PostStatus, limit: int = 100
+) -> list[Any]:
     post_service = Container.post_service()
-    raw_posts = await post_service.get_all_posts_in_flow(flow_id, status=status)
+    raw_posts = await post_service.get_all_posts_in_flow(
+        flow_id, status=status, limit=limit
+    )
     if not isinstance(raw_posts, list | tuple):
         try:
             raw_posts = await sync_to_async(list)(raw_posts)
@@ -114,8 +118,10 @@ async def load_raw_posts(flow_id: int, status: PostStatus) -> list[Any]:
     return raw_posts
 
 
-async def build_posts_list(flow_id: int, status: PostStatus) -> list[dict[str, Any]]:
-    raw_posts = await load_raw_posts(flow_id, status)
+async def build_posts_list(
+    flow_id: int, status: PostStatus, limit: int = 100
+) -> list[dict[str, Any]]:
+    raw_posts = await load_raw_posts(flow_id, status, limit)
     posts: list[dict[str, Any]] = []
     for idx, post in enumerate(raw_posts):
         try:
@@ -165,16 +171,16 @@ async def paging_getter(dialog_manager: DialogManager, **kwargs) -> dict[str, An
 
     if dialog_data.pop("needs_refresh", False) or "all_posts" not in dialog_data:
         try:
-            # Load ALL draft posts
-            all_posts = await build_posts_list(flow.id, status=PostStatus.DRAFT)
             # Show only last flow_volume posts (newest first)
             max_posts = flow.flow_volume if hasattr(flow, 'flow_volume') else 10
-            posts = all_posts[:max_posts]  # Already sorted by newest first
+            posts = await build_posts_list(
+                flow.id, status=PostStatus.DRAFT, limit=max_posts
+            )
 
             dialog_manager.dialog_data["all_posts"] = posts
             dialog_manager.dialog_data["total_posts"] = len(posts)
 
-            logger.info(f"Loaded {len(all_posts)} total drafts, showing {len(posts)} (limit={max_posts})")
+            logger.info(f"Loaded {len(posts)} drafts (limit={max_posts})")
         except Exception as e:
             logger.error("Помилка завантаження постів: %s", e, exc_info=True)
             return data
@@ -203,7 +209,9 @@ async def paging_getter(dialog_manager: DialogManager, **kwargs) -> dict[str, An
             dialog_manager.dialog_data["message_ids"] = []
 
         if data["post"].get("is_album"):
-            await send_media_album(dialog_manager, data["post"])
+            await send_media_album(
+                dialog_manager, data["post"], Container.telegram_media_cache()
+            )
             return data
 
         if not post.get("is_album"):
@@ -16,17 +16,34 @@ from bot.services.logger_service import init_logger
 from bot.services.post import PostService
 from bot.utils.notifications import send_telegram_notification
 
+# Exit code when another generation of the flow holds its lease; the user
+# has already been told, so the caller must not treat it as a failure.
+EXIT_BUSY = 75
+
 
 async def generate_flow(
     flow_id: int,
     chat_id: int,
-) -> list:
+) -> list | None:
+    """Generate posts for the flow; returns None if it is already being generated."""
     bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
     flow = None
     flow_service = None
+    leased = False
     try:
         flow_service = Container.flow_service()
         post_service = Container.post_service()
+
+        leased = await flow_service.acquire_generation_lease(flow_id)
+        if not leased:
+            logging.warning(f"Flow {flow_id} is already being generated, skipping")
+            await send_telegram_notification(
+                bot_token,
+                chat_id,
+                "⏳ Генерація для цього флоу вже виконується, спробуйте пізніше",
+            )
+            return None
+
         flow = await flow_service.get_flow_by_id(flow_id)
         user = await flow_service.get_user_by_flow_id(flow.id)
 
@@ -74,6 +91,9 @@ async def generate_flow(
         #     parse_mode="Markdown",
         # )
         raise
+    finally:
+        if leased:
+            await flow_service.release_generation_lease(flow_id)
 
 
 async def _start_telegram_generations(
@@ -104,6 +124,15 @@ async def _start_telegram_generations(
         await flow_service.update_next_generation_time(flow.id)
         raise
 
+    if (
+        not generated_posts
+        and auto_generate
+        and await post_service.has_pending_rewrites(flow.id)
+    ):
+        # Posts are created once the Batch API job finishes.
+        await flow_service.update_next_generation_time(flow.id)
+        return []
+
     if not generated_posts:
         await flow_service.update_next_generation_time(flow.id)
         # Notify user that no posts were generated (if chat_id is available)
@@ -139,7 +168,13 @@ if __name__ == "__main__":
     async def main():
         init_logger(bot)
         logging.info(f"generator_worker: Starting generation for flow {flow_id}, chat_id={chat_id}")
-        posts = await generate_flow(flow_id, chat_id)
+        try:
+            posts = await generate_flow(flow_id, chat_id)
+        finally:
+            await Container.shutdown_resources()
+        if posts is None:
+            logging.info(f"generator_worker: Flow {flow_id} is busy, exiting with code {EXIT_BUSY}")
+            sys.exit(EXIT_BUSY)
         posts_count = len(posts) if posts else 0
         logging.info(f"generator_worker: Generated {posts_count} posts for flow {flow_id}")
 
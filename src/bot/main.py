@@ -41,6 +41,7 @@ async def main():
         logging.error(f"Bot stopped with error: {e}")
         raise
     finally:
+        await Container.shutdown_resources()
         logging.info("Bot shutdown completed")
 
 
@@ -0,0 +1,97 @@
+import hashlib
+import json
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current_deferred_rewrites: ContextVar["DeferredRewrites | None"] = ContextVar(
+    "deferred_rewrites", default=None
+)
+
+_MARKER = re.compile("\u2063rewrite:([0-9a-f]{16})\u2063")
+
+
+class DeferredRewrites:
+    """
+    Collects AI rewrites of one generation run for the OpenAI Batch API.
+
+    While active, ChatGPTContentProcessor records each request here instead of
+    calling the API and returns a marker in place of the rewritten text. The
+    marker travels through post building untouched and is replaced with the
+    batch result once it is ready.
+    """
+
+    def __init__(self):
+        self.requests: dict[str, dict] = {}
+
+    @staticmethod
+    def current() -> "DeferredRewrites | None":
+        return _current_deferred_rewrites.get()
+
+    @contextmanager
+    def activate(self) -> Iterator["DeferredRewrites"]:
+        token = _current_deferred_rewrites.set(self)
+        try:
+            yield self
+        finally:
+            _current_deferred_rewrites.reset(token)
+
+    def defer(
+        self,
+        text: str,
+        system_prompt: str,
+        model: str,
+        max_tokens: int,
+        cache_key: str | None = None,
+    ) -> str:
+        custom_id = hashlib.sha256(
+            json.dumps([text, system_prompt, model], ensure_ascii=False).encode()
+        ).hexdigest()[:16]
+        self.requests.setdefault(
+            custom_id,
+            {
+                "text": text,
+                "system_prompt": system_prompt,
+                "model": model,
+                "max_tokens": max_tokens,
+                "cache_key": cache_key,
+            },
+        )
+        return f"\u2063rewrite:{custom_id}\u2063"
+
+    @staticmethod
+    def pending_ids(content: str) -> set[str]:
+        return set(_MARKER.findall(content or ""))
+
+    @staticmethod
+    def fill(content: str, results: dict[str, str]) -> str | None:
+        """Replace every marker in content, or return None if one has no result."""
+        if any(custom_id not in results for custom_id in _MARKER.findall(content)):
+            return None
+        return _MARKER.sub(lambda match: results[match.group(1)], content)
+
+    @staticmethod
+    def to_jsonl(requests: dict[str, dict]) -> bytes:
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": request["model"],
+                        "messages": [
+                            {"role": "system", "content": request["system_prompt"]},
+                            {"role": "user", "content": request["text"]},
+                        ],
+                        "temperature": 0.5,
+                        "top_p": 0.9,
+                        "max_tokens": request["max_tokens"],
+                    },
+                },
+                ensure_ascii=False,
+            )
+            for custom_id, request in requests.items()
+        ]
+        return "\n".join(lines).encode("utf-8")
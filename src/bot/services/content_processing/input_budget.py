@@ -0,0 +1,146 @@
+import logging
+import re
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from functools import lru_cache
+
+import tiktoken
+
+# Input tokens worth sending for each output length; the rest of a long
+# article can't make it into a 100 or 300 character post anyway.
+TOKEN_CAPS = {
+    "to_100": 300,
+    "to_300": 600,
+    "to_1000": 1500,
+}
+DEFAULT_TOKEN_CAP = 600
+
+BOILERPLATE = re.compile(
+    r"cookie|subscribe|newsletter|sign up|log in|all rights reserved|"
+    r"read more|related articles|share this|follow us|advertisement|"
+    r"підпис|читайте також|поділитися|реклама|усі права захищені|"
+    r"подпис|читайте также|поделиться|все права защищены|©",
+    re.IGNORECASE,
+)
+SENTENCE_END = re.compile(r"[.!?…:;»\"')]$")
+
+_current_savings: ContextVar["TokenSavings | None"] = ContextVar(
+    "token_savings", default=None
+)
+
+
+@dataclass
+class TokenSavings:
+    texts: int = 0
+    tokens_in: int = 0
+    tokens_out: int = 0
+
+    @property
+    def saved(self) -> int:
+        return self.tokens_in - self.tokens_out
+
+
+@contextmanager
+def track_token_savings() -> Iterator[TokenSavings]:
+    savings = TokenSavings()
+    token = _current_savings.set(savings)
+    try:
+        yield savings
+    finally:
+        _current_savings.reset(token)
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logging.getLogger(__name__).warning(f"Tokenizer unavailable: {e!s}")
+        return None
+
+
+class InputBudget:
+    """
+    Cuts source text down to what a rewrite of the flow's length needs.
+
+    Navigation, share and cookie lines are dropped, and if the text is still
+    over the flow's token cap the most article-like paragraphs are kept in
+    their original order. Tokens are counted with tiktoken; the length
+    estimate is only used if its encoding files can't be loaded.
+    """
+
+    def __init__(self, model: str = "gpt-4o-mini"):
+        self.model = model
+
+    def count_tokens(self, text: str) -> int:
+        if encoding := _get_encoding(self.model):
+            return len(encoding.encode(text))
+        return len(text) // 3
+
+    def trim(self, text: str, content_length: str | None) -> str:
+        cap = TOKEN_CAPS.get(content_length, DEFAULT_TOKEN_CAP)
+        tokens_in = self.count_tokens(text)
+        if tokens_in <= cap:
+            self._record(tokens_in, tokens_in)
+            return text
+
+        paragraphs = self._content_paragraphs(text)
+        counts = [self.count_tokens(paragraph) for paragraph in paragraphs]
+
+        kept, used = set(), 0
+        for index in sorted(
+            range(len(paragraphs)),
+            key=lambda i: self._score(paragraphs[i], i),
+            reverse=True,
+        ):
+            if used + counts[index] <= cap:
+                kept.add(index)
+                used += counts[index]
+
+        if kept:
+            result = "\n".join(paragraphs[i] for i in sorted(kept))
+        else:
+            result = self._truncate(paragraphs[0] if paragraphs else text, cap)
+
+        self._record(tokens_in, self.count_tokens(result))
+        return result
+
+    @staticmethod
+    def _content_paragraphs(text: str) -> list[str]:
+        paragraphs, seen = [], set()
+        for line in text.splitlines():
+            line = " ".join(line.split())
+            if not line or line in seen:
+                continue
+            seen.add(line)
+            # Menu items, buttons and captions: a few words, no sentence.
+            if len(line.split()) < 5 and not SENTENCE_END.search(line):
+                continue
+            if len(line) < 200 and BOILERPLATE.search(line):
+                continue
+            paragraphs.append(line)
+        return paragraphs or [" ".join(text.split())]
+
+    @staticmethod
+    def _score(paragraph: str, index: int) -> float:
+        # Leads carry the story; long, well-formed paragraphs are body text.
+        position = 1 / (1 + 0.2 * index)
+        length = min(len(paragraph), 400) / 400
+        sentence = 0.3 if SENTENCE_END.search(paragraph) else 0.0
+        return position + length + sentence
+
+    def _truncate(self, text: str, cap: int) -> str:
+        if encoding := _get_encoding(self.model):
+            return encoding.decode(encoding.encode(text)[:cap])
+        return text[: cap * 3]
+
+    @staticmethod
+    def _record(tokens_in: int, tokens_out: int) -> None:
+        if savings := _current_savings.get():
+            savings.texts += 1
+            savings.tokens_in += tokens_in
+            savings.tokens_out += tokens_out
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import logging
+import time
+
+from bot.utils.sqlite_store import STATS_SCHEMA, SQLiteStore
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS results (
+        key TEXT PRIMARY KEY,
+        result TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        accessed_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS results_accessed_at ON results (accessed_at);
+    """
+    + STATS_SCHEMA
+)
+
+
+class LLMCacheService:
+    """
+    Cache of rewritten texts in a SQLiteStore shared by every process.
+
+    Results are keyed by a digest of the normalized input, the system prompt,
+    the model and the length setting, so a re-generation after a failure or
+    another flow with the same source and settings reuses the earlier answer
+    instead of paying for it again. Entries expire after ttl seconds and the
+    least recently used ones are evicted beyond max_entries.
+    """
+
+    def __init__(
+        self,
+        cache_path: str = "cache/llm_cache.sqlite3",
+        ttl: float = 7 * 24 * 3600,
+        max_entries: int = 20000,
+        logger: logging.Logger | None = None,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.logger = logger or logging.getLogger(__name__)
+        self.store = SQLiteStore(cache_path, SCHEMA, self.logger)
+
+    @staticmethod
+    def make_key(text: str, system_prompt: str, model: str, length: str) -> str:
+        payload = json.dumps(
+            [" ".join(text.split()), system_prompt.strip(), model, length],
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> str | None:
+        return await self.store.call(
+            self._get, key, default=None, action="LLM cache read"
+        )
+
+    async def set(self, key: str, result: str) -> None:
+        await self.store.call(
+            self._set, key, result, default=None, action="LLM cache write"
+        )
+
+    async def get_stats(self) -> dict[str, float] | None:
+        return await self.store.call(
+            self._get_stats, default=None, action="LLM cache stats"
+        )
+
+    async def log_stats(self) -> None:
+        if stats := await self.get_stats():
+            self.logger.info(
+                f"LLM cache: {stats['entries']} entries, {stats['hits']} hits, "
+                f"{stats['misses']} misses ({stats['hit_rate']:.1%} hit rate)"
+            )
+
+    def _get(self, key: str) -> str | None:
+        now = time.time()
+        with self.store.connection() as conn:
+            row = conn.execute(
+                "SELECT result FROM results WHERE key = ? AND created_at > ?",
+                (key, now - self.ttl),
+            ).fetchone()
+
+            if row is None:
+                self.store.bump_stat(conn, "misses")
+                return None
+
+            conn.execute(
+                "UPDATE results SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+            self.store.bump_stat(conn, "hits")
+            return row[0]
+
+    def _set(self, key: str, result: str) -> None:
+        now = time.time()
+        with self.store.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, result, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, result, now, now),
+            )
+            conn.execute("DELETE FROM results WHERE created_at <= ?", (now - self.ttl,))
+            conn.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results "
+                "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def _get_stats(self) -> dict[str, float]:
+        with self.store.connection() as conn:
+            stats = self.store.hit_stats(conn)
+            stats["entries"] = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        return stats
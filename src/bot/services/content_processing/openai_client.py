@@ -0,0 +1,33 @@
+import httpx
+import openai
+
+
+def create_openai_client(
+    api_key: str | None,
+    base_url: str | None = None,
+    timeout: float = 30.0,
+    max_connections: int = 20,
+    max_keepalive_connections: int = 10,
+    keepalive_expiry: float = 60.0,
+) -> openai.AsyncOpenAI | None:
+    """
+    Build the process-wide OpenAI client.
+
+    Every content processor shares it, so requests reuse pooled keep-alive
+    connections instead of opening a new TLS session per post. Returns None
+    when no API key is configured.
+    """
+    if not api_key:
+        return None
+
+    http_client = openai.DefaultAsyncHttpxClient(
+        timeout=timeout,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+    )
+    return openai.AsyncOpenAI(
+        api_key=api_key, base_url=base_url, timeout=timeout, http_client=http_client
+    )
@@ -1,7 +1,9 @@
 import asyncio
+import json
 import logging
 import re
 from abc import ABC, abstractmethod
+from contextlib import nullcontext
 
 import openai
 from psycopg.errors import UniqueViolation
@@ -9,8 +11,21 @@ from psycopg.errors import UniqueViolation
 from bot.database.exceptions import AISettingsNotFoundError
 from bot.database.models import FlowDTO
 from bot.services.aisettings_service import AISettingsService
+from bot.services.content_processing.deferred_rewrites import DeferredRewrites
+from bot.services.content_processing.llm_cache_service import LLMCacheService
+from bot.services.content_processing.prompt_cache import FlowPromptCache
+from bot.services.content_processing.rate_limiter import OpenAIRateLimiter
+from bot.services.content_processing.rewrite_batcher import RewriteBatcher
 from bot.utils.notifications import notify_admins
 
+BATCH_INSTRUCTIONS = (
+    "You will receive several independent posts as JSON: "
+    '{"posts": [{"id": <number>, "text": <post>}]}. '
+    "Apply the rules above to each post separately and answer with JSON only: "
+    '{"posts": [{"id": <same number>, "text": <edited post>}]}, '
+    "one entry for every input post."
+)
+
 
 class ContentProcessor(ABC):
     @abstractmethod
@@ -45,40 +60,32 @@ class DefaultContentProcessor:
 class ChatGPTContentProcessor(ContentProcessor):
     def __init__(
         self,
-        api_key: str,
+        client: openai.AsyncOpenAI,
         flow: FlowDTO,
         aisettings_service: AISettingsService,
         model: str = "gpt-4o-mini",
         max_retries: int = 5,
         timeout: float = 15.0,
-        cache_size_limit: int = 1000,
+        cache: LLMCacheService | None = None,
+        rate_limiter: OpenAIRateLimiter | None = None,
+        batcher: RewriteBatcher | None = None,
     ):
-        self.cache = {}
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.batcher = batcher
         self.flow = flow
         self.model = model
-        self.max_batch_size: int = 5
         self.max_retries = max_retries
         self.request_timeout = timeout
-        self.cache_size_limit = cache_size_limit
         self.aisettings_service = aisettings_service
-        self.client = openai.AsyncOpenAI(api_key=api_key, timeout=timeout)
+        self.client = client
 
     async def process_batch(self, texts: list[str]) -> list[str]:
         if not texts:
             return []
 
-        results = []
-        for i in range(0, len(texts), self.max_batch_size):
-            batch = texts[i : i + self.max_batch_size]
-            batch_results = await asyncio.gather(
-                *[self.process(text) for text in batch]
-            )
-            results.extend(batch_results)
-
-            if i + self.max_batch_size < len(texts):
-                await asyncio.sleep(3)
-
-        return results
+        # Pacing is left to the shared rate limiter.
+        return list(await asyncio.gather(*[self.process(text) for text in texts]))
 
     async def _get_or_create_user_prompt(self, text: str, flow: FlowDTO) -> str:
         default_prompt = self._build_system_prompt(text)
@@ -116,16 +123,29 @@ class ChatGPTContentProcessor(ContentProcessor):
             if not text.strip():
                 return ""
 
-            cache_key = hash(f"{text}_{self.flow.id}")
-            if cache_key in self.cache:
-                return self.cache[cache_key]
-
             system_prompt = await self._get_prompt(text, self.flow)
-            result = await self._call_ai_with_retry(text, system_prompt)
 
-            if len(self.cache) >= self.cache_size_limit:
-                self.cache.pop(next(iter(self.cache)))
-            self.cache[cache_key] = result
+            cache_key = None
+            if self.cache:
+                cache_key = self.cache.make_key(
+                    text, system_prompt, self.model, str(self.flow.content_length)
+                )
+                if (cached := await self.cache.get(cache_key)) is not None:
+                    return cached
+
+            if (deferred := DeferredRewrites.current()) is not None:
+                # Answered later by the Batch API; see BatchRewriteService.
+                return deferred.defer(
+                    text, system_prompt, self.model, 2000, cache_key=cache_key
+                )
+
+            if self._can_batch():
+                result = await self.batcher.submit(self, text, system_prompt)
+            else:
+                result = await self._call_ai_with_retry(text, system_prompt)
+
+            if cache_key and result:
+                await self.cache.set(cache_key, result)
 
             return result
 
@@ -179,15 +199,7 @@ class ChatGPTContentProcessor(ContentProcessor):
         last_error = None
         for attempt in range(self.max_retries + 1):
             try:
-                response = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=messages,
-                    temperature=0.5,
-                    top_p=0.9,
-                    max_tokens=2000,
-                    timeout=self.request_timeout,
-                )
-                result = response.choices[0].message.content.strip()
+                result = await self._create_completion(messages, max_tokens=2000)
                 # Enforce strict length limit
                 result = self._enforce_length_limit(result)
                 return result
@@ -196,9 +208,16 @@ class ChatGPTContentProcessor(ContentProcessor):
                 last_error = e
                 if attempt == self.max_retries:
                     raise
-                wait_time = min(5, 2 ** attempt)
-                logging.info(f"Rate limit hit, waiting {wait_time}s before retry {attempt + 1}/{self.max_retries}")
-                await asyncio.sleep(wait_time)
+                if self.rate_limiter:
+                    # The next slot waits until the limiter's pause is over.
+                    await self.rate_limiter.back_off(e.response.headers)
+                else:
+                    wait_time = min(5, 2**attempt)
+                    logging.info(
+                        f"Rate limit hit, waiting {wait_time}s before retry "
+                        f"{attempt + 1}/{self.max_retries}"
+                    )
+                    await asyncio.sleep(wait_time)
 
             except openai.APIError as e:
                 last_error = e
@@ -216,6 +235,89 @@ class ChatGPTContentProcessor(ContentProcessor):
             last_error if last_error else openai.APIError("Unknown error after retries")
         )
 
+    async def _call_ai_batch(
+        self, texts: list[str], system_prompt: str
+    ) -> list[str | None]:
+        """
+        Rewrite several posts in one JSON-mode request.
+
+        Returns one result per text, None where the response had no usable
+        rewrite, so the caller can retry those one by one.
+        """
+        messages = [
+            {"role": "system", "content": f"{system_prompt}\n\n{BATCH_INSTRUCTIONS}"},
+            {
+                "role": "user",
+                "content": json.dumps(
+                    {"posts": [{"id": i, "text": text} for i, text in enumerate(texts)]},
+                    ensure_ascii=False,
+                ),
+            },
+        ]
+        try:
+            content = await self._create_completion(
+                messages,
+                max_tokens=min(4000, 400 * len(texts)),
+                response_format={"type": "json_object"},
+            )
+        except openai.RateLimitError as e:
+            if self.rate_limiter:
+                await self.rate_limiter.back_off(e.response.headers)
+            raise
+
+        results: list[str | None] = [None] * len(texts)
+        try:
+            posts = json.loads(content).get("posts")
+        except (ValueError, AttributeError):
+            return results
+
+        for item in posts if isinstance(posts, list) else []:
+            if not isinstance(item, dict):
+                continue
+            index, text = item.get("id"), item.get("text")
+            if (
+                isinstance(index, int)
+                and 0 <= index < len(texts)
+                and isinstance(text, str)
+                and text.strip()
+            ):
+                results[index] = self._enforce_length_limit(text.strip())
+        return results
+
+    async def _create_completion(
+        self, messages: list[dict], max_tokens: int, **kwargs
+    ) -> str:
+        estimated_tokens = OpenAIRateLimiter.estimate_tokens(
+            *(message["content"] for message in messages), max_tokens=max_tokens
+        )
+        async with self._rate_limit_slot(estimated_tokens):
+            raw_response = await self.client.chat.completions.with_raw_response.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.5,
+                top_p=0.9,
+                max_tokens=max_tokens,
+                timeout=self.request_timeout,
+                **kwargs,
+            )
+        if self.rate_limiter:
+            await self.rate_limiter.update_from_headers(raw_response.headers)
+        response = raw_response.parse()
+        return response.choices[0].message.content.strip()
+
+    def _can_batch(self) -> bool:
+        # Only short rewrites are worth packing together.
+        return (
+            self.batcher is not None
+            and self.batcher.enabled
+            and self.flow.content_length in ("to_100", "to_300")
+        )
+
+    def _rate_limit_slot(self, estimated_tokens: int):
+        if self.rate_limiter:
+            return self.rate_limiter.slot(estimated_tokens)
+        return nullcontext()
+
     async def _notify_admin(self, message: str):
         try:
             await notify_admins(message, parse_mode="HTML")
@@ -223,7 +325,12 @@ class ChatGPTContentProcessor(ContentProcessor):
             logging.error(f"Failed to send admin notification: {e!s}")
 
     async def _get_prompt(self, text: str, flow: FlowDTO) -> str:
-        return await self._get_or_create_user_prompt(text, flow)
+        prompt_cache = FlowPromptCache.current()
+        if prompt_cache is None:
+            return await self._get_or_create_user_prompt(text, flow)
+        return await prompt_cache.get_or_load(
+            flow.id, lambda: self._get_or_create_user_prompt(text, flow)
+        )
 
     def _build_system_prompt(self, text: str) -> str:
         max_chars = self._get_length_instruction()
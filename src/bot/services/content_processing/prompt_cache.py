@@ -0,0 +1,57 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_current_prompt_cache: ContextVar["FlowPromptCache | None"] = ContextVar(
+    "flow_prompt_cache", default=None
+)
+
+
+class FlowPromptCache:
+    """
+    Remembers each flow's resolved system prompt for one generation run.
+
+    The first post of a flow loads (and, if missing, creates) its AISettings;
+    posts processed concurrently wait for that lookup instead of repeating it,
+    so there is one query and no racing insert per flow and run.
+    """
+
+    def __init__(self):
+        self._prompts: dict[int, asyncio.Future] = {}
+
+    @staticmethod
+    def current() -> "FlowPromptCache | None":
+        return _current_prompt_cache.get()
+
+    @contextmanager
+    def activate(self) -> Iterator["FlowPromptCache"]:
+        token = _current_prompt_cache.set(self)
+        try:
+            yield self
+        finally:
+            _current_prompt_cache.reset(token)
+            self._prompts.clear()
+
+    async def get_or_load(
+        self, flow_id: int, load: Callable[[], Awaitable[str]]
+    ) -> str:
+        if (future := self._prompts.get(flow_id)) is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                return await self.get_or_load(flow_id, load)
+
+        future = asyncio.get_running_loop().create_future()
+        self._prompts[flow_id] = future
+        try:
+            prompt = await load()
+        except BaseException:
+            self._prompts.pop(flow_id, None)
+            future.cancel()
+            raise
+
+        future.set_result(prompt)
+        return prompt
@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import re
+import sqlite3
+import time
+from collections.abc import AsyncIterator, Mapping
+from contextlib import asynccontextmanager
+
+from bot.utils.sqlite_store import SQLiteStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    name TEXT PRIMARY KEY,
+    capacity REAL NOT NULL,
+    available REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pauses (
+    name TEXT PRIMARY KEY,
+    until REAL NOT NULL
+);
+"""
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+class OpenAIRateLimiter:
+    """
+    Token-bucket limiter for OpenAI requests shared by every process on the host.
+
+    Two buckets, requests and tokens, refill at the account's per-minute
+    limits and live in a SQLiteStore, so every process draws from the same
+    budget. Each response's
+    x-ratelimit-* headers replace the configured limits with the real ones and
+    cap the buckets at what OpenAI reports as remaining; a 429 pauses every
+    caller until the reset OpenAI asks for.
+    """
+
+    def __init__(
+        self,
+        state_path: str = "cache/openai_rate_limit.sqlite3",
+        requests_per_minute: int = 500,
+        tokens_per_minute: int = 200_000,
+        max_in_flight: int = 8,
+        logger: logging.Logger | None = None,
+    ):
+        self.state_path = state_path
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.logger = logger or logging.getLogger(__name__)
+        self._in_flight = asyncio.Semaphore(max(1, max_in_flight))
+        self.store = SQLiteStore(state_path, SCHEMA, self.logger)
+
+    @staticmethod
+    def estimate_tokens(*texts: str, max_tokens: int = 0) -> int:
+        # OpenAI counts max_tokens against the TPM limit up front.
+        return sum(len(text) for text in texts) // 3 + max_tokens
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int) -> AsyncIterator[None]:
+        async with self._in_flight:
+            await self.acquire(estimated_tokens)
+            yield
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        waited = 0.0
+        while True:
+            # Without its state the limiter lets the request through.
+            wait = await self.store.call(
+                self._try_acquire,
+                estimated_tokens,
+                default=0.0,
+                action="Rate limiter acquire",
+            )
+            if wait <= 0:
+                break
+            waited += wait
+            await asyncio.sleep(wait)
+
+        if waited >= 1:
+            self.logger.info(f"Waited {waited:.1f}s for OpenAI rate limit")
+
+    async def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        limits = self._parse_headers(headers)
+        if not limits:
+            return
+        await self.store.call(
+            self._apply_limits, limits, 0.0, default=None, action="Rate limiter update"
+        )
+
+    async def back_off(self, headers: Mapping[str, str] | None) -> float:
+        """Pause all callers after a 429 and return the pause in seconds."""
+        headers = headers or {}
+        limits = self._parse_headers(headers)
+        pause = self._retry_after(headers)
+        if pause is None:
+            pause = max(
+                (limits.get(f"reset_{name}", 0.0) for name in ("requests", "tokens")),
+                default=0.0,
+            )
+        pause = min(max(pause, 1.0), 60.0)
+        await self.store.call(
+            self._apply_limits, limits, pause, default=None, action="Rate limiter update"
+        )
+        self.logger.info(f"OpenAI rate limit hit, pausing requests for {pause:.1f}s")
+        return pause
+
+    def _load_buckets(
+        self, conn: sqlite3.Connection, now: float
+    ) -> dict[str, list[float]]:
+        rows = {
+            name: [capacity, available, updated_at]
+            for name, capacity, available, updated_at in conn.execute(
+                "SELECT name, capacity, available, updated_at FROM buckets"
+            )
+        }
+        defaults = {
+            "requests": self.requests_per_minute,
+            "tokens": self.tokens_per_minute,
+        }
+        buckets = {}
+        for name, default in defaults.items():
+            capacity, available, updated_at = rows.get(name, [default, default, now])
+            refilled = available + max(0.0, now - updated_at) * capacity / 60
+            buckets[name] = [capacity, min(capacity, refilled)]
+        return buckets
+
+    def _save_buckets(
+        self, conn: sqlite3.Connection, buckets: dict[str, list[float]], now: float
+    ) -> None:
+        conn.executemany(
+            "INSERT OR REPLACE INTO buckets (name, capacity, available, updated_at) "
+            "VALUES (?, ?, ?, ?)",
+            [(name, capacity, available, now) for name, (capacity, available) in buckets.items()],
+        )
+
+    def _try_acquire(self, estimated_tokens: int) -> float:
+        """Take one request and the estimated tokens, or return how long to wait."""
+        now = time.time()
+        with self.store.transaction() as conn:
+            paused = conn.execute(
+                "SELECT until FROM pauses WHERE name = 'openai'"
+            ).fetchone()
+            if paused and paused[0] > now:
+                return paused[0] - now
+
+            buckets = self._load_buckets(conn, now)
+            needed = {
+                "requests": 1.0,
+                "tokens": min(float(estimated_tokens), buckets["tokens"][0]),
+            }
+            wait = max(
+                (needed[name] - available) * 60 / capacity
+                for name, (capacity, available) in buckets.items()
+            )
+            if wait <= 0:
+                for name, bucket in buckets.items():
+                    bucket[1] -= needed[name]
+            self._save_buckets(conn, buckets, now)
+            return max(wait, 0.0)
+
+    def _apply_limits(self, limits: dict[str, float], pause: float) -> None:
+        now = time.time()
+        with self.store.transaction() as conn:
+            buckets = self._load_buckets(conn, now)
+            for name, bucket in buckets.items():
+                if f"limit_{name}" in limits:
+                    bucket[0] = limits[f"limit_{name}"]
+                if f"remaining_{name}" in limits:
+                    bucket[1] = min(bucket[1], limits[f"remaining_{name}"])
+                if pause:
+                    bucket[1] = min(bucket[1], 0.0)
+            self._save_buckets(conn, buckets, now)
+
+            if pause:
+                conn.execute(
+                    "INSERT INTO pauses (name, until) VALUES ('openai', ?) "
+                    "ON CONFLICT(name) DO UPDATE SET until = MAX(until, excluded.until)",
+                    (now + pause,),
+                )
+
+    @classmethod
+    def _parse_headers(cls, headers: Mapping[str, str]) -> dict[str, float]:
+        limits = {}
+        for name in ("requests", "tokens"):
+            for field in ("limit", "remaining"):
+                value = headers.get(f"x-ratelimit-{field}-{name}")
+                if value is not None:
+                    try:
+                        limits[f"{field}_{name}"] = float(value)
+                    except ValueError:
+                        pass
+            reset = headers.get(f"x-ratelimit-reset-{name}")
+            if reset:
+                limits[f"reset_{name}"] = cls._parse_duration(reset)
+        return limits
+
+    @staticmethod
+    def _parse_duration(value: str) -> float:
+        # OpenAI sends durations like "20ms", "1s" or "6m0s".
+        return sum(
+            float(amount) * _DURATION_UNITS[unit]
+            for amount, unit in _DURATION_PART.findall(value)
+        )
+
+    @staticmethod
+    def _retry_after(headers: Mapping[str, str]) -> float | None:
+        try:
+            if value := headers.get("retry-after-ms"):
+                return float(value) / 1000
+            if value := headers.get("retry-after"):
+                return float(value)
+        except ValueError:
+            pass
+        return None
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from bot.services.content_processing.processors import ChatGPTContentProcessor
+
+
+@dataclass
+class _PendingBatch:
+    processor: ChatGPTContentProcessor
+    system_prompt: str
+    texts: list[str] = field(default_factory=list)
+    futures: list[asyncio.Future] = field(default_factory=list)
+    timer: asyncio.TimerHandle | None = None
+
+
+class RewriteBatcher:
+    """
+    Packs concurrent rewrites of short posts into multi-post requests.
+
+    Texts submitted for the same flow and system prompt within max_wait
+    seconds are sent together, up to max_batch_size per request, so the long
+    system prompt is paid once per batch instead of once per post.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = 5,
+        max_wait: float = 0.2,
+        logger: logging.Logger | None = None,
+    ):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.logger = logger or logging.getLogger(__name__)
+        self._pending: dict[tuple, _PendingBatch] = {}
+        self._running: set[asyncio.Task] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_batch_size > 1
+
+    async def submit(
+        self, processor: ChatGPTContentProcessor, text: str, system_prompt: str
+    ) -> str | None:
+        key = (processor.flow.id, processor.model, system_prompt)
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = _PendingBatch(processor, system_prompt)
+            self._pending[key] = batch
+            batch.timer = asyncio.get_running_loop().call_later(
+                self.max_wait, self._flush, key
+            )
+
+        future = asyncio.get_running_loop().create_future()
+        batch.texts.append(text)
+        batch.futures.append(future)
+        if len(batch.texts) >= self.max_batch_size:
+            self._flush(key)
+
+        return await future
+
+    def _flush(self, key: tuple) -> None:
+        batch = self._pending.pop(key, None)
+        if batch is None:
+            return
+        if batch.timer:
+            batch.timer.cancel()
+        task = asyncio.ensure_future(self._run(batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run(self, batch: _PendingBatch) -> None:
+        processor = batch.processor
+        # Posts whose consumer went away are not sent at all.
+        live = [
+            (text, future)
+            for text, future in zip(batch.texts, batch.futures, strict=True)
+            if not future.done()
+        ]
+        texts = [text for text, _ in live]
+        results: list[str | None] = [None] * len(texts)
+        if len(texts) > 1:
+            try:
+                results = await processor._call_ai_batch(texts, batch.system_prompt)
+            except Exception as e:
+                self.logger.warning(
+                    f"Batched rewrite of {len(texts)} posts failed, "
+                    f"falling back to single requests: {e!s}"
+                )
+
+            fallbacks = sum(result is None for result in results)
+            if fallbacks:
+                self.logger.info(
+                    f"Batched rewrite: {len(texts) - fallbacks}/{len(texts)} "
+                    f"posts parsed, rest sent one by one"
+                )
+
+        await asyncio.gather(
+            *(
+                self._resolve(
+                    future,
+                    result,
+                    lambda text=text: processor._call_ai_with_retry(
+                        text, batch.system_prompt
+                    ),
+                )
+                for (text, future), result in zip(live, results, strict=True)
+            )
+        )
+
+    @staticmethod
+    async def _resolve(
+        future: asyncio.Future,
+        result: str | None,
+        fallback: Callable[[], Awaitable[str]],
+    ) -> None:
+        if future.done():
+            return
+        if result is None:
+            try:
+                result = await fallback()
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                return
+        if not future.done():
+            future.set_result(result)
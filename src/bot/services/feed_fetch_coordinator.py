@@ -0,0 +1,143 @@
+import asyncio
+import logging
+from collections import Counter
+from collections.abc import Awaitable, Callable, Hashable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+_current_coordinator: ContextVar["FeedFetchCoordinator | None"] = ContextVar(
+    "feed_fetch_coordinator", default=None
+)
+
+
+class FeedFetchCoordinator:
+    """
+    Shares source fetches between the flows of one scheduled generation cycle.
+
+    Due flows are grouped by the feed or Telegram channel they read from, and
+    while the coordinator is active every such source is downloaded and parsed
+    once; later requests for the same key reuse the result. Telegram posts are
+    handed out so that each one goes to a single flow, as source_id is unique
+    across flows anyway.
+    """
+
+    def __init__(
+        self, flows: list | None = None, logger: logging.Logger | None = None
+    ):
+        self.logger = logger or logging.getLogger(__name__)
+        self._subscribers: Counter[Hashable] = Counter()
+        self._flow_ids: dict[Hashable, set[int]] = {}
+        self._results: dict[Hashable, asyncio.Future] = {}
+        self._claimed: dict[Hashable, set] = {}
+        self.fetches = 0
+        self.reused = 0
+
+        for flow in flows or []:
+            for source in flow.sources or []:
+                key = self.source_key(source)
+                self._subscribers[key] += 1
+                self._flow_ids.setdefault(key, set()).add(flow.id)
+
+    @staticmethod
+    def current() -> "FeedFetchCoordinator | None":
+        return _current_coordinator.get()
+
+    @contextmanager
+    def activate(self) -> Iterator["FeedFetchCoordinator"]:
+        token = _current_coordinator.set(self)
+        try:
+            yield self
+        finally:
+            _current_coordinator.reset(token)
+            self._results.clear()
+            self._claimed.clear()
+
+    @staticmethod
+    def source_key(source: dict) -> tuple:
+        if source.get("type") == "telegram":
+            return FeedFetchCoordinator.telegram_key(source)
+        return FeedFetchCoordinator.rss_key(
+            source.get("rss_url") or source.get("link"), source
+        )
+
+    @staticmethod
+    def telegram_key(source: dict) -> tuple:
+        return ("telegram", source["link"], int(source.get("last_message_id") or 0))
+
+    @staticmethod
+    def rss_key(rss_url: str, validators: dict | None = None) -> tuple:
+        validators = validators or {}
+        return (
+            "rss",
+            rss_url,
+            validators.get("etag"),
+            validators.get("last_modified"),
+        )
+
+    def subscribers(self, key: Hashable) -> int:
+        return max(1, self._subscribers.get(key, 0))
+
+    def subscriber_flow_ids(self, key: Hashable) -> set[int]:
+        return set(self._flow_ids.get(key, ()))
+
+    @property
+    def shared_sources(self) -> int:
+        return sum(1 for count in self._subscribers.values() if count > 1)
+
+    async def fetch_once(
+        self, key: Hashable, fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        if (future := self._results.get(key)) is not None:
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The fetching caller was cancelled; fetch on our own.
+                return await self.fetch_once(key, fetch)
+            self.reused += 1
+            return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._results[key] = future
+        self.fetches += 1
+        try:
+            result = await fetch()
+        except asyncio.CancelledError:
+            self._results.pop(key, None)
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+
+        future.set_result(result)
+        return result
+
+    def claim(
+        self,
+        key: Hashable,
+        items: list,
+        limit: int,
+        item_id: Callable[[Any], Hashable],
+    ) -> list:
+        claimed = self._claimed.setdefault(key, set())
+        result = []
+        for item in items:
+            if len(result) >= limit:
+                break
+            ident = item_id(item)
+            if ident in claimed:
+                continue
+            claimed.add(ident)
+            result.append(item)
+        return result
+
+    def log_stats(self) -> None:
+        self.logger.info(
+            f"Feed fetch cycle: {len(self._subscribers)} sources "
+            f"({self.shared_sources} shared between flows), "
+            f"{self.fetches} fetched, {self.reused} reused"
+        )
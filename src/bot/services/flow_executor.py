@@ -0,0 +1,77 @@
+import asyncio
+import logging
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Hashable
+from itertools import chain, zip_longest
+
+from bot.database.models import FlowDTO
+
+
+class FlowExecutor:
+    """
+    Runs due flows concurrently with a global and a per-user limit.
+
+    Flows are started in round-robin order across their owners, so one user
+    with many flows can't take every slot, and each run is cancelled after
+    flow_timeout seconds so a stuck source can't hold a slot for the rest of
+    the cycle.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 3,
+        per_user_limit: int = 1,
+        flow_timeout: float = 900.0,
+        logger: logging.Logger | None = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.per_user_limit = max(1, per_user_limit)
+        self.flow_timeout = flow_timeout
+        self.logger = logger or logging.getLogger(__name__)
+
+    async def run(
+        self,
+        flows: list[FlowDTO],
+        run_flow: Callable[[FlowDTO], Awaitable[object]],
+        owner_of: Callable[[FlowDTO], Hashable],
+    ) -> list[tuple[FlowDTO, BaseException]]:
+        """
+        Run run_flow for every flow and return the flows that failed or timed
+        out together with their errors.
+        """
+        slots = asyncio.Semaphore(self.max_concurrency)
+        user_slots: dict[Hashable, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.per_user_limit)
+        )
+
+        async def _run(flow: FlowDTO) -> None:
+            async with user_slots[owner_of(flow)], slots:
+                try:
+                    async with asyncio.timeout(self.flow_timeout):
+                        await run_flow(flow)
+                except TimeoutError:
+                    self.logger.error(
+                        f"Flow {flow.id} timed out after {self.flow_timeout:.0f}s"
+                    )
+                    raise
+
+        ordered = self._interleave_by_owner(flows, owner_of)
+        results = await asyncio.gather(
+            *(_run(flow) for flow in ordered), return_exceptions=True
+        )
+        return [
+            (flow, result)
+            for flow, result in zip(ordered, results, strict=True)
+            if isinstance(result, BaseException)
+        ]
+
+    @staticmethod
+    def _interleave_by_owner(
+        flows: list[FlowDTO], owner_of: Callable[[FlowDTO], Hashable]
+    ) -> list[FlowDTO]:
+        by_owner: dict[Hashable, list[FlowDTO]] = defaultdict(list)
+        for flow in flows:
+            by_owner[owner_of(flow)].append(flow)
+
+        rounds = zip_longest(*by_owner.values())
+        return [flow for flow in chain.from_iterable(rounds) if flow is not None]
@@ -1,4 +1,5 @@
 import logging
+import os
 from datetime import timedelta
 from typing import Any
 
@@ -14,6 +15,9 @@ from bot.database.repositories import ChannelRepository, FlowRepository
 from bot.services.logger_service import get_logger
 from bot.services.web.rss_service import RssService
 
+# Upper bound on how long a crashed generation keeps its flow locked.
+GENERATION_LEASE_SECONDS = float(os.getenv("GENERATION_LEASE_SECONDS", "3600"))
+
 
 class FlowService:
     def __init__(
@@ -213,6 +217,35 @@ class FlowService:
         )
         return flows
 
+    async def claim_flows_due_for_generation(
+        self, lease_seconds: float = GENERATION_LEASE_SECONDS
+    ) -> list[FlowDTO]:
+        now = timezone.now()
+        return await self.flow_repository.claim_due_flows(
+            now, now + timedelta(seconds=lease_seconds)
+        )
+
+    async def acquire_generation_lease(
+        self, flow_id: int, lease_seconds: float = GENERATION_LEASE_SECONDS
+    ) -> bool:
+        now = timezone.now()
+        return await self.flow_repository.acquire_generation_lease(
+            flow_id, now, now + timedelta(seconds=lease_seconds)
+        )
+
+    async def extend_generation_lease(
+        self, flow_id: int, lease_seconds: float = GENERATION_LEASE_SECONDS
+    ):
+        await self.flow_repository.extend_generation_lease(
+            flow_id, timezone.now() + timedelta(seconds=lease_seconds)
+        )
+
+    async def release_generation_lease(self, flow_id: int):
+        try:
+            await self.flow_repository.release_generation_lease(flow_id)
+        except Exception as e:
+            logging.error(f"Failed to release generation lease of flow {flow_id}: {e}")
+
     async def force_flows_due_for_generation(self) -> list[FlowDTO]:
         flows = await self.flow_repository.list()
         return flows
@@ -263,6 +296,9 @@ class FlowService:
         await self.update_flow(flow_id, sources=updated_sources)
         return rss_url
 
+    async def get_flow_owner_ids(self, flow_ids: list[int]) -> dict[int, int]:
+        return await self.flow_repository.get_owner_ids(flow_ids)
+
     async def get_user_by_flow_id(self, flow_id: int) -> UserDTO:
         flow = await self.get_flow_by_id(flow_id)
         channel = await self.channel_repository.get_channel(flow.channel_id)
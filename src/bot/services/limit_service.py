@@ -1,6 +1,8 @@
 import logging
 
 from dateutil.relativedelta import relativedelta
+from django.db.models import F
+from django.db.models.functions import Greatest
 from django.utils import timezone
 
 from admin_panel.models import Flow, Tariff, User
@@ -119,34 +121,86 @@ class LimitService:
 
     async def check_generations_limit(self, user: User, new_generations: int = 0):
         await self._reset_generations_if_needed(user)
-        tariff = await self.get_user_tariff(user)
-        if not tariff:
-            self.logger.warning(
-                f"Користувач {user.id} спробував генерувати без активної підписки"
-            )
-            raise GenerationLimitExceeded(
-                f"⚠️ *Немає активної підписки*\n\n"
-                f"Для генерації постів потрібна активна підписка\\.\n"
-                f"Оформіть підписку для доступу до функціоналу\\."
-            )
+        tariff = await self._get_generation_tariff(user)
 
         if user.generated_posts_count + new_generations > tariff.generations_available:
             self.logger.warning(
                 f"Користувач {user.id} перевищив ліміт генерацій: {user.generated_posts_count + new_generations}/{tariff.generations_available}"
             )
-            raise GenerationLimitExceeded(
-                f"⚠️ *Ліміт генерацій досягнуто*\n\n"
-                f"Згенеровано: {user.generated_posts_count}/{tariff.generations_available} постів\n"
-                f"Ліміт оновиться наступного місяця\\.\n\n"
-                f"Для збільшення ліміту оновіть тарифний план\\."
-            )
+            raise self._generation_limit_error(user.generated_posts_count, tariff)
+
+    async def reserve_generations(self, user: User, requested: int) -> int:
+        """
+        Atomically take up to requested generations from the user's quota.
+
+        The counter is bumped with a conditional UPDATE, so concurrent
+        generations can't both spend the last slots. Fails only when nothing
+        is left; otherwise returns the number reserved, and whatever ends up
+        unused must be given back with release_generations().
+        """
+        await self._reset_generations_if_needed(user)
+        tariff = await self._get_generation_tariff(user)
+        users = User.objects.filter(id=user.id)
+
+        while True:
+            used = await users.values_list("generated_posts_count", flat=True).aget()
+            available = tariff.generations_available - used
+            amount = min(requested, available)
+
+            if amount <= 0:
+                self.logger.warning(
+                    f"Користувач {user.id} перевищив ліміт генерацій: {used + requested}/{tariff.generations_available}"
+                )
+                raise self._generation_limit_error(used, tariff)
+
+            if await users.filter(generated_posts_count=used).aupdate(
+                generated_posts_count=F("generated_posts_count") + amount
+            ):
+                user.generated_posts_count = used + amount
+                if amount < requested:
+                    self.logger.info(
+                        f"Reserved {amount}/{requested} generations for user {user.id}"
+                    )
+                return amount
+
+    async def release_generations(self, user: User, count: int):
+        if count <= 0:
+            return
+        await User.objects.filter(id=user.id).aupdate(
+            generated_posts_count=Greatest(F("generated_posts_count") - count, 0)
+        )
+        user.generated_posts_count = max(0, user.generated_posts_count - count)
 
     async def increment_generations(self, user: User, count: int = 1):
         await self._reset_generations_if_needed(user)
+        await User.objects.filter(id=user.id).aupdate(
+            generated_posts_count=F("generated_posts_count") + count
+        )
         user.generated_posts_count += count
-        await user.asave(update_fields=["generated_posts_count", "generation_reset_at"])
 
     async def decrement_generations(self, user: User, count: int = 1):
         await self._reset_generations_if_needed(user)
-        user.generated_posts_count = max(0, user.generated_posts_count - count)
-        await user.asave(update_fields=["generated_posts_count", "generation_reset_at"])
+        await self.release_generations(user, count)
+
+    async def _get_generation_tariff(self, user: User) -> Tariff:
+        tariff = await self.get_user_tariff(user)
+        if not tariff:
+            self.logger.warning(
+                f"Користувач {user.id} спробував генерувати без активної підписки"
+            )
+            raise GenerationLimitExceeded(
+                f"⚠️ *Немає активної підписки*\n\n"
+                f"Для генерації постів потрібна активна підписка\\.\n"
+                f"Оформіть підписку для доступу до функціоналу\\."
+            )
+        return tariff
+
+    def _generation_limit_error(
+        self, used: int, tariff: Tariff
+    ) -> GenerationLimitExceeded:
+        return GenerationLimitExceeded(
+            f"⚠️ *Ліміт генерацій досягнуто*\n\n"
+            f"Згенеровано: {used}/{tariff.generations_available} постів\n"
+            f"Ліміт оновиться наступного місяця\\.\n\n"
+            f"Для збільшення ліміту оновіть тарифний план\\."
+        )
@@ -1,3 +1,6 @@
+import asyncio
+import errno
+import hashlib
 import logging
 import os
 import shutil
@@ -12,18 +15,61 @@ from PIL import Image, UnidentifiedImageError
 
 from admin_panel.models import Post, PostImage, PostVideo
 
+# Servers often label media as octet-stream, so these only need the bytes.
+GENERIC_CONTENT_TYPES = ("", "application/octet-stream", "binary/octet-stream")
+_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"\x1aE\xdf\xa3", "video/webm"),
+)
+
 
 class MediaService:
-    def __init__(self):
+    def __init__(
+        self,
+        client: httpx.AsyncClient | None = None,
+        max_download_size: int = 50 * 1024 * 1024,
+        max_concurrent_downloads: int = 4,
+        chunk_size: int = 64 * 1024,
+        logger: logging.Logger | None = None,
+    ):
         self.image_dir = "posts/images"
         self.video_dir = "posts/videos"
-        self.logger = logging.getLogger(__name__)
+        self.max_download_size = max_download_size
+        self.chunk_size = chunk_size
+        self.logger = logger or logging.getLogger(__name__)
+        self._client = client
+        self._download_slots = asyncio.Semaphore(max(1, max_concurrent_downloads))
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=30,
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
     @staticmethod
     def _is_url(path: str) -> bool:
         """Check if path is a URL"""
         return path.startswith(("http://", "https://"))
 
+    @staticmethod
+    def _is_temp_path(path: str) -> bool:
+        """Check if path is a downloaded file waiting to be stored"""
+        return path.startswith(
+            ("/tmp/", os.path.join(settings.MEDIA_STAGING_DIR, ""))
+        )
+
     @staticmethod
     def _is_local_media_path(path: str) -> bool:
         """Check if path is a stored local media file"""
@@ -50,23 +96,66 @@ class MediaService:
         ext = os.path.splitext(urlparse(url).path)[1] or (
             ".jpg" if media_type == "image" else ".mp4"
         )
-        temp_file = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4()}{ext}")
+        os.makedirs(settings.MEDIA_STAGING_DIR, exist_ok=True)
+        temp_file = os.path.join(settings.MEDIA_STAGING_DIR, f"{uuid.uuid4()}{ext}")
 
         try:
-            async with httpx.AsyncClient(
-                timeout=30, follow_redirects=True, headers=headers
-            ) as client:
-                resp = await client.get(url)
+            async with (
+                self._download_slots,
+                self.client.stream("GET", url, headers=headers) as resp,
+            ):
                 resp.raise_for_status()
+                length = resp.headers.get("content-length", "")
+                if length.isdigit() and int(length) > self.max_download_size:
+                    raise ValueError(f"Media too large: {length} bytes at {url}")
 
+                declared = resp.headers.get("content-type", "")
+                size = 0
                 async with aiofiles.open(temp_file, "wb") as f:
-                    await f.write(resp.content)
-
+                    async for chunk in resp.aiter_bytes(self.chunk_size):
+                        if size == 0:
+                            self._check_content_type(
+                                self._sniff_content_type(chunk, declared),
+                                media_type,
+                                url,
+                            )
+                        size += len(chunk)
+                        if size > self.max_download_size:
+                            raise ValueError(
+                                f"Media larger than {self.max_download_size} "
+                                f"bytes at {url}"
+                            )
+                        await f.write(chunk)
+
+            if size == 0:
+                raise ValueError(f"Empty response for media at {url}")
             return temp_file
         except Exception:
             self.logger.error(f"Failed to download media from {url}")
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
             raise
 
+    @staticmethod
+    def _sniff_content_type(head: bytes, declared: str) -> str:
+        for signature, content_type in _SIGNATURES:
+            if head.startswith(signature):
+                return content_type
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return "image/webp"
+        if head[4:8] == b"ftyp":
+            return "video/mp4"
+        if head.lstrip()[:1] == b"<":
+            return "text/html"
+        return declared.split(";")[0].strip().lower()
+
+    @staticmethod
+    def _check_content_type(content_type: str, media_type: str, url: str) -> None:
+        if content_type in GENERIC_CONTENT_TYPES:
+            return
+        if content_type.split("/")[0] != media_type:
+            raise ValueError(f"Expected {media_type} at {url}, got {content_type}")
+
     def _validate_image(self, file_path: str) -> None:
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"Image not found: {file_path}")
@@ -79,22 +168,70 @@ class MediaService:
     def _get_media_extension(self, file_path: str, media_type: str) -> str:
         return ".jpg" if media_type == "image" else ".mp4"
 
-    def _get_permanent_media_path(self, media_type: str, extension: str) -> str:
+    def _content_hash(self, file_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def _get_permanent_media_path(
+        self, media_type: str, extension: str, content_hash: str
+    ) -> str:
         media_dir = self.image_dir if media_type == "image" else self.video_dir
+        # Sharded by hash prefix so no directory grows too large.
+        media_dir = os.path.join(media_dir, content_hash[:2])
         permanent_dir = os.path.join(settings.MEDIA_ROOT, media_dir)
         os.makedirs(permanent_dir, exist_ok=True)
-        filename = f"{uuid.uuid4()}{extension}"
-        return os.path.join(media_dir, filename)
+        return os.path.join(media_dir, f"{content_hash}{extension}")
 
     def _store_local_media(self, file_path: str, media_type: str) -> str:
+        # Blocking file I/O; callers run it in a worker thread. Files are
+        # named by content hash and shared between posts, so they are never
+        # removed here: gc_media deletes the ones no post references.
         if media_type == "image":
             self._validate_image(file_path)
         extension = self._get_media_extension(file_path, media_type)
-        permanent_path = self._get_permanent_media_path(media_type, extension)
+        permanent_path = self._get_permanent_media_path(
+            media_type, extension, self._content_hash(file_path)
+        )
 
-        shutil.copy2(file_path, os.path.join(settings.MEDIA_ROOT, permanent_path))
+        target = os.path.join(settings.MEDIA_ROOT, permanent_path)
+        if os.path.exists(target):
+            os.remove(file_path)
+            # A fresh mtime keeps gc_media off the file until the post's rows exist.
+            os.utime(target)
+            self.logger.info(f"Reusing stored {media_type} {permanent_path}")
+        else:
+            self._move_file(file_path, target)
         return permanent_path
 
+    @staticmethod
+    def _move_file(source: str, target: str) -> None:
+        try:
+            os.replace(source, target)
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+
+        # Different filesystems: copy next to the target and rename it into
+        # place, so a half-written file never shows up under its final name.
+        # The temp name is unique, as concurrent stores of the same content
+        # move to the same target.
+        fd, partial = tempfile.mkstemp(
+            dir=os.path.dirname(target), suffix=".part"
+        )
+        os.close(fd)
+        try:
+            shutil.copy2(source, partial)
+            os.replace(partial, target)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+        os.remove(source)
+
     async def validate_media_list(self, media_list: list[dict]) -> None:
         """
         Validate all media in the list before processing.
@@ -114,13 +251,13 @@ class MediaService:
                 raise ValueError(f"Invalid media type: {media_type}")
 
             # For local temp files, validate they exist
-            if path.startswith("/tmp/") and not os.path.exists(path):
+            if self._is_temp_path(path) and not os.path.exists(path):
                 raise FileNotFoundError(f"Temp file not found: {path}")
 
             # For images in temp, validate format
-            if media_type == "image" and path.startswith("/tmp/"):
+            if media_type == "image" and self._is_temp_path(path):
                 try:
-                    self._validate_image(path)
+                    await asyncio.to_thread(self._validate_image, path)
                 except Exception as e:
                     raise ValueError(f"Invalid image file {path}: {e!s}") from e
 
@@ -141,33 +278,27 @@ class MediaService:
         if not media_list:
             return {"images": stored_images, "videos": stored_videos}
 
-        # Process all media first, fail fast if any error
-        for media in media_list:
-            path = media["path"]
-            media_type = media["type"]
-
-            if media_type == "image":
-                # Store temp files, keep URLs as-is
-                if path.startswith("/tmp/"):
-                    stored_path = await self.store_media(path, media_type)
-                    stored_images.append(stored_path)
-                elif self._is_url(path):
-                    # Store remote URL images
-                    stored_images.append(path)
-                elif self._is_local_media_path(path):
-                    # Already stored local file
-                    stored_images.append(path)
-                else:
-                    self.logger.warning(f"Unknown image path format: {path}")
-                    stored_images.append(path)
-
-            elif media_type == "video":
-                # Always store videos locally
-                if not self._is_local_media_path(path):
-                    stored_path = await self.store_media(path, media_type)
-                    stored_videos.append(stored_path)
-                else:
-                    stored_videos.append(path)
+        # Store all media first, in parallel; fail if any of them fails
+        results = await asyncio.gather(
+            *(
+                self._resolve_media(media["path"], media["type"])
+                for media in media_list
+            ),
+            return_exceptions=True,
+        )
+        # Files stored before the failure may be shared with other posts;
+        # gc_media removes them if nothing ends up referencing them.
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
+
+        for media, stored_path in zip(media_list, results, strict=True):
+            if stored_path is None:
+                continue
+            if media["type"] == "image":
+                stored_images.append(stored_path)
+            else:
+                stored_videos.append(stored_path)
 
         # Create database records
         for order, img_path in enumerate(stored_images):
@@ -182,6 +313,23 @@ class MediaService:
 
         return {"images": stored_images, "videos": stored_videos}
 
+    async def _resolve_media(self, path: str, media_type: str) -> str | None:
+        if media_type == "image":
+            # Store temp files, keep URLs as-is
+            if self._is_temp_path(path):
+                return await self.store_media(path, media_type)
+            if not self._is_url(path) and not self._is_local_media_path(path):
+                self.logger.warning(f"Unknown image path format: {path}")
+            return path
+
+        if media_type == "video":
+            # Always store videos locally
+            if not self._is_local_media_path(path):
+                return await self.store_media(path, media_type)
+            return path
+
+        return None
+
     async def store_media(self, file_path_or_url: str, media_type: str) -> str:
         """
         Store media file (local or remote URL) to permanent storage.
@@ -191,13 +339,12 @@ class MediaService:
             media_type: "image" or "video"
 
         Returns:
-            Relative path to stored file (e.g. "posts/images/uuid.jpg")
+            Relative path to stored file (e.g. "posts/images/ab/<sha256>.jpg")
 
         Raises:
             Exception if download or storage fails
         """
         temp_file = None
-        stored_path = None
         original_is_url = self._is_url(file_path_or_url)
 
         try:
@@ -214,7 +361,9 @@ class MediaService:
             if not os.path.exists(file_path):
                 raise FileNotFoundError(f"Media file not found: {file_path}")
 
-            stored_path = self._store_local_media(file_path, media_type)
+            stored_path = await asyncio.to_thread(
+                self._store_local_media, file_path, media_type
+            )
             self.logger.info(f"Stored {media_type} to {stored_path}")
             return stored_path
 
@@ -236,17 +385,6 @@ class MediaService:
             self.logger.error(
                 f"Failed to store media {file_path_or_url}: {e!s}", exc_info=True
             )
-            # If we partially stored the file, try to clean it up
-            if stored_path:
-                try:
-                    full_path = os.path.join(settings.MEDIA_ROOT, stored_path)
-                    if os.path.exists(full_path):
-                        os.remove(full_path)
-                        self.logger.info(f"Cleaned up partial file: {stored_path}")
-                except Exception as cleanup_err:
-                    self.logger.warning(
-                        f"Failed to cleanup partial file: {cleanup_err!s}"
-                    )
             raise
 
         finally:
@@ -0,0 +1,117 @@
+import logging
+from collections.abc import Callable, Iterable
+from datetime import datetime
+from typing import Self, TypeVar
+
+from django.db.models import Max
+from django.utils import timezone
+
+from admin_panel.models import Post, RewriteBatch
+
+T = TypeVar("T")
+
+
+class PostAdmission:
+    """
+    Decides, before any download, scrape or AI call, whether a raw source item
+    can still become a post in the flow.
+
+    Items are rejected when they are not newer than the flow's latest post or
+    their source_id is already posted, which filter_new checks per fetched
+    batch rather than loading the flow's whole history. Admitted ids are
+    remembered, so the same item is not processed twice within one run.
+    """
+
+    def __init__(
+        self,
+        latest_date: datetime | None = None,
+        known_source_ids: Iterable[str] = (),
+        logger: logging.Logger | None = None,
+    ):
+        self.latest_date = self._aware(latest_date)
+        self.known_source_ids = set(known_source_ids) - {None}
+        self.logger = logger or logging.getLogger(__name__)
+
+    @classmethod
+    async def for_flow(cls, flow_id: int) -> Self:
+        return await cls.for_flows([flow_id])
+
+    @classmethod
+    async def for_flows(cls, flow_ids: Iterable[int]) -> Self:
+        """
+        Admission rejecting only what none of the flows can use, for a fetch
+        shared between them: items must be newer than the flows' oldest
+        latest post, and a flow with no dated posts yet accepts any date.
+        """
+        flow_ids = set(flow_ids)
+        latest_dates = [
+            latest
+            async for _, latest in Post.objects.filter(
+                flow_id__in=flow_ids, original_date__isnull=False
+            )
+            .values("flow_id")
+            .annotate(latest=Max("original_date"))
+            .values_list("flow_id", "latest")
+        ]
+        latest_date = (
+            min(latest_dates)
+            if flow_ids and len(latest_dates) == len(flow_ids)
+            else None
+        )
+        # Items still waiting for a Batch API rewrite are not posts yet, so
+        # the filter_new query can't see them.
+        known_source_ids = []
+        async for pending in RewriteBatch.objects.filter(
+            flow_id__in=flow_ids, status=RewriteBatch.PENDING
+        ).values_list("posts", flat=True):
+            known_source_ids.extend(post.get("source_id") for post in pending)
+        return cls(latest_date, known_source_ids)
+
+    def is_stale(self, original_date: datetime | None) -> bool:
+        if not original_date or not self.latest_date:
+            return False
+        return self._aware(original_date) <= self.latest_date
+
+    def admit(self, source_id: str | None, original_date: datetime | None) -> bool:
+        if not source_id or source_id in self.known_source_ids:
+            return False
+        if self.is_stale(original_date):
+            return False
+
+        self.known_source_ids.add(source_id)
+        return True
+
+    async def filter_new(
+        self,
+        items: list[T],
+        source_id: Callable[[T], str | None],
+        original_date: Callable[[T], datetime | None],
+    ) -> list[T]:
+        """
+        Keep the items admit() accepts whose source_id is not used by another
+        flow either, checked with a single query.
+        """
+        ids = {source_id(item) for item in items} - {None}
+        taken = {
+            ident
+            async for ident in Post.objects.filter(
+                source_id__in=ids - self.known_source_ids
+            ).values_list("source_id", flat=True)
+        }
+        self.known_source_ids |= taken
+
+        admitted = [
+            item for item in items if self.admit(source_id(item), original_date(item))
+        ]
+        if len(admitted) < len(items):
+            self.logger.info(
+                f"Skipping {len(items) - len(admitted)}/{len(items)} source items "
+                f"already posted or older than the flow's latest post"
+            )
+        return admitted
+
+    @staticmethod
+    def _aware(value: datetime | None) -> datetime | None:
+        if value and timezone.is_naive(value):
+            return timezone.make_aware(value)
+        return value
@@ -159,13 +159,7 @@ class PostBaseService:
         await self.post_repo.delete(post_id)
 
     async def get_all_posts_in_flow(
-        self, flow_id: int, status: PostStatus
+        self, flow_id: int, status: PostStatus, limit: int = 100
     ) -> list[PostDTO]:
-        posts = await self.post_repo.list(flow_id=flow_id, status=status)
-        posts = await sync_to_async(list)(posts)
-
-        result: list[PostDTO] = []
-        for post in posts:
-            dto = await PostDTO.from_orm_async(post)
-            result.append(dto)
-        return result
+        posts = await self.post_repo.list(flow_id=flow_id, status=status, limit=limit)
+        return [PostDTO.from_prefetched(post) for post in posts]
@@ -0,0 +1,220 @@
+import asyncio
+import json
+import logging
+
+import openai
+from django.utils import timezone
+from openai.types import Batch
+
+from admin_panel.models import Flow, RewriteBatch
+from bot.database.models import PostDTO
+from bot.services.aisettings_service import AISettingsService
+from bot.services.content_processing.deferred_rewrites import DeferredRewrites
+from bot.services.content_processing.llm_cache_service import LLMCacheService
+from bot.services.content_processing.processors import ChatGPTContentProcessor
+from bot.services.content_processing.rate_limiter import OpenAIRateLimiter
+
+# Batch states in which OpenAI may still produce results.
+IN_PROGRESS_STATUSES = ("validating", "in_progress", "finalizing", "cancelling")
+
+
+class BatchRewriteService:
+    """
+    Sends the AI rewrites of scheduled generations through the OpenAI Batch API.
+
+    A generation run submits its deferred rewrites as one batch job and
+    stores the posts waiting for them in a RewriteBatch row; a later
+    scheduled tick picks up the finished job. Rewrites the batch did not
+    return are done with regular requests, so no post is lost.
+    """
+
+    def __init__(
+        self,
+        aisettings_service: AISettingsService,
+        client: openai.AsyncOpenAI | None = None,
+        llm_cache: LLMCacheService | None = None,
+        rate_limiter: OpenAIRateLimiter | None = None,
+        enabled: bool = False,
+        logger: logging.Logger | None = None,
+    ):
+        self.aisettings_service = aisettings_service
+        self.client = client
+        self.llm_cache = llm_cache
+        self.rate_limiter = rate_limiter
+        self._enabled = enabled
+        self.logger = logger or logging.getLogger(__name__)
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled and self.client is not None
+
+    async def submit(
+        self, flow: Flow, deferred: DeferredRewrites, posts: list[PostDTO]
+    ) -> RewriteBatch:
+        requests = self._requests_for(posts, deferred)
+        input_file = await self.client.files.create(
+            file=("rewrites.jsonl", DeferredRewrites.to_jsonl(requests)),
+            purpose="batch",
+        )
+        batch = await self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+            metadata={"flow_id": str(flow.id)},
+        )
+        self.logger.info(
+            f"Submitted batch {batch.id} for flow {flow.id}: "
+            f"{len(requests)} rewrites for {len(posts)} posts"
+        )
+        return await RewriteBatch.objects.acreate(
+            flow_id=flow.id,
+            openai_batch_id=batch.id,
+            requests=requests,
+            posts=[post.model_dump(mode="json") for post in posts],
+        )
+
+    async def rewrite_now(
+        self, flow: Flow, deferred: DeferredRewrites, posts: list[PostDTO]
+    ) -> list[PostDTO]:
+        """Resolve deferred rewrites with regular requests."""
+        requests = self._requests_for(posts, deferred)
+        results = await self._rewrite_missing(flow, requests, {})
+        await self._remember(requests, results)
+        return self._fill_posts(posts, results)
+
+    async def pending_batches(self) -> list[RewriteBatch]:
+        return [
+            batch
+            async for batch in RewriteBatch.objects.filter(
+                status=RewriteBatch.PENDING
+            ).order_by("created_at")
+        ]
+
+    async def has_pending(self, flow_id: int) -> bool:
+        return await RewriteBatch.objects.filter(
+            flow_id=flow_id, status=RewriteBatch.PENDING
+        ).aexists()
+
+    async def finished_job(self, batch: RewriteBatch) -> Batch | None:
+        """Return the OpenAI job of the batch, or None while it is still running."""
+        remote = await self.client.batches.retrieve(batch.openai_batch_id)
+        if remote.status in IN_PROGRESS_STATUSES:
+            return None
+        return remote
+
+    async def collect(
+        self, batch: RewriteBatch, flow: Flow, remote: Batch
+    ) -> list[PostDTO]:
+        """
+        Return the posts of a finished batch with their rewrites filled in.
+        Claim the batch first: rewrites the job did not return are redone
+        with paid regular requests.
+        """
+        results = {}
+        if remote.output_file_id:
+            output = await self.client.files.content(remote.output_file_id)
+            results = self._parse_output(output.text, batch.requests)
+
+        missing = len(batch.requests) - len(results)
+        self.logger.info(
+            f"Batch {batch.openai_batch_id} is {remote.status}: "
+            f"{len(results)} rewrites returned, {missing} to redo"
+        )
+        processor = self._processor(flow)
+        results = {
+            custom_id: processor._enforce_length_limit(result)
+            for custom_id, result in results.items()
+        }
+        results = await self._rewrite_missing(flow, batch.requests, results)
+        await self._remember(batch.requests, results)
+
+        posts = [PostDTO.model_validate(post) for post in batch.posts]
+        return self._fill_posts(posts, results)
+
+    async def claim(self, batch: RewriteBatch, status: str) -> bool:
+        """Mark the batch done; False if another worker got there first."""
+        updated = await RewriteBatch.objects.filter(
+            id=batch.id, status=RewriteBatch.PENDING
+        ).aupdate(status=status, completed_at=timezone.now())
+        return updated == 1
+
+    async def mark_failed(self, batch: RewriteBatch) -> None:
+        await RewriteBatch.objects.filter(id=batch.id).aupdate(
+            status=RewriteBatch.FAILED, completed_at=timezone.now()
+        )
+
+    async def _rewrite_missing(
+        self, flow: Flow, requests: dict[str, dict], results: dict[str, str]
+    ) -> dict[str, str]:
+        processor = self._processor(flow)
+        missing = [custom_id for custom_id in requests if custom_id not in results]
+
+        async def _rewrite(custom_id: str) -> None:
+            request = requests[custom_id]
+            try:
+                results[custom_id] = await processor._call_ai_with_retry(
+                    request["text"], request["system_prompt"]
+                )
+            except Exception as e:
+                self.logger.error(f"Rewrite {custom_id} failed: {e!s}")
+
+        await asyncio.gather(*(_rewrite(custom_id) for custom_id in missing))
+        return results
+
+    async def _remember(
+        self, requests: dict[str, dict], results: dict[str, str]
+    ) -> None:
+        if not self.llm_cache:
+            return
+        for custom_id, result in results.items():
+            if key := requests[custom_id].get("cache_key"):
+                await self.llm_cache.set(key, result)
+
+    @staticmethod
+    def _requests_for(
+        posts: list[PostDTO], deferred: DeferredRewrites
+    ) -> dict[str, dict]:
+        return {
+            custom_id: deferred.requests[custom_id]
+            for post in posts
+            for custom_id in deferred.pending_ids(post.content)
+        }
+
+    def _parse_output(self, output: str, requests: dict[str, dict]) -> dict[str, str]:
+        results = {}
+        for line in output.splitlines():
+            try:
+                item = json.loads(line)
+                response = item.get("response") or {}
+                if response.get("status_code") != 200:
+                    continue
+                content = response["body"]["choices"][0]["message"]["content"]
+            except (ValueError, KeyError, IndexError, TypeError):
+                continue
+            if item.get("custom_id") in requests and content and content.strip():
+                results[item["custom_id"]] = content.strip()
+        return results
+
+    def _fill_posts(
+        self, posts: list[PostDTO], results: dict[str, str]
+    ) -> list[PostDTO]:
+        filled = []
+        for post in posts:
+            content = DeferredRewrites.fill(post.content, results)
+            if content is None:
+                self.logger.warning(
+                    f"No rewrite for post {post.source_id}, skipping post creation"
+                )
+                continue
+            filled.append(post.model_copy(update={"content": content}))
+        return filled
+
+    def _processor(self, flow: Flow) -> ChatGPTContentProcessor:
+        return ChatGPTContentProcessor(
+            client=self.client,
+            flow=flow,
+            aisettings_service=self.aisettings_service,
+            max_retries=5,
+            timeout=30.0,
+            rate_limiter=self.rate_limiter,
+        )
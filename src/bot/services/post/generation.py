@@ -1,17 +1,23 @@
 import asyncio
 import logging
+from collections.abc import AsyncIterator
+from contextlib import nullcontext
 
 from aiogram import Bot
 from asgiref.sync import sync_to_async
-from django.utils import timezone
 
-from admin_panel.models import Post
-from bot.database.exceptions import GenerationLimitExceeded
+from admin_panel.models import Post, RewriteBatch
 from bot.database.models import PostDTO
 from bot.database.repositories import FlowRepository
+from bot.services.content_processing.deferred_rewrites import DeferredRewrites
+from bot.services.content_processing.input_budget import track_token_savings
+from bot.services.content_processing.prompt_cache import FlowPromptCache
 from bot.services.limit_service import LimitService
 from bot.services.logger_service import SyncTelegramLogger, get_logger, init_logger
 from bot.services.post import PostBaseService
+from bot.services.post.admission import PostAdmission
+from bot.services.post.batch_rewrite import BatchRewriteService
+from bot.services.post.source_cursors import SourceCursors
 from bot.services.telegram_userbot import EnhancedUserbotService
 from bot.services.web.web_service import WebService
 
@@ -24,12 +30,14 @@ class PostGenerationService:
         flow_repository: FlowRepository,
         post_base_service: PostBaseService,
         bot: Bot,
+        batch_rewrite_service: BatchRewriteService | None = None,
     ):
         self.userbot_service = userbot_service
         self.web_service = web_service
         self.flow_repo = flow_repository
         self.post_service = post_base_service
         self.bot = bot
+        self.batch_rewrites = batch_rewrite_service
         self.sync_logger = SyncTelegramLogger(bot.token)
         self.limit_service = LimitService()
         self.logger = get_logger()
@@ -46,13 +54,90 @@ class PostGenerationService:
 
         user = await sync_to_async(lambda: flow.channel.user)()
 
-        # Check subscription and limits BEFORE starting generation
+        # Reserve quota BEFORE starting generation, so no source item is
+        # fetched or sent to AI beyond what the user can still create.
+        reserved = await self.limit_service.reserve_generations(
+            user, flow.flow_volume
+        )
+        created_posts: list[PostDTO] = []
+        # Posts waiting for a Batch API result keep their quota until then;
+        # they are added here as soon as the job is submitted.
+        deferred_posts: list[PostDTO] = []
         try:
-            await self.limit_service.check_generations_limit(user, new_generations=0)
-        except GenerationLimitExceeded as e:
-            raise e
+            created_posts = await self._generate_posts(
+                flow, user, reserved, auto_generate, deferred_posts
+            )
+            return created_posts
+        finally:
+            await self.limit_service.release_generations(
+                user, reserved - len(created_posts) - len(deferred_posts)
+            )
+
+    async def complete_rewrite_batches(self) -> int:
+        """
+        Create the posts of every finished Batch API job and return how many
+        were created.
+        """
+        if not self.batch_rewrites or not self.batch_rewrites.enabled:
+            return 0
+
+        if not self.logger:
+            init_logger(self.bot)
+            self.logger = get_logger()
+
+        total = 0
+        for batch in await self.batch_rewrites.pending_batches():
+            try:
+                flow = await self.flow_repo.get_flow_by_id(batch.flow_id)
+                user = await sync_to_async(lambda flow=flow: flow.channel.user)()
+                remote = await self.batch_rewrites.finished_job(batch)
+            except Exception as e:
+                self.logger.error(
+                    f"Failed to check batch {batch.openai_batch_id}: {e!s}"
+                )
+                continue
+            # Claimed before any paid fallback rewrite, so only one worker
+            # ever does that work for a batch.
+            if remote is None or not await self.batch_rewrites.claim(
+                batch, RewriteBatch.COMPLETED
+            ):
+                continue
+
+            created: list[PostDTO] = []
+            try:
+                posts = await self.batch_rewrites.collect(batch, flow, remote)
+                if posts:
+                    created = await self._create_posts_from_dtos(flow, posts)
+            except Exception as e:
+                self.logger.error(
+                    f"Failed to complete batch {batch.openai_batch_id}: {e!s}"
+                )
+                await self.batch_rewrites.mark_failed(batch)
+            finally:
+                await self.limit_service.release_generations(
+                    user, len(batch.posts) - len(created)
+                )
+            total += len(created)
+        return total
+
+    async def has_pending_rewrites(self, flow_id: int) -> bool:
+        if not self.batch_rewrites:
+            return False
+        return await self.batch_rewrites.has_pending(flow_id)
 
-        volumes = self._calculate_volumes(flow)
+    async def _generate_posts(
+        self,
+        flow,
+        user,
+        target: int,
+        auto_generate: bool,
+        deferred_posts: list[PostDTO],
+    ) -> list[PostDTO]:
+        """
+        Return the created posts. Posts left to a Batch API job are appended
+        to deferred_posts.
+        """
+        volumes = self._calculate_volumes(flow, target)
         web_volume = sum([v["volume"] for v in volumes if v["type"] == "web"])
         telegram_volume = sum([v["volume"] for v in volumes if v["type"] == "telegram"])
 
@@ -68,71 +153,59 @@ class PostGenerationService:
             telegram_volume=telegram_volume,
             auto_generate=auto_generate,
         )
-        tasks = []
+        # Stale and already posted items are dropped before any media
+        # download, scrape or AI call.
+        admission = await PostAdmission.for_flow(flow.id)
+        # Fetch positions are stored only after the posts exist.
+        cursors = SourceCursors()
+
+        streams = []
+        source_names: list[str] = []
         for item in volumes:
             if item["volume"] <= 0:
                 continue
             if item["type"] == "telegram":
-                tasks.append(
-                    self.userbot_service.get_last_posts(flow, item, item["volume"])
+                stream = self.userbot_service.stream_posts(
+                    flow, item, item["volume"], admission=admission, cursors=cursors
                 )
             elif item["type"] == "web":
-                tasks.append(
-                    self.web_service.get_last_posts(flow, item, item["volume"])
+                stream = self.web_service.stream_posts(
+                    flow, item, item["volume"], admission=admission, cursors=cursors
                 )
-
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # Group posts by source to ensure even distribution
-        posts_by_source: list[list[PostDTO]] = []
-        source_names: list[str] = []
-
-        for i, r in enumerate(results):
-            source_type = volumes[i].get("type", "unknown")
-            source_link = volumes[i].get("link", "unknown")
-            source_names.append(f"{source_type}:{source_link}")
-
-            if isinstance(r, Exception):
-                self.logger.error(f"Error in source task: {r!s}")
-                posts_by_source.append([])
             else:
-                # Sort each source's posts by date
-                def get_sort_date(post):
-                    date = post.original_date or post.created_at
-                    # Ensure the date is timezone-aware for comparison
-                    if date and timezone.is_naive(date):
-                        date = timezone.make_aware(date)
-                    return date
-
-                source_posts = sorted(r, key=get_sort_date, reverse=True)
-                posts_by_source.append(source_posts)
-
-        # Distribute posts evenly across sources using round-robin
-        combined_posts: list[PostDTO] = []
-        source_indices = [0] * len(posts_by_source)  # Track position in each source
-
-        while len(combined_posts) < flow.flow_volume:
-            added_any = False
-            for source_idx, source_posts in enumerate(posts_by_source):
-                if len(combined_posts) >= flow.flow_volume:
-                    break
-                idx = source_indices[source_idx]
-                if idx < len(source_posts):
-                    combined_posts.append(source_posts[idx])
-                    source_indices[source_idx] += 1
-                    added_any = True
-
-            # If no posts were added in this round, we're out of posts
-            if not added_any:
-                break
+                continue
+            streams.append(stream)
+            source_names.append(f"{item['type']}:{item['link']}")
+
+        # Scheduled runs hand their rewrites to the Batch API when enabled;
+        # interactive generation always waits for them.
+        deferred = None
+        if auto_generate and self.batch_rewrites and self.batch_rewrites.enabled:
+            deferred = DeferredRewrites()
+
+        # All posts of the run share one AISettings lookup per flow.
+        with FlowPromptCache().activate(), track_token_savings() as savings, (
+            deferred.activate() if deferred else nullcontext()
+        ):
+            combined_posts, per_source = await self._collect_round_robin(
+                streams, target
+            )
+
+        if savings.texts:
+            logging.info(
+                f"Input trimming for flow {flow.id}: {savings.tokens_in} -> "
+                f"{savings.tokens_out} tokens across {savings.texts} texts "
+                f"({savings.saved} saved)"
+            )
 
         # Log distribution
         distribution_info = ", ".join(
-            [f"{source_names[i]}: {count}" for i, count in enumerate(source_indices)]
+            f"{name}: {count}"
+            for name, count in zip(source_names, per_source, strict=True)
         )
         logging.info(
             f"Post distribution across sources - {distribution_info} | "
-            f"Total: {len(combined_posts)}/{flow.flow_volume}"
+            f"Total: {len(combined_posts)}/{target}"
         )
 
         # Check if no posts were generated
@@ -140,7 +213,7 @@ class PostGenerationService:
             error_msg = (
                 f"⚠️ <b>Не вдалося згенерувати пости</b>\n\n"
                 f"Flow: <code>{flow.name}</code> (ID: {flow.id})\n"
-                f"Джерел: {len(results)}\n\n"
+                f"Джерел: {len(streams)}\n\n"
                 f"Можливі причини:\n"
                 f"• Вичерпана квота OpenAI API\n"
                 f"• Помилки обробки контенту\n\n"
@@ -158,53 +231,126 @@ class PostGenerationService:
                 result="0 posts generated - all posts failed AI processing",
                 auto_generate=auto_generate,
             )
+            await cursors.save(self.flow_repo, flow.id, set())
             return []
 
-        try:
-            await self.limit_service.check_generations_limit(
-                user, new_generations=len(combined_posts)
-            )
-        except GenerationLimitExceeded as e:
-            if not allow_partial:
-                raise e
-            tariff = await self.limit_service.get_user_tariff(user)
-            remaining = tariff.generations_available - user.generated_posts_count
-
-            # If no posts can be created due to limit, always raise
-            if remaining <= 0:
-                raise e
-
-            combined_posts = combined_posts[:remaining]
-            logging.warning(
-                f"Generation limit reached: trimmed to {remaining} posts "
-                f"(user has {user.generated_posts_count}/{tariff.generations_available})"
+        if deferred:
+            combined_posts = await self._defer_rewrites(
+                flow, deferred, combined_posts, deferred_posts
             )
 
         self.sync_logger.generation_completed(
             user=user,
             flow_name=flow.name,
             flow_id=flow.id,
-            result=f"{len(combined_posts)} posts generated from {len(results)} sources",
+            result=(
+                f"{len(combined_posts)} posts generated from {len(streams)} sources"
+                + (
+                    f", {len(deferred_posts)} waiting for batch rewrite"
+                    if deferred_posts
+                    else ""
+                )
+            ),
             auto_generate=auto_generate,
         )
 
-        created_posts = await self._create_posts_from_dtos(flow, combined_posts)
-        logging.info(f"generate_auto_posts: _create_posts_from_dtos returned {len(created_posts)} posts")
-        user.generated_posts_count += len(created_posts)
-        await sync_to_async(user.save)()
+        created_posts = (
+            await self._create_posts_from_dtos(flow, combined_posts)
+            if combined_posts
+            else []
+        )
+        await cursors.save(
+            self.flow_repo, flow.id, {post.source_id for post in created_posts}
+        )
         logging.info(f"generate_auto_posts: Returning {len(created_posts)} posts")
         return created_posts
 
-    def _calculate_volumes(self, flow) -> list[dict]:
-        total_volume = flow.flow_volume
+    async def _defer_rewrites(
+        self,
+        flow,
+        deferred: DeferredRewrites,
+        posts: list[PostDTO],
+        submitted: list[PostDTO],
+    ) -> list[PostDTO]:
+        """
+        Submit the posts still waiting for a rewrite as one Batch API job.
+
+        Returns the posts ready now; those left to the job are appended to
+        submitted as soon as it exists. If the job can't be submitted the
+        rewrites are done right away instead.
+        """
+        ready = [post for post in posts if not deferred.pending_ids(post.content)]
+        waiting = [post for post in posts if deferred.pending_ids(post.content)]
+        if not waiting:
+            return ready
+
+        try:
+            await self.batch_rewrites.submit(flow, deferred, waiting)
+        except Exception as e:
+            self.logger.error(
+                f"Batch submission failed for flow {flow.id}, "
+                f"rewriting {len(waiting)} posts now: {e!s}"
+            )
+            return ready + await self.batch_rewrites.rewrite_now(
+                flow, deferred, waiting
+            )
+        submitted.extend(waiting)
+
+        # The staged media of these posts is only stored once the batch
+        # completes, so userbot shutdown must not delete it in between.
+        self.userbot_service.keep_temp_files(
+            media.url for post in waiting for media in [*post.images, *post.videos]
+        )
+        return ready
+
+    async def _collect_round_robin(
+        self, streams: list[AsyncIterator[PostDTO]], target: int
+    ) -> tuple[list[PostDTO], list[int]]:
+        """
+        Take posts from the source streams in turns until target are ready.
+
+        Each round pulls the next post from every live stream concurrently, so
+        sources keep being processed in parallel; once target is reached the
+        streams are closed and their remaining AI work is never started.
+        """
+        combined: list[PostDTO] = []
+        per_source = [0] * len(streams)
+        live = list(range(len(streams)))
+
+        try:
+            while live and len(combined) < target:
+                results = await asyncio.gather(
+                    *(anext(streams[i]) for i in live), return_exceptions=True
+                )
+                still_live = []
+                for i, result in zip(live, results, strict=True):
+                    if isinstance(result, StopAsyncIteration):
+                        continue
+                    if isinstance(result, BaseException):
+                        self.logger.error(f"Error in source stream: {result!s}")
+                        continue
+                    still_live.append(i)
+                    if len(combined) < target:
+                        combined.append(result)
+                        per_source[i] += 1
+                live = still_live
+        finally:
+            for stream in streams:
+                await stream.aclose()
+
+        return combined, per_source
+
+    def _calculate_volumes(self, flow, total_volume: int | None = None) -> list[dict]:
+        total_volume = total_volume or flow.flow_volume
         sources = flow.sources
 
         total_sources = len(sources)
         if total_sources == 0:
             return []
 
-        # Request more posts than needed to account for duplicates and errors
-        # We'll fetch 2x the desired amount, then trim to exact count later
+        # Request more posts than needed to account for duplicates and errors.
+        # Only the fetch is buffered: the streams stop before AI once
+        # flow_volume posts are ready.
         buffer_multiplier = 2
         buffered_volume = total_volume * buffer_multiplier
 
@@ -224,6 +370,9 @@ class PostGenerationService:
         """
         Creates posts from DTOs with proper error handling.
 
+        Stale and duplicate items were already rejected by PostAdmission before
+        processing; create_post still guards against concurrent duplicates.
+
         Note: Posts are never deleted - all posts are kept in DB as history/backup.
         Dialogs only display the latest flow_volume posts.
         New posts gradually replace old ones in the display as they are generated.
@@ -231,12 +380,6 @@ class PostGenerationService:
         logging.info(f"_create_posts_from_dtos: Starting with {len(post_dtos)} post DTOs for flow {flow.id}")
         semaphore = asyncio.Semaphore(10)
 
-        # Get latest post date once to avoid multiple DB queries
-        latest_post = await sync_to_async(
-            Post.objects.filter(flow=flow).order_by("-original_date").first
-        )()
-        latest_date = latest_post.original_date if latest_post and latest_post.original_date else None
-
         # Create new posts with proper error handling
         async def _process_single_post(post_dto: PostDTO) -> PostDTO | None:
             async with semaphore:
@@ -246,24 +389,6 @@ class PostGenerationService:
                         logging.warning("Post DTO has no source_id, skipping")
                         return None
 
-                    # Skip if post is older than existing posts
-                    if post_dto.original_date and latest_date:
-                        # Make both datetimes timezone-aware for comparison
-                        post_date = post_dto.original_date
-                        if timezone.is_naive(post_date):
-                            post_date = timezone.make_aware(post_date)
-
-                        latest_date_aware = latest_date
-                        if timezone.is_naive(latest_date_aware):
-                            latest_date_aware = timezone.make_aware(latest_date_aware)
-
-                        if post_date <= latest_date_aware:
-                            logging.info(
-                                f"Skipping old post {post_dto.source_id} from {post_date} "
-                                f"(latest in DB: {latest_date_aware})"
-                            )
-                            return None
-
                     media_list = self._prepare_media_list(post_dto)
 
                     # create_post now handles duplicate checking internally
@@ -302,9 +427,7 @@ class PostGenerationService:
         logging.info(f"_create_posts_from_dtos: Created {len(created_posts)} posts out of {len(post_dtos)} DTOs")
         skipped_count = len(post_dtos) - len(created_posts)
         if skipped_count > 0:
-            logging.info(
-                f"Skipped {skipped_count} posts (duplicates or older than existing)"
-            )
+            logging.info(f"Skipped {skipped_count} posts (duplicates or failed)")
 
         # Count posts for statistics (no deletion, just reporting)
         draft_count = await sync_to_async(
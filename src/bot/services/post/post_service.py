@@ -7,9 +7,11 @@ from bot.database.models import PostDTO, PostStatus
 from bot.database.repositories import FlowRepository, PostRepository
 from bot.services.media_service import MediaService
 from bot.services.post.base import PostBaseService
+from bot.services.post.batch_rewrite import BatchRewriteService
 from bot.services.post.generation import PostGenerationService
 from bot.services.post.publish import PostPublishingService
 from bot.services.post.scheduling import PostSchedulingService
+from bot.services.telegram_media_cache import TelegramMediaCache
 from bot.services.telegram_userbot.enhanced_userbot_service import (
     EnhancedUserbotService,
 )
@@ -24,17 +26,27 @@ class PostService:
         userbot_service: EnhancedUserbotService,
         post_repository: PostRepository,
         flow_repository: FlowRepository,
+        batch_rewrite_service: BatchRewriteService | None = None,
+        media_cache: TelegramMediaCache | None = None,
+        media_service: MediaService | None = None,
     ) -> None:
         self.bot = bot
         self.flow_repo = flow_repository
-        self.media_service = MediaService()
+        self.media_service = media_service or MediaService()
         self.base_service = PostBaseService(post_repository, self.media_service)
-        self.publishing_service = PostPublishingService(bot, self.base_service)
+        self.publishing_service = PostPublishingService(
+            bot, self.base_service, media_cache
+        )
         self.scheduling_service = PostSchedulingService(
             self.base_service, self.publishing_service
         )
         self.generation_service = PostGenerationService(
-            userbot_service, web_service, flow_repository, self.base_service, bot
+            userbot_service,
+            web_service,
+            flow_repository,
+            self.base_service,
+            bot,
+            batch_rewrite_service,
         )
 
     async def get_post(self, post_id: int) -> PostDTO:
@@ -47,9 +59,9 @@ class PostService:
         await self.base_service.delete_post(post_id)
 
     async def get_all_posts_in_flow(
-        self, flow_id: int, status: PostStatus
+        self, flow_id: int, status: PostStatus, limit: int = 100
     ) -> list[PostDTO]:
-        return await self.base_service.get_all_posts_in_flow(flow_id, status)
+        return await self.base_service.get_all_posts_in_flow(flow_id, status, limit)
 
     async def publish_post(self, post_id: int, channel_id: str) -> PostDTO:
         return await self.publishing_service.publish_post(post_id, channel_id)
@@ -73,6 +85,12 @@ class PostService:
             flow_id, allow_partial, auto_generate
         )
 
+    async def complete_rewrite_batches(self) -> int:
+        return await self.generation_service.complete_rewrite_batches()
+
+    async def has_pending_rewrites(self, flow_id: int) -> bool:
+        return await self.generation_service.has_pending_rewrites(flow_id)
+
     async def create_post(
         self,
         flow_id: int,
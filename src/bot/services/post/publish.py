@@ -13,14 +13,21 @@ from admin_panel.models import Post
 from bot.database.exceptions import InvalidOperationError
 from bot.database.models import PostDTO, PostStatus
 from bot.services.post.base import PostBaseService
+from bot.services.telegram_media_cache import TelegramMediaCache
 
 logger = logging.getLogger(__name__)
 
 
 class PostPublishingService:
-    def __init__(self, bot: Bot, post_base_service: PostBaseService):
+    def __init__(
+        self,
+        bot: Bot,
+        post_base_service: PostBaseService,
+        media_cache: TelegramMediaCache | None = None,
+    ):
         self.bot = bot
         self.post_service = post_base_service
+        self.media_cache = media_cache or TelegramMediaCache()
 
     async def publish_post(self, post_id: int, channel_id: str) -> PostDTO:
         """
@@ -121,7 +128,7 @@ class PostPublishingService:
                 caption_added = True
 
         if media_group:
-            await self.bot.send_media_group(chat_id=channel_id, media=media_group)
+            await self.media_cache.send_media_group(self.bot, channel_id, media_group)
 
     def _create_media_item(self, image, caption: str | None = None) -> InputMediaPhoto:
         if image.url.startswith(("http://", "https://")):
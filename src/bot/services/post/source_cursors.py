@@ -0,0 +1,77 @@
+import logging
+from collections.abc import Iterable
+
+from bot.database.repositories import FlowRepository
+
+
+class SourceCursors:
+    """
+    Fetch positions reached by one generation run, saved once its posts exist.
+
+    Source streams only report what they fetched; nothing is written until
+    the run has created its posts. A Telegram cursor then moves up to just
+    below the oldest fetched item that did not become a post, and a feed's
+    etag / last_modified are kept only if every entry it returned did.
+    Items that were never reached or failed AI are fetched again next run.
+    """
+
+    def __init__(self, logger: logging.Logger | None = None):
+        self.logger = logger or logging.getLogger(__name__)
+        self._telegram: dict[str, tuple[int, int, dict[str, int]]] = {}
+        self._feeds: dict[str, tuple[dict, set[str]]] = {}
+
+    def track_telegram(
+        self,
+        link: str,
+        current_id: int,
+        reached_id: int | None,
+        items: dict[str, int],
+    ) -> None:
+        """
+        Record a Telegram fetch. reached_id is the highest message id the
+        cursor may pass, items maps each fetched post's source_id to its
+        oldest message id.
+        """
+        if reached_id:
+            self._telegram[link] = (current_id, reached_id, dict(items))
+
+    def track_feed(
+        self, link: str, validators: dict, source_ids: Iterable[str]
+    ) -> None:
+        """Record a fully read feed and the source_ids of its entries."""
+        self._feeds[link] = (dict(validators), set(source_ids) - {None})
+
+    def pending(self, created_source_ids: set[str]) -> dict[str, dict]:
+        """Return the cursor fields to store per source link."""
+        updates = {}
+        for link, (current_id, reached_id, items) in self._telegram.items():
+            cursor = min(
+                [reached_id]
+                + [
+                    message_id - 1
+                    for source_id, message_id in items.items()
+                    if source_id not in created_source_ids
+                ]
+            )
+            if cursor > current_id:
+                updates[link] = {"last_message_id": cursor}
+
+        for link, (validators, source_ids) in self._feeds.items():
+            validators = {k: v for k, v in validators.items() if v is not None}
+            if validators and source_ids <= created_source_ids:
+                updates[link] = validators
+        return updates
+
+    async def save(
+        self,
+        flow_repository: FlowRepository,
+        flow_id: int,
+        created_source_ids: set[str],
+    ) -> None:
+        for link, fields in self.pending(created_source_ids).items():
+            try:
+                await flow_repository.update_source_fields(flow_id, link, fields)
+            except Exception as e:
+                self.logger.warning(
+                    f"Failed to save cursor for {link} in flow {flow_id}: {e}"
+                )
@@ -0,0 +1,171 @@
+import logging
+import os
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import FSInputFile, InputMediaPhoto, InputMediaVideo, Message
+from django.conf import settings
+
+from admin_panel.models import TelegramMediaFile
+
+InputMedia = InputMediaPhoto | InputMediaVideo
+
+
+class TelegramMediaCache:
+    """
+    Reuses Telegram file_ids of media files that were already uploaded.
+
+    The first send of a local file uploads it and stores the file_id Telegram
+    returns, keyed by its path under MEDIA_ROOT; previews and publishing of
+    the same file then send the file_id instead of the bytes. If Telegram
+    rejects a group, the stored file_ids it no longer knows are dropped and
+    only those files are uploaded again.
+    """
+
+    def __init__(self, logger: logging.Logger | None = None):
+        self.logger = logger or logging.getLogger(__name__)
+
+    async def send_media_group(
+        self, bot: Bot, chat_id: int | str, media: list[InputMedia]
+    ) -> list[Message]:
+        keys = [self._key(item) for item in media]
+        file_ids = await self._lookup([key for key in keys if key])
+        cached = {
+            index: file_ids[key]
+            for index, key in enumerate(keys)
+            if key in file_ids
+        }
+
+        while True:
+            try:
+                return await self._send(bot, chat_id, media, keys, cached)
+            except TelegramBadRequest as e:
+                if not cached:
+                    raise
+                stale = await self._stale(bot, cached)
+                self.logger.warning(
+                    f"Telegram rejected cached media, uploading "
+                    f"{len(stale) or 'all'} of {len(cached)} files again: {e!s}"
+                )
+                await self._forget([keys[index] for index in stale])
+                # When no file_id is found stale, the whole group is uploaded.
+                cached = (
+                    {i: file_id for i, file_id in cached.items() if i not in stale}
+                    if stale
+                    else {}
+                )
+
+    async def _send(
+        self,
+        bot: Bot,
+        chat_id: int | str,
+        media: list[InputMedia],
+        keys: list[str | None],
+        cached: dict[int, str],
+    ) -> list[Message]:
+        messages = await bot.send_media_group(
+            chat_id=chat_id,
+            media=[
+                item.model_copy(update={"media": cached[index]})
+                if index in cached
+                else item
+                for index, item in enumerate(media)
+            ],
+        )
+        await self._remember(media, keys, messages, skip=cached)
+        return messages
+
+    async def _stale(self, bot: Bot, cached: dict[int, str]) -> set[int]:
+        """Indexes of cached file_ids Telegram no longer knows."""
+        stale = set()
+        for index, file_id in cached.items():
+            try:
+                await bot.get_file(file_id)
+            except TelegramBadRequest as e:
+                # getFile refuses files over 20 MB even when the file_id is valid.
+                if "too big" not in e.message:
+                    stale.add(index)
+            except Exception as e:
+                self.logger.warning(f"Failed to check Telegram file_id: {e!s}")
+        return stale
+
+    @staticmethod
+    def _key(item: InputMedia) -> str | None:
+        if not isinstance(item.media, FSInputFile):
+            return None
+        path = os.path.abspath(item.media.path)
+        root = os.path.abspath(settings.MEDIA_ROOT)
+        if os.path.commonpath([path, root]) == root:
+            path = os.path.relpath(path, root)
+        return path if len(path) <= 500 else None
+
+    async def _lookup(self, keys: list[str]) -> dict[str, str]:
+        if not keys:
+            return {}
+        try:
+            return {
+                path: file_id
+                async for path, file_id in TelegramMediaFile.objects.filter(
+                    path__in=keys
+                ).values_list("path", "file_id")
+            }
+        except Exception as e:
+            self.logger.warning(f"Telegram media cache lookup failed: {e!s}")
+            return {}
+
+    async def _remember(
+        self,
+        media: list[InputMedia],
+        keys: list[str | None],
+        messages: list[Message],
+        skip: dict[int, str] | None = None,
+    ) -> None:
+        skip = skip or {}
+        files = []
+        # Telegram returns one message per item, in the order they were sent.
+        for index, (item, key, message) in enumerate(
+            zip(media, keys, messages, strict=False)
+        ):
+            if not key or index in skip:
+                continue
+            file_id = self._file_id(message)
+            if not file_id:
+                continue
+            files.append(
+                TelegramMediaFile(
+                    path=key,
+                    media_type=(
+                        TelegramMediaFile.VIDEO
+                        if isinstance(item, InputMediaVideo)
+                        else TelegramMediaFile.IMAGE
+                    ),
+                    file_id=file_id,
+                )
+            )
+
+        if not files:
+            return
+        try:
+            await TelegramMediaFile.objects.abulk_create(
+                files,
+                update_conflicts=True,
+                unique_fields=["path"],
+                update_fields=["media_type", "file_id", "updated_at"],
+            )
+        except Exception as e:
+            self.logger.warning(f"Failed to store Telegram file_ids: {e!s}")
+
+    async def _forget(self, keys: list[str]) -> None:
+        try:
+            await TelegramMediaFile.objects.filter(path__in=keys).adelete()
+        except Exception as e:
+            self.logger.warning(f"Failed to drop Telegram file_ids: {e!s}")
+
+    @staticmethod
+    def _file_id(message: Message) -> str | None:
+        if message.photo:
+            return message.photo[-1].file_id
+        for media in (message.video, message.animation, message.document):
+            if media:
+                return media.file_id
+        return None
@@ -1,16 +1,27 @@
+from __future__ import annotations
+
 import asyncio
 import logging
 import os
 import time
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
 
 from aiofiles import tempfile
 from aiogram import Bot
+from django.conf import settings
 from telethon import TelegramClient
+from telethon.errors import FloodWaitError
 
 from admin_panel.models import Post
+from bot.services.feed_fetch_coordinator import FeedFetchCoordinator
 
+from ..types import RateLimitError
 from .client_manager import TelegramClientManager
 
+if TYPE_CHECKING:
+    from bot.services.post.admission import PostAdmission
+
 
 class BaseUserbotService:
     def __init__(
@@ -20,6 +31,7 @@ class BaseUserbotService:
         bot: Bot,
         phone: str | None = None,
         session_path: str | None = None,
+        session_paths: list[str] | None = None,
     ):
         self.phone = phone
         self.download_semaphore = asyncio.Semaphore(10)
@@ -31,6 +43,7 @@ class BaseUserbotService:
             api_hash=api_hash,
             phone=phone,
             session_path=session_path,
+            session_paths=session_paths,
             bot=bot,
         )
 
@@ -43,42 +56,155 @@ class BaseUserbotService:
                 self.logger.error(f"Error deleting temp file {file_path}: {e!s}")
         self._temp_files.clear()
 
+    def keep_temp_files(self, paths: Iterable[str]) -> None:
+        """Stop tracking downloads that must outlive this service."""
+        self._temp_files.difference_update(paths)
+
+    async def stop(self):
+        await self.client_manager.close()
+        self.cleanup_temp_files()
+
     async def get_last_posts(self, source: dict, limit: int = 10) -> list[dict] | None:
-        result = []
-        processed_albums = set()
+        posts, _ = await self.fetch_source_posts(source, limit)
+        for post in posts or []:
+            await self.download_post_media(post)
+        return posts
+
+    async def fetch_source_posts(
+        self, source: dict, limit: int = 10, admission: PostAdmission | None = None
+    ) -> tuple[list[dict] | None, int | None]:
+        """
+        Fetch new posts from a Telegram source.
+
+        Only messages newer than source["last_message_id"] are requested, and
+        messages rejected by admission are skipped. Media is not downloaded
+        here: download_post_media() fetches it for the posts that are kept.
+        Returns the posts and the highest message id the source's cursor may
+        advance to once they are posts. Inside a scheduled cycle the channel
+        is read once for all flows subscribed to it and the posts are split
+        between them.
+        """
+        coordinator = FeedFetchCoordinator.current()
+        if coordinator is None:
+            return await self._fetch_source_posts(source, limit, admission)
+
+        key = coordinator.telegram_key(source)
+        posts, newest_id = await coordinator.fetch_once(
+            key, lambda: self._fetch_shared_source_posts(source, limit, coordinator)
+        )
+        if posts is None:
+            return None, None
+
+        # The shared read only skipped what no subscribed flow can use.
+        if admission is not None:
+            posts = await admission.filter_new(
+                posts,
+                source_id=lambda p: p["source_id"],
+                original_date=lambda p: p["original_date"],
+            )
+        claimed = coordinator.claim(key, posts, limit, lambda p: p["source_id"])
+        return claimed, newest_id
+
+    async def _fetch_shared_source_posts(
+        self, source: dict, limit: int, coordinator: FeedFetchCoordinator
+    ) -> tuple[list[dict] | None, int | None]:
+        # Imported here: the post package imports this service.
+        from bot.services.post.admission import PostAdmission
+
+        key = coordinator.telegram_key(source)
+        admission = await PostAdmission.for_flows(coordinator.subscriber_flow_ids(key))
+        return await self._fetch_source_posts(
+            source, limit * coordinator.subscribers(key), admission
+        )
+
+    async def download_post_media(self, raw_post: dict) -> dict:
+        """
+        Download the media of a fetched post in place.
+
+        Telegram file references belong to the account that read the message,
+        so the download goes through the same userbot session.
+        """
+        pending = [item for item in raw_post.get("media", []) if "path" not in item]
+        if not pending:
+            return raw_post
+
+        try:
+            async with self.client_manager.get_client(
+                raw_post.get("session_path")
+            ) as client:
+                downloaded = await self._download_media_batch(client, pending)
+        except Exception as e:
+            self.logger.error(
+                f"Media download failed for {raw_post.get('source_id')}: {e!s}"
+            )
+            downloaded = []
+
+        raw_post["media"] = [
+            item for item in raw_post["media"] if "path" in item
+        ] + downloaded
+        return raw_post
+
+    async def _fetch_source_posts(
+        self, source: dict, limit: int, admission: PostAdmission | None = None
+    ) -> tuple[list[dict] | None, int | None]:
         total_posts_needed = limit
+        attempts = self.client_manager.session_count
+        min_id = int(source.get("last_message_id") or 0)
 
-        async with self.client_manager.get_client() as client:
-            if len(result) >= total_posts_needed:
-                return result[:total_posts_needed]
+        for attempt in range(1, attempts + 1):
+            result = []
+            processed_albums = set()
 
             try:
-                remaining_for_source = limit
-                if remaining_for_source <= 0:
-                    return result[:total_posts_needed]
-
-                entity = await self.client_manager.get_entity(client, source["link"])
-                if not entity:
-                    return
-
-                await self._process_source_messages(
-                    client,
-                    entity,
-                    source,
-                    remaining_for_source,
-                    result,
-                    processed_albums,
-                    total_posts_needed,
+                async with self.client_manager.get_client() as client:
+                    entity = await self.client_manager.get_entity(
+                        client, source["link"]
+                    )
+                    if not entity:
+                        return None, None
+
+                    newest_id = await self._process_source_messages(
+                        client,
+                        entity,
+                        source,
+                        limit,
+                        result,
+                        processed_albums,
+                        total_posts_needed,
+                        min_id=min_id,
+                        admission=admission,
+                    )
+                    session_path = self.client_manager.session_of(client)
+
+            except FloodWaitError as e:
+                self.logger.warning(
+                    f"FloodWait {e.seconds}s on {source['link']} "
+                    f"(attempt {attempt}/{attempts}), switching session"
                 )
+                continue
+
+            except RateLimitError as e:
+                self.logger.warning(f"Skipping source {source['link']}: {e!s}")
+                return None, None
 
             except Exception as e:
                 self.logger.error(f"Error processing source {source['link']}: {e!s}")
-                return
+                return None, None
+
+            self.logger.warning(
+                f"Final result length: {len(result)} | Needed: {total_posts_needed}"
+            )
+            self.logger.info(
+                f"Userbot session stats: {self.client_manager.get_session_stats()}"
+            )
+            for post in result:
+                post["session_path"] = session_path
+            return result[:total_posts_needed], newest_id
 
         self.logger.warning(
-            f"Final result length: {len(result)} | Needed: {total_posts_needed}"
+            f"All {attempts} userbot sessions hit FloodWait for {source['link']}"
         )
-        return result[:total_posts_needed]
+        return None, None
 
     async def _process_source_messages(
         self,
@@ -89,19 +215,66 @@ class BaseUserbotService:
         result,
         processed_albums,
         total_posts_needed,
-    ):
-        messages = await client.get_messages(entity, limit=remaining_for_source * 3)
+        min_id: int = 0,
+        admission: PostAdmission | None = None,
+    ) -> int | None:
+        fetch_limit = remaining_for_source * 3
+        messages = await client.get_messages(
+            entity, limit=fetch_limit, min_id=min_id
+        )
+        if not messages:
+            self.logger.info(f"No new messages in {source['link']} after id {min_id}")
+            return None
 
-        for msg in messages:
+        if admission is not None:
+            admitted = await admission.filter_new(
+                messages,
+                source_id=lambda msg: self._build_source_id(msg, entity),
+                original_date=lambda msg: msg.date,
+            )
+            skipped_ids = {msg.id for msg in messages} - {msg.id for msg in admitted}
+        else:
+            existing_source_ids = await self._get_existing_source_ids(
+                messages, entity
+            )
+            skipped_ids = {
+                msg.id
+                for msg in messages
+                if self._build_source_id(msg, entity) in existing_source_ids
+            }
+        albums = self._group_albums(messages)
+
+        # Albums touching the oldest message of a full batch may continue
+        # past it; only those need a separate fetch of their siblings.
+        batch_edge_id = (
+            min(msg.id for msg in messages) if len(messages) >= fetch_limit else None
+        )
+
+        # The cursor may pass everything up to the newest message, unless the
+        # loop stops early: then only what lies below the first message left.
+        reached_id = max(msg.id for msg in messages)
+        for index, msg in enumerate(messages):
             if len(result) >= total_posts_needed:
+                reached_id = min(m.id for m in messages[index:]) - 1
                 break
 
+            if msg.id in skipped_ids:
+                if getattr(msg, "grouped_id", None):
+                    processed_albums.add(msg.grouped_id)
+                continue
+
             if await self._contains_external_links(client, msg, entity):
                 self.logger.info("Post contains external link. PASS")
                 continue
 
             post_data, post_count = await self._process_message_or_album(
-                client, entity, msg, source["link"], processed_albums
+                client,
+                entity,
+                msg,
+                source["link"],
+                processed_albums,
+                albums=albums,
+                batch_edge_id=batch_edge_id,
             )
 
             if post_data is None:
@@ -114,6 +287,8 @@ class BaseUserbotService:
                 f"(size {post_count}). Result: {len(result)}/{total_posts_needed}"
             )
 
+        return reached_id
+
     async def _contains_external_links(self, client, message, channel_entity) -> bool:
         if not message.entities:
             return False
@@ -147,27 +322,61 @@ class BaseUserbotService:
 
         return False
 
-    async def _process_message_or_album(
-        self, client, entity, msg, source_link, processed_albums
-    ) -> tuple[dict | None, int]:
+    def _build_source_id(self, msg, entity) -> str:
         chat_id = msg.chat_id if hasattr(msg, "chat_id") else entity.id
+        if getattr(msg, "grouped_id", None):
+            return f"telegram_{chat_id}_album_{msg.grouped_id}"
+        return f"telegram_{chat_id}_{msg.id}"
+
+    async def _get_existing_source_ids(self, messages, entity) -> set[str]:
+        candidate_ids = {self._build_source_id(msg, entity) for msg in messages}
+        if not candidate_ids:
+            return set()
+
+        existing = {
+            source_id
+            async for source_id in Post.objects.filter(
+                source_id__in=candidate_ids
+            ).values_list("source_id", flat=True)
+        }
+        if existing:
+            self.logger.info(
+                f"Skipping {len(existing)}/{len(candidate_ids)} posts already in DB"
+            )
+        return existing
+
+    def _group_albums(self, messages) -> dict[int, list]:
+        albums: dict[int, list] = {}
+        for msg in messages:
+            if getattr(msg, "grouped_id", None):
+                albums.setdefault(msg.grouped_id, []).append(msg)
+        return albums
 
-        # Removed date check - source_id check below is sufficient for deduplication
-        # Date check was too aggressive and blocked posts that weren't in DB
+    async def _process_message_or_album(
+        self,
+        client,
+        entity,
+        msg,
+        source_link,
+        processed_albums,
+        albums: dict[int, list] | None = None,
+        batch_edge_id: int | None = None,
+    ) -> tuple[dict | None, int]:
+        source_id = self._build_source_id(msg, entity)
 
         if hasattr(msg, "grouped_id") and msg.grouped_id:
             if msg.grouped_id in processed_albums:
                 return None, 0
 
-            source_id = f"telegram_{chat_id}_album_{msg.grouped_id}"
-
-            if await Post.objects.filter(source_id=source_id).aexists():
-                processed_albums.add(msg.grouped_id)
-                logging.warning(f"Album {msg.grouped_id} already exists in DB")
-                return None, 0
-
             processed_albums.add(msg.grouped_id)
-            post_data = await self._process_album(client, entity, msg, source_link)
+            album_messages = (albums or {}).get(msg.grouped_id)
+            if album_messages and batch_edge_id is not None:
+                if any(m.id == batch_edge_id for m in album_messages):
+                    album_messages = None
+
+            post_data = await self._process_album(
+                client, entity, msg, source_link, album_messages
+            )
             if not post_data:
                 return None, 0
 
@@ -175,12 +384,6 @@ class BaseUserbotService:
             post_data["source_id"] = source_id
             return post_data, album_size
         else:
-            source_id = f"telegram_{chat_id}_{msg.id}"
-
-            if await Post.objects.filter(source_id=source_id).aexists():
-                logging.warning(f"Message {msg.id} already exists in DB")
-                return None, 0
-
             post_data = await self._process_message(client, msg, source_link)
             if not post_data:
                 return None, 0
@@ -203,19 +406,23 @@ class BaseUserbotService:
         return source_limits
 
     async def _process_album(
-        self, client: TelegramClient, entity, initial_msg, source_url: str
+        self,
+        client: TelegramClient,
+        entity,
+        initial_msg,
+        source_url: str,
+        album_messages: list | None = None,
     ) -> dict | None:
         try:
-            messages = await client.get_messages(
-                entity, min_id=initial_msg.id - 10, max_id=initial_msg.id + 10, limit=20
-            )
+            if not album_messages:
+                album_messages = await self._fetch_album_messages(
+                    client, entity, initial_msg
+                )
 
-            album_messages = {
-                msg.id: msg
-                for msg in messages
-                if hasattr(msg, "grouped_id")
-                and msg.grouped_id == initial_msg.grouped_id
-            }.values()
+            album_messages = sorted(
+                {msg.id: msg for msg in album_messages}.values(),
+                key=lambda msg: msg.id,
+            )
 
             if not album_messages:
                 return None
@@ -233,18 +440,15 @@ class BaseUserbotService:
                             seen_media.add(m["file_id"])
                             all_media.append(m)
 
-            downloaded_media = (
-                await self._download_media_batch(client, all_media) if all_media else []
-            )
-
             original_link = f"https://t.me/c/{entity.id}/{initial_msg.id}"
 
             post_data = {
                 "original_content": "\n\n".join(texts) if texts else "",
                 "text": "\n\n".join(texts) if texts else "",
-                "media": downloaded_media,
+                "media": all_media,
                 "is_album": True,
                 "album_size": len(album_messages),
+                "message_id": album_messages[0].id,
                 "original_link": original_link,
                 "original_date": initial_msg.date,
                 "source_url": source_url,
@@ -259,6 +463,18 @@ class BaseUserbotService:
             logging.error(f"Error processing album: {e!s}")
             return None
 
+    async def _fetch_album_messages(
+        self, client: TelegramClient, entity, initial_msg
+    ) -> list:
+        messages = await client.get_messages(
+            entity, min_id=initial_msg.id - 10, max_id=initial_msg.id + 10, limit=20
+        )
+        return [
+            msg
+            for msg in messages
+            if hasattr(msg, "grouped_id") and msg.grouped_id == initial_msg.grouped_id
+        ]
+
     async def _process_message(
         self, client: TelegramClient, msg, source_url: str
     ) -> dict | None:
@@ -277,13 +493,13 @@ class BaseUserbotService:
             "media": [],
             "is_album": False,
             "album_size": 0,
+            "message_id": msg.id,
             "original_link": original_link,
             "original_date": msg.date,
             "source_url": source_url,
         }
         if msg.media:
-            media_items = self._extract_media(msg.media)
-            post_data["media"] = await self._download_media_batch(client, media_items)
+            post_data["media"] = self._extract_media(msg.media)
 
         return post_data
 
@@ -350,8 +566,12 @@ class BaseUserbotService:
     ) -> str | None:
         async with self.download_semaphore:
             try:
+                # Staged on the media volume, so MediaService stores it by rename.
+                os.makedirs(settings.MEDIA_STAGING_DIR, exist_ok=True)
                 async with tempfile.NamedTemporaryFile(
-                    delete=False, suffix=f".{media_type}"
+                    delete=False,
+                    suffix=f".{media_type}",
+                    dir=settings.MEDIA_STAGING_DIR,
                 ) as tmp_file:
                     tmp_path = tmp_file.name
                     self._temp_files.add(tmp_path)
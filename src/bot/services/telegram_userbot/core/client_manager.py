@@ -1,19 +1,43 @@
+import asyncio
 import logging
 import os
+import time
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from dataclasses import dataclass
 
 from aiogram import Bot
 from telethon import TelegramClient
+from telethon.errors import FloodWaitError
 
-from ..types import TelegramEntity
+from ..types import AuthorizationError, RateLimitError, TelegramEntity
 from .authorization_service import AuthorizationService
 from .connection_service import ConnectionService
 from .download_service import DownloadService
 from .entity_service import EntityService
 
 
+@dataclass
+class SessionState:
+    in_flight: int = 0
+    requests: int = 0
+    flood_waits: int = 0
+    cooldown_until: float = 0.0
+
+    def is_cooling_down(self, now: float) -> bool:
+        return self.cooldown_until > now
+
+
 class TelegramClientManager:
+    """
+    Owns long-lived Telethon clients, one per userbot session file.
+
+    Each get_client() call is routed to the least-loaded session that is not
+    cooling down after a FloodWaitError, unless it asks for a given session. Clients are created and authorized
+    once per process, reconnected on the next acquire when broken and
+    disconnected by close() on shutdown.
+    """
+
     def __init__(
         self,
         api_id: int,
@@ -21,45 +45,242 @@ class TelegramClientManager:
         bot=Bot,
         phone: str | None = None,
         session_path: str | None = None,
+        session_paths: list[str] | None = None,
         connection_retries: int = 5,
         auto_reconnect: bool = True,
         download_retries: int = 3,
+        auth_failure_cooldown: float = 3600.0,
     ):
+        self.session_paths = self._resolve_session_paths(session_path, session_paths)
+        self.session_path = self.session_paths[0]
+        self.auth_failure_cooldown = auth_failure_cooldown
+
         self.connection_service = ConnectionService(
-            session_path=session_path or os.getenv("SESSION_PATH", "userbot.session"),
+            session_path=self.session_path,
             api_id=api_id,
             api_hash=api_hash,
             connection_retries=connection_retries,
             auto_reconnect=auto_reconnect,
+            # A single account has nowhere else to go, so let Telethon sleep
+            # through short flood waits; with a pool we'd rather switch sessions.
+            flood_sleep_threshold=60 if len(self.session_paths) == 1 else 5,
         )
 
         self.authorization_service = AuthorizationService(phone=phone, bot=bot)
         self.entity_service = EntityService()
         self.download_service = DownloadService(max_retries=download_retries)
 
+        self._sessions: dict[str, SessionState] = {
+            path: SessionState() for path in self.session_paths
+        }
+        self._clients: dict[str, TelegramClient] = {}
+        self._clients_loop: asyncio.AbstractEventLoop | None = None
+        self._session_locks: dict[str, asyncio.Lock] = {}
+
         self.logger = logging.getLogger(__name__)
 
+    @staticmethod
+    def _resolve_session_paths(
+        session_path: str | None, session_paths: list[str] | None
+    ) -> list[str]:
+        if session_paths:
+            return list(dict.fromkeys(session_paths))
+
+        if env_paths := os.getenv("SESSION_PATHS"):
+            paths = [p.strip() for p in env_paths.split(",") if p.strip()]
+            if paths:
+                return list(dict.fromkeys(paths))
+
+        return [session_path or os.getenv("SESSION_PATH", "sessions/userbot.session")]
+
+    @property
+    def session_count(self) -> int:
+        return len(self.session_paths)
+
     @asynccontextmanager
-    async def get_client(self) -> AsyncGenerator[TelegramClient, None]:
-        client = self.connection_service.create_client()
+    async def get_client(
+        self, session_path: str | None = None
+    ) -> AsyncGenerator[TelegramClient, None]:
+        session_path, client = await self._checkout_client(session_path)
+        state = self._sessions[session_path]
 
         try:
-            async with self.connection_service.connect_client(
-                client, os.getenv("SESSION_PATH", "sessions/userbot.session")
-            ) as connected_client:
-                if not await self.authorization_service.is_authorized(connected_client):
-                    await self.authorization_service.authorize_client(connected_client)
+            yield client
 
-                yield connected_client
+        except FloodWaitError as e:
+            self._start_cooldown(session_path, e.seconds)
+            state.flood_waits += 1
+            raise
 
         except Exception as e:
             self.logger.error(f"Помилка Telegram клієнта: {e!s}")
+            if not self.connection_service.is_client_connected(client):
+                await self._drop_client(session_path)
             raise
+
         finally:
+            state.in_flight -= 1
+
+    def get_session_stats(self) -> dict[str, dict]:
+        now = time.monotonic()
+        return {
+            path: {
+                "requests": state.requests,
+                "in_flight": state.in_flight,
+                "flood_waits": state.flood_waits,
+                "cooldown_remaining": max(0.0, state.cooldown_until - now),
+                "connected": path in self._clients,
+            }
+            for path, state in self._sessions.items()
+        }
+
+    def session_of(self, client: TelegramClient) -> str | None:
+        return next(
+            (path for path, known in self._clients.items() if known is client), None
+        )
+
+    async def close(self) -> None:
+        for session_path in list(self._clients):
+            await self._drop_client(session_path)
+
+    async def _checkout_client(
+        self, only: str | None = None
+    ) -> tuple[str, TelegramClient]:
+        tried: set[str] = (
+            {path for path in self._sessions if path != only}
+            if only in self._sessions
+            else set()
+        )
+
+        while session_path := self._pick_session(exclude=tried):
+            tried.add(session_path)
+            state = self._sessions[session_path]
+            # Count the slot before awaiting so concurrent callers spread out.
+            state.in_flight += 1
             try:
-                await client.disconnect()
-            except Exception as e:
-                self.logger.warning(f"Помилка при закритті клієнта: {e!s}")
+                client = await self._acquire_client(session_path)
+            except AuthorizationError as e:
+                state.in_flight -= 1
+                self.logger.error(f"Session {session_path} is not authorized: {e!s}")
+                self._start_cooldown(session_path, self.auth_failure_cooldown)
+                continue
+            except Exception:
+                state.in_flight -= 1
+                raise
+
+            state.requests += 1
+            return session_path, client
+
+        raise RateLimitError(
+            "All userbot sessions are cooling down after FloodWait or failed auth"
+        )
+
+    def _pick_session(self, exclude: set[str]) -> str | None:
+        now = time.monotonic()
+        available = [
+            path
+            for path, state in self._sessions.items()
+            if path not in exclude and not state.is_cooling_down(now)
+        ]
+        if not available:
+            return None
+
+        return min(
+            available,
+            key=lambda p: (self._sessions[p].in_flight, self._sessions[p].requests),
+        )
+
+    def _start_cooldown(self, session_path: str, seconds: float) -> None:
+        state = self._sessions[session_path]
+        state.cooldown_until = max(state.cooldown_until, time.monotonic() + seconds)
+        self.logger.warning(
+            f"Session {session_path} cooling down for {seconds:.0f}s "
+            f"({self.session_count} sessions in pool)"
+        )
+
+    async def _acquire_client(self, session_path: str) -> TelegramClient:
+        await self._drop_clients_of_old_loop()
+        async with self._get_session_lock(session_path):
+            client = self._clients.get(session_path)
+
+            if client is not None and not await self._ensure_healthy(client):
+                await self._drop_client(session_path)
+                client = None
+
+            if client is None:
+                client = await self._open_client(session_path)
+                self._clients[session_path] = client
+
+            return client
+
+    async def _open_client(self, session_path: str) -> TelegramClient:
+        client = self.connection_service.create_client(session_path)
+        try:
+            await self.connection_service.connect(client)
+            if not await self.authorization_service.is_authorized(client):
+                await self.authorization_service.authorize_client(client)
+        except Exception:
+            await self.connection_service.disconnect_client(client)
+            raise
+
+        self.logger.info(f"Telegram client connected for session {session_path}")
+        return client
+
+    async def _ensure_healthy(self, client: TelegramClient) -> bool:
+        if self.connection_service.is_client_connected(client):
+            return True
+
+        try:
+            await self.connection_service.connect(client)
+            return await self.connection_service.test_connection(client)
+        except Exception as e:
+            self.logger.warning(f"Telegram client reconnect failed: {e!s}")
+            return False
+
+    async def _drop_client(self, session_path: str) -> None:
+        client = self._clients.pop(session_path, None)
+        if client is not None:
+            await self.connection_service.disconnect_client(client)
+
+    def _get_session_lock(self, session_path: str) -> asyncio.Lock:
+        return self._session_locks.setdefault(session_path, asyncio.Lock())
+
+    async def _drop_clients_of_old_loop(self) -> None:
+        # Telethon clients and asyncio locks are bound to the loop they were
+        # first used on; Celery ticks may run on a fresh loop.
+        loop = asyncio.get_running_loop()
+        if self._clients_loop is loop:
+            return
+
+        stale = list(self._clients.values())
+        self._clients.clear()
+        self._session_locks.clear()
+        self._clients_loop = loop
+        if stale:
+            self.logger.warning(
+                f"Event loop changed, disconnecting {len(stale)} Telegram clients"
+            )
+        for client in stale:
+            await asyncio.to_thread(self._disconnect_stale_client, client)
+
+    def _disconnect_stale_client(self, client: TelegramClient) -> None:
+        # The client can't be awaited on this loop. Telethon runs a sync
+        # disconnect on the client's own loop, which works from a worker
+        # thread while that loop is idle; the session file is closed even
+        # if the loop is already gone, so the next connect can open it.
+        try:
+            old_loop = client.loop
+            if old_loop.is_running():
+                old_loop.call_soon_threadsafe(client.disconnect)
+                return
+            if not old_loop.is_closed():
+                client.disconnect()
+        except Exception as e:
+            self.logger.warning(f"Error disconnecting stale Telegram client: {e!s}")
+        try:
+            client.session.close()
+        except Exception as e:
+            self.logger.warning(f"Error closing Telegram session file: {e!s}")
 
     async def get_entity(
         self, client: TelegramClient, source_link: str
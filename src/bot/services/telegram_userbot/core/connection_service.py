@@ -15,23 +15,26 @@ class ConnectionService:
         api_hash: str,
         connection_retries: int = 5,
         auto_reconnect: bool = True,
+        flood_sleep_threshold: int = 60,
     ):
         self.session_path = session_path
         self.api_id = api_id
         self.api_hash = api_hash
         self.connection_retries = connection_retries
         self.auto_reconnect = auto_reconnect
+        self.flood_sleep_threshold = flood_sleep_threshold
         self.logger = logging.getLogger(__name__)
         self._connection_lock = asyncio.Lock()
         self._active_connections = set()
 
-    def create_client(self) -> TelegramClient:
+    def create_client(self, session_path: str | None = None) -> TelegramClient:
         return TelegramClient(
-            session=self.session_path,
+            session=session_path or self.session_path,
             api_id=self.api_id,
             api_hash=self.api_hash,
             connection_retries=self.connection_retries,
             auto_reconnect=self.auto_reconnect,
+            flood_sleep_threshold=self.flood_sleep_threshold,
             use_ipv6=False,
             proxy=None,
         )
@@ -50,6 +53,9 @@ class ConnectionService:
         finally:
             self._active_connections.discard(session_name)
 
+    async def connect(self, client: TelegramClient) -> None:
+        await self._connect_with_retry(client)
+
     async def _connect_with_retry(self, client: TelegramClient, max_retries=3):
         for attempt in range(max_retries):
             try:
@@ -77,7 +83,8 @@ class ConnectionService:
         try:
             await self.disconnect_client(client)
             await asyncio.sleep(1)
-            return await self.connect_client(client)
+            await self._connect_with_retry(client)
+            return True
         except Exception as e:
             self.logger.error(f"Reconnection failed: {e!s}")
             raise ConnectionError(f"Reconnection failed: {e!s}") from e
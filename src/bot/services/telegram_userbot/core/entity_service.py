@@ -1,6 +1,7 @@
 import logging
 
 from telethon import TelegramClient
+from telethon.errors import FloodWaitError
 from telethon.tl.functions.messages import ImportChatInviteRequest
 
 from ..types import TelegramEntity
@@ -15,6 +16,8 @@ class EntityService:
     ) -> TelegramEntity | None:
         try:
             return await client.get_entity(source_link)
+        except FloodWaitError:
+            raise
         except Exception as e:
             if "t.me/+" in source_link:
                 return await self._join_private_chat(client, source_link)
@@ -1,11 +1,17 @@
 import logging
 import time
+from collections.abc import AsyncIterator
+from typing import TYPE_CHECKING
 
+import openai
 from aiogram import Bot
 
 from bot.database.models.flow import FlowDTO
 from bot.database.models.post import PostDTO
 from bot.services.aisettings_service import AISettingsService
+from bot.services.content_processing.llm_cache_service import LLMCacheService
+from bot.services.content_processing.rate_limiter import OpenAIRateLimiter
+from bot.services.content_processing.rewrite_batcher import RewriteBatcher
 from bot.services.telegram_userbot.core.base_userbot_service import BaseUserbotService
 from bot.services.telegram_userbot.processing.content_processing_service import (
     ContentProcessingService,
@@ -14,6 +20,11 @@ from bot.services.telegram_userbot.processing.post_conversion_service import (
     PostConversionService,
 )
 from bot.services.user_service import UserService
+from bot.utils.streams import bounded_map
+
+if TYPE_CHECKING:
+    from bot.services.post.admission import PostAdmission
+    from bot.services.post.source_cursors import SourceCursors
 
 
 class EnhancedUserbotService(BaseUserbotService):
@@ -24,16 +35,22 @@ class EnhancedUserbotService(BaseUserbotService):
         aisettings_service: "AISettingsService",
         user_service: "UserService",
         bot: Bot,
-        openai_key: str | None = None,
+        openai_client: openai.AsyncOpenAI | None = None,
+        llm_cache: LLMCacheService | None = None,
+        rate_limiter: OpenAIRateLimiter | None = None,
+        batcher: RewriteBatcher | None = None,
         logger: logging.Logger | None = None,
         **kwargs,
     ):
         super().__init__(api_id, api_hash, bot, **kwargs)
 
         self.content_processor = ContentProcessingService(
-            openai_key=openai_key,
+            openai_client=openai_client,
             aisettings_service=aisettings_service,
             user_service=user_service,
+            llm_cache=llm_cache,
+            rate_limiter=rate_limiter,
+            batcher=batcher,
         )
 
         self.post_converter = PostConversionService(self.content_processor)
@@ -41,45 +58,92 @@ class EnhancedUserbotService(BaseUserbotService):
         self.bot = bot
         self.user_service = user_service
         self.aisettings_service = aisettings_service
-        self.openai_key = openai_key
+        self.openai_client = openai_client
 
     async def get_last_posts(
         self, flow: FlowDTO, source: dict, limit: int = 10
     ) -> list[PostDTO]:
-        try:
-            start_time = time.time()
+        return [post async for post in self.stream_posts(flow, source, limit)]
 
-            raw_posts = await super().get_last_posts(source, limit)
+    async def stream_posts(
+        self,
+        flow: FlowDTO,
+        source: dict,
+        limit: int = 10,
+        concurrency: int = 3,
+        admission: "PostAdmission | None" = None,
+        cursors: "SourceCursors | None" = None,
+    ) -> AsyncIterator[PostDTO]:
+        """
+        Yield converted posts from a Telegram source as they are ready.
+
+        Messages are fetched up front, but each one goes through AI only when
+        the consumer asks for more, so closing the stream early skips the rest.
+        Media is downloaded only for posts the AI step kept. Closing the
+        stream still cancels the calls in flight, which are already billed,
+        so no more than limit of them run at once. The fetch position goes
+        to cursors; the caller saves it once the posts are created.
+        """
+        start_time = time.time()
+        received = processed = 0
+        try:
+            raw_posts, reached_id = await self.fetch_source_posts(
+                source, limit, admission
+            )
+            if cursors is not None:
+                cursors.track_telegram(
+                    source["link"],
+                    int(source.get("last_message_id") or 0),
+                    reached_id,
+                    {raw["source_id"]: raw["message_id"] for raw in raw_posts or []},
+                )
 
             # Handle case when raw_posts is None (entity not found or error)
             if raw_posts is None:
                 self.logger.warning(
                     f"Source {source['link']}: failed to fetch posts (entity not found or error)"
                 )
-                return []
-
-            processed_posts = await self.post_converter.convert_raw_posts_to_dto(
-                raw_posts, flow
-            )
-
-            if len(raw_posts) > 0 and len(processed_posts) == 0:
-                self.logger.warning(
-                    f"[Telegram] Source {source['link']}: received {len(raw_posts)} raw posts "
-                    f"but ALL failed AI processing (likely quota/API errors)"
-                )
-            else:
-                self.logger.warning(
-                    f"[Telegram] Source {source['link']}: processed {len(processed_posts)}/{len(raw_posts)} posts "
-                    f"in {time.time() - start_time:.2f}s"
-                )
-            return processed_posts
+                return
+
+            received = len(raw_posts)
+            async for post in bounded_map(
+                [raw for raw in raw_posts if raw],
+                lambda raw: self._convert_with_media(raw, flow),
+                min(concurrency, limit),
+            ):
+                if post is not None:
+                    processed += 1
+                    yield post
 
         except Exception as e:
             self.logger.error(
                 f"Error getting posts from source {source['link']}: {e!s}",
                 exc_info=True,
             )
-            return []
+            return
+
+        if received > 0 and processed == 0:
+            self.logger.warning(
+                f"[Telegram] Source {source['link']}: received {received} raw posts "
+                f"but ALL failed AI processing (likely quota/API errors)"
+            )
+        else:
+            self.logger.warning(
+                f"[Telegram] Source {source['link']}: processed {processed}/{received} posts "
+                f"in {time.time() - start_time:.2f}s"
+            )
+
+    async def _convert_with_media(
+        self, raw_post: dict, flow: FlowDTO
+    ) -> PostDTO | None:
+        post = await self.post_converter._safe_convert_post(
+            {**raw_post, "media": []}, flow
+        )
+        if post is None:
+            return None
+
+        media = PostDTO.from_raw_post(await self.download_post_media(raw_post))
+        return post.copy(update={"images": media.images, "videos": media.videos})
 
     async def process_content(self, text: str, flow: FlowDTO) -> str:
         post = await self.content_processor.process_post_content(
@@ -88,6 +152,7 @@ class EnhancedUserbotService(BaseUserbotService):
         return post.content
 
     async def convert_raw_post(self, raw_post: dict, flow: FlowDTO) -> PostDTO | None:
+        await self.download_post_media(raw_post)
         return await self.post_converter._convert_single_post(raw_post, flow)
 
     async def __aenter__(self):
@@ -1,4 +1,3 @@
-import asyncio
 import logging
 
 import openai
@@ -6,33 +5,34 @@ import openai
 from bot.database.models import FlowDTO
 from bot.database.models.post import PostDTO
 from bot.services.aisettings_service import AISettingsService
+from bot.services.content_processing.llm_cache_service import LLMCacheService
 from bot.services.content_processing.processors import (
     ChatGPTContentProcessor,
     DefaultContentProcessor,
 )
+from bot.services.content_processing.rate_limiter import OpenAIRateLimiter
+from bot.services.content_processing.rewrite_batcher import RewriteBatcher
 from bot.services.user_service import UserService
 
 
 class ContentProcessingService:
     def __init__(
         self,
-        openai_key: str | None = None,
+        openai_client: openai.AsyncOpenAI | None = None,
         aisettings_service: AISettingsService = None,
         user_service: UserService = None,
+        llm_cache: LLMCacheService | None = None,
+        rate_limiter: OpenAIRateLimiter | None = None,
+        batcher: RewriteBatcher | None = None,
     ):
-        self.openai_key = openai_key
+        self.openai_client = openai_client
         self.aisettings_service = aisettings_service
         self.user_service = user_service
-        self._openai_client = None
-        self._semaphore = asyncio.Semaphore(3)
+        self.llm_cache = llm_cache
+        self.rate_limiter = rate_limiter
+        self.batcher = batcher
         self.logger = logging.getLogger(__name__)
 
-    @property
-    def openai_client(self):
-        if not self._openai_client and self.openai_key:
-            self._openai_client = openai.AsyncOpenAI(api_key=self.openai_key)
-        return self._openai_client
-
     async def process_post_content(
         self, post_dto: PostDTO, flow: FlowDTO
     ) -> PostDTO | None:
@@ -60,21 +60,23 @@ class ContentProcessingService:
         return await DefaultContentProcessor().process(content)
 
     async def _process_with_ai(self, text: str, flow: FlowDTO) -> str:
-        if not self.openai_key:
+        if not self.openai_client:
             return text
 
-        async with self._semaphore:
-            return await self._process_with_chatgpt(text, flow)
+        return await self._process_with_chatgpt(text, flow)
 
     async def _process_with_chatgpt(self, text: str, flow: FlowDTO) -> str | None:
         try:
             await self.user_service.get_user_by_flow(flow)
             processor = ChatGPTContentProcessor(
-                api_key=self.openai_key,
+                client=self.openai_client,
                 flow=flow,
                 max_retries=5,
                 timeout=15.0,
                 aisettings_service=self.aisettings_service,
+                cache=self.llm_cache,
+                rate_limiter=self.rate_limiter,
+                batcher=self.batcher,
             )
             result = await processor.process(text)
             # If processor returned None, it means AI processing failed
@@ -1,36 +1,57 @@
 import asyncio
 import logging
 
+import openai
+
 from bot.database.models import FlowDTO
 from bot.services.aisettings_service import AISettingsService
+from bot.services.content_processing.llm_cache_service import LLMCacheService
 from bot.services.content_processing.processors import (
     ChatGPTContentProcessor,
     DefaultContentProcessor,
 )
+from bot.services.content_processing.rate_limiter import OpenAIRateLimiter
+from bot.services.content_processing.rewrite_batcher import RewriteBatcher
 
 
 class ContentProcessorService:
     def __init__(
         self,
         aisettings_service: AISettingsService,
-        openai_key: str | None = None,
+        openai_client: openai.AsyncOpenAI | None = None,
+        llm_cache: LLMCacheService | None = None,
+        rate_limiter: OpenAIRateLimiter | None = None,
+        batcher: RewriteBatcher | None = None,
         logger: logging.Logger | None = None,
     ):
-        self.openai_key = openai_key
+        self.openai_client = openai_client
+        self.llm_cache = llm_cache
+        self.rate_limiter = rate_limiter
+        self.batcher = batcher
         self.aisettings_service = aisettings_service
         self.default_processor = DefaultContentProcessor()
         self.logger = logger or logging.getLogger(__name__)
 
+    async def process(self, text: str, flow: FlowDTO) -> str | None:
+        if self.openai_client:
+            return await self._get_ai_processor(flow).process(text)
+        return await self.default_processor.process(text)
+
     async def process_batch(self, texts: list[str], flow: FlowDTO) -> list[str]:
-        if self.openai_key:
-            processor = ChatGPTContentProcessor(
-                api_key=self.openai_key,
-                flow=flow,
-                aisettings_service=self.aisettings_service,
-                max_retries=5,
-                timeout=30.0,
-            )
-            return await processor.process_batch(texts)
+        if self.openai_client:
+            return await self._get_ai_processor(flow).process_batch(texts)
         return await asyncio.gather(
             *[self.default_processor.process(text) for text in texts]
         )
+
+    def _get_ai_processor(self, flow: FlowDTO) -> ChatGPTContentProcessor:
+        return ChatGPTContentProcessor(
+            client=self.openai_client,
+            flow=flow,
+            aisettings_service=self.aisettings_service,
+            max_retries=5,
+            timeout=30.0,
+            cache=self.llm_cache,
+            rate_limiter=self.rate_limiter,
+            batcher=self.batcher,
+        )
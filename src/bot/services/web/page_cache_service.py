@@ -0,0 +1,198 @@
+import hashlib
+import logging
+import sqlite3
+import time
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+from bot.utils.sqlite_store import STATS_SCHEMA, SQLiteStore
+
+TRACKING_PARAMS = ("utm_", "fbclid", "gclid", "yclid", "mc_cid", "mc_eid")
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS pages (
+        url TEXT PRIMARY KEY,
+        body_hash TEXT NOT NULL,
+        fetched_at REAL NOT NULL,
+        accessed_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS pages_accessed_at ON pages (accessed_at);
+    CREATE TABLE IF NOT EXISTS bodies (
+        hash TEXT PRIMARY KEY,
+        body TEXT NOT NULL,
+        size INTEGER NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS domains (
+        domain TEXT PRIMARY KEY,
+        needs_bypass INTEGER NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    """
+    + STATS_SCHEMA
+)
+
+
+class PageCacheService:
+    """
+    HTML cache in a SQLiteStore shared by every process on the host.
+
+    Pages are indexed by normalized URL and their bodies stored once per
+    content digest, so the generation workers reuse each other's downloads.
+    Entries expire after ttl seconds and the least recently used ones are
+    evicted once the stored bodies exceed max_bytes. The cache also remembers
+    which domains answered 403 and need the Cloudflare bypass.
+    """
+
+    def __init__(
+        self,
+        cache_path: str = "cache/page_cache.sqlite3",
+        ttl: float = 6 * 3600,
+        max_bytes: int = 200 * 1024 * 1024,
+        bypass_ttl: float = 7 * 24 * 3600,
+        logger: logging.Logger | None = None,
+    ):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.bypass_ttl = bypass_ttl
+        self.logger = logger or logging.getLogger(__name__)
+        self.store = SQLiteStore(cache_path, SCHEMA, self.logger)
+
+    @staticmethod
+    def normalize_url(url: str) -> str:
+        parsed = urlparse(url.strip())
+        scheme = parsed.scheme.lower()
+        netloc = parsed.netloc.lower()
+        if (scheme, netloc.rsplit(":", 1)[-1]) in (("http", "80"), ("https", "443")):
+            netloc = netloc.rsplit(":", 1)[0]
+
+        query = urlencode(
+            sorted(
+                (key, value)
+                for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+                if not key.lower().startswith(TRACKING_PARAMS)
+            )
+        )
+        return urlunparse((scheme, netloc, parsed.path or "/", "", query, ""))
+
+    async def get(self, url: str) -> str | None:
+        return await self.store.call(
+            self._get,
+            self.normalize_url(url),
+            default=None,
+            action=f"Page cache read for {url}",
+        )
+
+    async def set(self, url: str, html: str) -> None:
+        await self.store.call(
+            self._set,
+            self.normalize_url(url),
+            html,
+            default=None,
+            action=f"Page cache write for {url}",
+        )
+
+    async def needs_bypass(self, domain: str) -> bool:
+        return await self.store.call(
+            self._needs_bypass,
+            domain.lower(),
+            default=False,
+            action="Page cache domain lookup",
+        )
+
+    async def mark_needs_bypass(self, domain: str, needs_bypass: bool = True) -> None:
+        await self.store.call(
+            self._mark_needs_bypass,
+            domain.lower(),
+            needs_bypass,
+            default=None,
+            action="Page cache domain update",
+        )
+
+    async def get_stats(self) -> dict[str, float] | None:
+        return await self.store.call(
+            self._get_stats, default=None, action="Page cache stats"
+        )
+
+    async def log_stats(self) -> None:
+        if stats := await self.get_stats():
+            self.logger.info(
+                f"Page cache: {stats['entries']} pages "
+                f"({stats['size_bytes'] / 1024 / 1024:.1f} MB), {stats['hits']} hits, "
+                f"{stats['misses']} misses ({stats['hit_rate']:.1%} hit rate)"
+            )
+
+    def _get(self, key: str) -> str | None:
+        now = time.time()
+        with self.store.connection() as conn:
+            row = conn.execute(
+                "SELECT b.body FROM pages p JOIN bodies b ON b.hash = p.body_hash "
+                "WHERE p.url = ? AND p.fetched_at > ?",
+                (key, now - self.ttl),
+            ).fetchone()
+
+            if row is None:
+                self.store.bump_stat(conn, "misses")
+                return None
+
+            conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (now, key))
+            self.store.bump_stat(conn, "hits")
+            return row[0]
+
+    def _set(self, key: str, html: str) -> None:
+        now = time.time()
+        body_hash = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        with self.store.connection() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO bodies (hash, body, size) VALUES (?, ?, ?)",
+                (body_hash, html, len(html.encode("utf-8"))),
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO pages (url, body_hash, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, body_hash, now, now),
+            )
+            self._evict(conn, now)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM pages WHERE fetched_at <= ?", (now - self.ttl,))
+
+        total_size = self._prune_bodies(conn)
+        while total_size > self.max_bytes:
+            deleted = conn.execute(
+                "DELETE FROM pages WHERE url IN "
+                "(SELECT url FROM pages ORDER BY accessed_at LIMIT 1)"
+            ).rowcount
+            total_size = self._prune_bodies(conn)
+            if not deleted:
+                break
+
+    def _prune_bodies(self, conn: sqlite3.Connection) -> int:
+        conn.execute(
+            "DELETE FROM bodies WHERE hash NOT IN (SELECT body_hash FROM pages)"
+        )
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM bodies").fetchone()[0]
+
+    def _needs_bypass(self, domain: str) -> bool:
+        with self.store.connection() as conn:
+            row = conn.execute(
+                "SELECT needs_bypass FROM domains WHERE domain = ? AND updated_at > ?",
+                (domain, time.time() - self.bypass_ttl),
+            ).fetchone()
+        return bool(row and row[0])
+
+    def _mark_needs_bypass(self, domain: str, needs_bypass: bool) -> None:
+        with self.store.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO domains (domain, needs_bypass, updated_at) "
+                "VALUES (?, ?, ?)",
+                (domain, int(needs_bypass), time.time()),
+            )
+
+    def _get_stats(self) -> dict[str, float]:
+        with self.store.connection() as conn:
+            stats = self.store.hit_stats(conn)
+            stats["entries"], stats["size_bytes"] = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(b.size), 0) "
+                "FROM pages p JOIN bodies b ON b.hash = p.body_hash"
+            ).fetchone()
+        return stats
@@ -17,11 +17,14 @@ from pydantic import BaseModel, ConfigDict, Field
 
 from bot.database.models import FlowDTO
 from bot.database.repositories.post_repository import PostRepository
+from bot.services.feed_fetch_coordinator import FeedFetchCoordinator
 from bot.services.web.cloudflare_bypass_service import CloudflareBypass
 from bot.utils.notifications import notify_admins
 
 if TYPE_CHECKING:
     from bot.services.flow_service import FlowService
+    from bot.services.post.admission import PostAdmission
+    from bot.services.post.source_cursors import SourceCursors
 
 
 class SourceDict(TypedDict):
@@ -103,13 +106,29 @@ class RssService:
         flow_service: FlowService,
         source: dict,
         limit: int = 10,
+        admission: PostAdmission | None = None,
+        cursors: SourceCursors | None = None,
     ) -> AsyncIterator[dict[str, Any]]:
         try:
             rss_url = await self._get_source_rss_url(flow, source, flow_service)
             self.logger.info(f"Getting posts for flow {flow.id} from {rss_url}")
-            async for post in self._stream_posts(rss_url, limit):
+            validators = {
+                "etag": source.get("etag"),
+                "last_modified": source.get("last_modified"),
+            }
+            cached_validators = dict(validators)
+            source_ids = []
+            async for post in self._stream_posts(
+                rss_url, limit, validators, admission
+            ):
+                source_ids.append(post.source_id)
                 yield self._convert_to_web_service_format(post)
 
+            # Only a fully read feed may be skipped next time; the caller
+            # keeps the validators if every entry became a post.
+            if cursors is not None and validators != cached_validators:
+                cursors.track_feed(source["link"], validators, source_ids)
+
         except TimeoutError:
             self.logger.warning(f"Timeout getting posts for flow {flow.id}")
         except Exception as e:
@@ -153,6 +172,8 @@ class RssService:
         self,
         rss_url: str,
         limit: int,
+        validators: dict[str, str | None] | None = None,
+        admission: PostAdmission | None = None,
     ) -> AsyncIterator[RssPost]:
         if not rss_url:
             return
@@ -160,9 +181,10 @@ class RssService:
         # limits_per_url = self._calculate_limits_per_url(rss_urls, limit)
         # for url, url_limit in limits_per_url.items():
         try:
-            async with asyncio.timeout(30):
-                async for post in self._fetch_feed_posts_stream(rss_url, limit):
-                    yield post
+            async for post in self._fetch_feed_posts_stream(
+                rss_url, limit, validators, admission
+            ):
+                yield post
         except Exception as e:
             self.logger.error(e, exc_info=True)
             self.logger.warning(f"Error streaming posts from {rss_url}: {e}")
@@ -171,35 +193,113 @@ class RssService:
         self,
         rss_url: str,
         limit: int,
+        validators: dict[str, str | None] | None = None,
+        admission: PostAdmission | None = None,
     ) -> AsyncIterator[RssPost]:
+        """
+        Stream parsed entries of a feed.
+
+        When validators carry an etag/last_modified from the previous run, the
+        feed is requested conditionally and a 304 yields nothing. Validators
+        are updated in place from the response headers. With an admission,
+        stale and already posted entries are dropped before the limit is
+        applied.
+        """
+        # Only the download is time-boxed: the consumer may take its time
+        # between posts while it enriches and rewrites them.
+        async with asyncio.timeout(30):
+            status, fresh_validators, entries = await self._fetch_feed_entries(
+                rss_url, validators
+            )
+        if status == 304:
+            self.logger.info(f"Feed not modified since last run: {rss_url}")
+            return
+        if status != 200:
+            return
+
+        if validators is not None:
+            validators.update(fresh_validators)
+
+        if admission is not None:
+            entries = await admission.filter_new(
+                entries,
+                source_id=self._entry_source_id,
+                original_date=lambda entry: self._parse_rss_date(
+                    entry.get("published")
+                ),
+            )
+
+        domain = urlparse(rss_url).netloc
+        tasks = [
+            asyncio.ensure_future(
+                self._parse_rss_entry(
+                    entry, domain, rss_url, check_exists=admission is None
+                )
+            )
+            for entry in entries[:limit]
+        ]
+
         try:
-            async with self.session.get(rss_url) as response:
+            for coro in asyncio.as_completed(tasks):
+                try:
+                    post = await coro
+                    if post:
+                        yield post
+                except Exception as e:
+                    self.logger.error(f"Error parsing entry: {e}")
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _fetch_feed_entries(
+        self, rss_url: str, validators: dict[str, str | None] | None
+    ) -> tuple[int, dict[str, str | None], list]:
+        # Within a scheduled cycle every flow reading this feed shares one
+        # download and parse.
+        coordinator = FeedFetchCoordinator.current()
+        if coordinator is None:
+            return await self._download_feed(rss_url, validators)
+
+        return await coordinator.fetch_once(
+            coordinator.rss_key(rss_url, validators),
+            lambda: self._download_feed(rss_url, validators),
+        )
+
+    async def _download_feed(
+        self, rss_url: str, validators: dict[str, str | None] | None
+    ) -> tuple[int, dict[str, str | None], list]:
+        try:
+            async with self.session.get(
+                rss_url, headers=self._conditional_headers(validators)
+            ) as response:
                 if response.status != 200:
-                    return
+                    return response.status, {}, []
 
+                fresh_validators = {
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                }
                 text = await asyncio.wait_for(
                     response.text(), timeout=self.request_timeout
                 )
-                feed = feedparser.parse(text)
-                domain = urlparse(rss_url).netloc
-
-                tasks = [
-                    self._parse_rss_entry(entry, domain, rss_url)
-                    for entry in feed.entries[:limit]
-                ]
-
-                for coro in asyncio.as_completed(tasks):
-                    try:
-                        post = await coro
-                        if post:
-                            yield post
-                    except Exception as e:
-                        self.logger.error(f"Error parsing entry: {e}")
+                return response.status, fresh_validators, feedparser.parse(text).entries
 
         except Exception as e:
             self.logger.error(f"Error fetching feed {rss_url}: {e}")
             raise
 
+    def _conditional_headers(
+        self, validators: dict[str, str | None] | None
+    ) -> dict[str, str]:
+        headers = {}
+        if not validators:
+            return headers
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        return headers
+
     def _convert_to_web_service_format(self, post: RssPost) -> dict[str, Any]:
         if post:
             return {
@@ -274,13 +374,16 @@ class RssService:
         entry: dict[str, Any],
         domain: str,
         rss_url: str,
+        check_exists: bool = True,
     ) -> RssPost | None:
         try:
-            source_id = f"rss_{hashlib.md5(entry.link.encode()).hexdigest()}"
+            source_id = self._entry_source_id(entry)
             if not source_id:
                 return None
 
-            if await self.post_repository.exists_by_source_id(source_id):
+            if check_exists and await self.post_repository.exists_by_source_id(
+                source_id
+            ):
                 self.logger.warning(f"STOP | Post already exists: {source_id}")
                 return None
 
@@ -302,6 +405,12 @@ class RssService:
             self.logger.error(f"Error parsing RSS entry: {e}")
             return None
 
+    def _entry_source_id(self, entry: dict[str, Any]) -> str | None:
+        link = entry.get("link")
+        if not link:
+            return None
+        return f"rss_{hashlib.md5(link.encode()).hexdigest()}"
+
     async def _extract_rss_images(self, entry: feedparser.FeedParserDict) -> list[str]:
         images: set[str] = set()
 
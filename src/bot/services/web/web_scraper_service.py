@@ -8,13 +8,21 @@ from bs4 import BeautifulSoup
 
 from bot.database.models.web_post import WebPost
 from bot.services.web.cloudflare_bypass_service import CloudflareBypass
+from bot.services.web.image_extractor_service import ImageExtractorService
+from bot.services.web.page_cache_service import PageCacheService
 
 
 class WebScraperService:
     def __init__(
-        self, cf_bypass: CloudflareBypass, logger: logging.Logger | None = None
+        self,
+        cf_bypass: CloudflareBypass,
+        image_extractor: ImageExtractorService | None = None,
+        page_cache: PageCacheService | None = None,
+        logger: logging.Logger | None = None,
     ) -> None:
         self.cf_bypass = cf_bypass
+        self.image_extractor = image_extractor or ImageExtractorService()
+        self.page_cache = page_cache
         self._session: aiohttp.ClientSession | None = None
         self.logger = logger or logging.getLogger(__name__)
 
@@ -44,12 +52,18 @@ class WebScraperService:
             except Exception:
                 pass  # Ignore errors during cleanup
 
-    async def scrape_page(self, url: str) -> WebPost | None:
+    async def scrape_page(
+        self, url: str, extract_images: bool = False
+    ) -> WebPost | None:
         """
         Scrape web page and return structured data.
 
+        The page is fetched and parsed once; candidate images are taken from
+        the same parse when requested.
+
         Args:
             url: URL of the page to scrape
+            extract_images: Also collect candidate images from the page
 
         Returns:
             WebPost if successful, None otherwise
@@ -68,6 +82,11 @@ class WebScraperService:
                 url=url,
                 source=urlparse(url).netloc,
                 date=self._find_publication_date(soup),
+                images=(
+                    self.image_extractor.extract_images(soup, url)
+                    if extract_images
+                    else None
+                ),
             )
         except Exception as e:
             self.logger.error(f"Scraping error for {url}: {e!s}", exc_info=True)
@@ -78,12 +97,31 @@ class WebScraperService:
             await self._session.close()
 
     async def _fetch_html(self, url: str) -> str | None:
+        if self.page_cache is None:
+            return await self._download_html(url)
+
+        if html := await self.page_cache.get(url):
+            self.logger.debug(f"Page cache hit for {url}")
+            return html
+
+        html = await self._download_html(url)
+        if html:
+            await self.page_cache.set(url, html)
+        return html
+
+    async def _download_html(self, url: str) -> str | None:
+        domain = urlparse(url).netloc.lower()
         try:
+            if self.page_cache and await self.page_cache.needs_bypass(domain):
+                return await self.cf_bypass.get_page_content(url)
+
             async with self.session.get(url) as response:
                 if response.status == 200:
                     return await response.text()
                 if response.status == 403:
                     self.logger.warning(f"Cloudflare detected on {url}, using bypass")
+                    if self.page_cache:
+                        await self.page_cache.mark_needs_bypass(domain)
                     return await self.cf_bypass.get_page_content(url)
                 self.logger.warning(f"Unexpected status {response.status} for {url}")
         except Exception as e:
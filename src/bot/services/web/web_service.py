@@ -1,15 +1,13 @@
 from __future__ import annotations
 
-import asyncio
 import logging
-from collections.abc import Awaitable, Callable
-from typing import Any
-
-from bs4 import BeautifulSoup
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import TYPE_CHECKING
 
 from bot.database.models import FlowDTO, PostDTO
 from bot.database.repositories.post_repository import PostRepository
 from bot.services.aisettings_service import AISettingsService
+from bot.services.content_processing.input_budget import InputBudget
 from bot.services.flow_service import FlowService
 from bot.services.user_service import UserService
 from bot.services.web.content_processor_service import ContentProcessorService
@@ -17,6 +15,11 @@ from bot.services.web.image_extractor_service import ImageExtractorService
 from bot.services.web.post_builder_service import PostBuilderService
 from bot.services.web.rss_service import RssService
 from bot.services.web.web_scraper_service import WebScraperService
+from bot.utils.streams import bounded_map
+
+if TYPE_CHECKING:
+    from bot.services.post.admission import PostAdmission
+    from bot.services.post.source_cursors import SourceCursors
 
 
 class WebService:
@@ -31,6 +34,7 @@ class WebService:
         aisettings_service: AISettingsService,
         image_extractor: ImageExtractorService,
         post_builder: PostBuilderService,
+        input_budget: InputBudget | None = None,
         logger: logging.Logger | None = None,
     ):
         self.post_repository = post_repository
@@ -42,120 +46,114 @@ class WebService:
         self.aisettings_service = aisettings_service
         self.image_extractor = image_extractor
         self.post_builder = post_builder
+        self.input_budget = input_budget or InputBudget()
         self.logger = logger or logging.getLogger(__name__)
 
     async def get_last_posts(
         self, flow: FlowDTO, source: dict, limit: int = 10
     ) -> list[PostDTO]:
-        async with self.rss_service_factory() as rss_service:
-            try:
-                raw_posts = [
-                    post
-                    async for post in rss_service.get_posts_for_source(
-                        flow,
-                        self.flow_service,
-                        source,
-                        limit,
-                    )
-                ][:limit]
-                enriched_posts = await self._enrich_posts(raw_posts)
-                processed_posts = await self._process_and_build_posts(enriched_posts, flow)
-
-                if len(enriched_posts) > 0 and len(processed_posts) == 0:
-                    self.logger.warning(
-                        f"[Web] Source {source['link']}: received {len(enriched_posts)} raw posts "
-                        f"but ALL failed AI processing (likely quota/API errors)"
-                    )
-                else:
-                    self.logger.info(
-                        f"[Web] Source {source['link']}: processed {len(processed_posts)}/{len(enriched_posts)} posts"
-                    )
-
-                return processed_posts
-
-            except Exception as e:
-                self.logger.error(f"Failed to get posts: {e}", exc_info=True)
-                return []
-
-    async def _enrich_posts(self, posts: list[dict[str, Any]]) -> list[dict[str, Any]]:
-        return await asyncio.gather(*[self._enrich_single_post(post) for post in posts])
-
-    async def _enrich_single_post(self, post: dict) -> dict | None:
+        return [post async for post in self.stream_posts(flow, source, limit)]
+
+    async def stream_posts(
+        self,
+        flow: FlowDTO,
+        source: dict,
+        limit: int = 10,
+        concurrency: int = 3,
+        admission: PostAdmission | None = None,
+        cursors: SourceCursors | None = None,
+    ) -> AsyncIterator[PostDTO]:
+        """
+        Yield ready posts from a web source as they are built.
+
+        Feed entries are scraped and rewritten only when the consumer asks for
+        more, so closing the stream early skips the remaining AI calls.
+        """
+        received = processed = 0
+        try:
+            await self.user_service.get_user_by_flow(flow)
+
+            async with self.rss_service_factory() as rss_service:
+                raw_posts = rss_service.get_posts_for_source(
+                    flow,
+                    self.flow_service,
+                    source,
+                    limit,
+                    admission=admission,
+                    cursors=cursors,
+                )
+                async for post in bounded_map(
+                    raw_posts,
+                    lambda raw: self._build_single_post(raw, flow),
+                    concurrency,
+                ):
+                    received += 1
+                    if post is not None:
+                        processed += 1
+                        yield post
+
+        except Exception as e:
+            self.logger.error(f"Failed to get posts: {e}", exc_info=True)
+
+        finally:
+            if received > 0 and processed == 0:
+                self.logger.warning(
+                    f"[Web] Source {source['link']}: received {received} raw posts "
+                    f"but ALL failed AI processing (likely quota/API errors)"
+                )
+            else:
+                self.logger.info(
+                    f"[Web] Source {source['link']}: processed {processed}/{received} posts"
+                )
+
+    async def _build_single_post(self, raw_post: dict, flow: FlowDTO) -> PostDTO | None:
+        post = await self._enrich_single_post(raw_post, flow)
+        if not post or "content" not in post:
+            return None
+
+        try:
+            content = await self.content_processor.process(post["content"], flow)
+        except Exception as e:
+            self.logger.warning(
+                f"Content processing failed for post {post.get('source_id')}: {e}"
+            )
+            return None
+
+        if content is None:
+            self.logger.warning(
+                f"Content processing returned None for post {post.get('source_id')} (likely quota error)"
+            )
+            return None
+
+        try:
+            return self.post_builder.build_post(post, content, flow)
+        except Exception as e:
+            self.logger.error(
+                f"Failed to build post {post.get('source_id')}: {e}", exc_info=True
+            )
+            return None
+
+    async def _enrich_single_post(self, post: dict, flow: FlowDTO) -> dict | None:
         if not post:
             return None
         if not post.get("original_link"):
             return post
         try:
-            web_data = await self.web_scraper.scrape_page(post["original_link"])
+            web_data = await self.web_scraper.scrape_page(
+                post["original_link"], extract_images=not post.get("images")
+            )
             if not web_data:
                 return post
 
-            if not post.get("images"):
-                html = await self.web_scraper._fetch_html(post["original_link"])
-                soup = BeautifulSoup(html, "html.parser") if html else None
-                if soup:
-                    web_data.images = self.image_extractor.extract_images(
-                        soup, post["original_link"]
-                    )
-            else:
+            if post.get("images"):
                 web_data.images = post.get("images")
+            # A scraped article body is far longer than the post written
+            # from it; feed summaries and Telegram posts are sent as they are.
+            if web_data.content:
+                web_data.content = self.input_budget.trim(
+                    web_data.content, flow.content_length
+                )
             return {**post, **web_data.to_dict()}
         except Exception as e:
             self.logger.warning(f"Failed to enrich post: {e}")
             return post
-
-    async def _process_and_build_posts(
-        self, posts: list[dict | None], flow: FlowDTO
-    ) -> list[PostDTO]:
-        if not posts:
-            return []
-
-        try:
-            await self.user_service.get_user_by_flow(flow)
-
-            valid_posts = [
-                p
-                for p in posts
-                if p is not None and isinstance(p, dict) and "content" in p
-            ]
-
-            if not valid_posts:
-                self.logger.warning(f"No valid posts found for flow {flow.id}")
-                return []
-
-            processed_contents = await self.content_processor.process_batch(
-                [p["content"] for p in valid_posts], flow
-            )
-
-            result = []
-            for post, content in zip(valid_posts, processed_contents, strict=False):
-                if isinstance(content, Exception):
-                    self.logger.warning(
-                        f"Content processing failed for post {post.get('source_id')}: {content}"
-                    )
-                    continue
-
-                # Skip if content processing failed (None from quota/API errors)
-                if content is None:
-                    self.logger.warning(
-                        f"Content processing returned None for post {post.get('source_id')} (likely quota error)"
-                    )
-                    continue
-
-                try:
-                    built_post = self.post_builder.build_post(post, content, flow)
-                    result.append(built_post)
-                except Exception as e:
-                    self.logger.error(
-                        f"Failed to build post {post.get('source_id')}: {e}",
-                        exc_info=True,
-                    )
-
-            return result
-
-        except Exception as e:
-            self.logger.error(
-                f"Error in _process_and_build_posts for flow {flow.id}: {e}",
-                exc_info=True,
-            )
-            return []
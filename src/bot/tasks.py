@@ -4,11 +4,13 @@ import os
 
 from asgiref.sync import sync_to_async
 from celery import shared_task
+from celery.signals import worker_shutdown
 from django.utils import timezone
 
 from admin_panel.models import Subscription
 from bot.containers import Container
 from bot.generator_worker import _start_telegram_generations
+from bot.services.feed_fetch_coordinator import FeedFetchCoordinator
 
 logger = logging.getLogger(__name__)
 
@@ -16,13 +18,26 @@ logger = logging.getLogger(__name__)
 async def _process_flows():
     flow_service = Container.flow_service()
     post_service = Container.post_service()
+    executor = Container.flow_executor()
     bot_token = os.getenv("TELEGRAM_BOT_TOKEN")
 
-    flows = await flow_service.get_flows_due_for_generation()
+    # Claiming leases the flows, so overlapping ticks, other workers and
+    # manual generations skip them until they are done.
+    flows = await flow_service.claim_flows_due_for_generation()
+    if not flows:
+        return
 
-    for flow in flows:
+    owner_ids = await flow_service.get_flow_owner_ids([flow.id for flow in flows])
+
+    async def _generate(flow):
         logger.info(f"Processing flow {flow.id} (volume: {flow.flow_volume})")
         try:
+            # The claim covers time spent queued; from here the run is bounded
+            # by the executor timeout.
+            await flow_service.extend_generation_lease(
+                flow.id, executor.flow_timeout + 60
+            )
+
             # Get user for the flow to send notifications
             user = await flow_service.get_user_by_flow_id(flow.id)
             chat_id = user.telegram_id if user else None
@@ -36,11 +51,28 @@ async def _process_flows():
                 allow_partial=True,
                 auto_generate=True,
             )
-        except Exception as e:
-            logger.error(f"Failed to process flow {flow.id}: {e}")
+        except (Exception, asyncio.CancelledError) as e:
+            logger.error(f"Failed to process flow {flow.id}: {e!r}")
             # Update next generation time even on error to prevent infinite loops
             await flow_service.update_next_generation_time(flow.id)
-            continue
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            await flow_service.release_generation_lease(flow.id)
+
+    # Flows sharing a feed or channel fetch it once per cycle.
+    coordinator = FeedFetchCoordinator(flows)
+    with coordinator.activate():
+        failed = await executor.run(
+            flows, _generate, owner_of=lambda flow: owner_ids.get(flow.id)
+        )
+
+    for flow, error in failed:
+        logger.error(f"Flow {flow.id} was not generated: {error!r}")
+
+    coordinator.log_stats()
+    await Container.llm_cache_service().log_stats()
+    await Container.page_cache_service().log_stats()
 
 
 async def _publish_scheduled_posts():
@@ -220,18 +252,23 @@ def _get_or_create_event_loop():
     return loop
 
 
+@worker_shutdown.connect
+def _shutdown_resources(**kwargs):
+    try:
+        loop = _get_or_create_event_loop()
+        if not loop.is_running():
+            loop.run_until_complete(Container.shutdown_resources())
+    except Exception as e:
+        logger.warning(f"Failed to shutdown resources: {e}")
+
+
 @shared_task(bind=True, max_retries=3)
 def run_scheduled_jobs(self):
     try:
         loop = _get_or_create_event_loop()
 
         if loop.is_running():
-
-            async def runner():
-                await _process_flows()
-                return await _publish_scheduled_posts()
-
-            task = asyncio.ensure_future(runner(), loop=loop)
+            task = asyncio.ensure_future(_run_all_tasks(), loop=loop)
             return loop.run_until_complete(task)
         else:
             return loop.run_until_complete(_run_all_tasks())
@@ -241,10 +278,39 @@ def run_scheduled_jobs(self):
         self.retry(exc=e, countdown=60)
 
 
+async def _complete_rewrite_batches():
+    post_service = Container.post_service()
+    try:
+        created = await post_service.complete_rewrite_batches()
+    except Exception as e:
+        logger.error(f"Failed to complete rewrite batches: {e!r}")
+        return
+    if created:
+        logger.info(f"Created {created} posts from finished rewrite batches")
+
+
 async def _run_all_tasks():
-    await _process_flows()
-    await _publish_scheduled_posts()
-    return await _deactivate_expired_subscriptions()
+    # Sweep subscriptions first so generation sees up-to-date limits;
+    # scheduled publishing runs in its own task (publish_scheduled_posts_task).
+    await _deactivate_expired_subscriptions()
+    await _complete_rewrite_batches()
+    return await _process_flows()
+
+
+@shared_task(bind=True, max_retries=3)
+def publish_scheduled_posts_task(self):
+    try:
+        loop = _get_or_create_event_loop()
+
+        if loop.is_running():
+            task = asyncio.ensure_future(_publish_scheduled_posts(), loop=loop)
+            return loop.run_until_complete(task)
+        else:
+            return loop.run_until_complete(_publish_scheduled_posts())
+
+    except Exception as e:
+        logger.error(f"publish_scheduled_posts_task failed: {e}", exc_info=True)
+        self.retry(exc=e, countdown=30)
 
 
 @shared_task(bind=True, max_retries=3)
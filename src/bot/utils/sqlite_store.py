@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import os
+import sqlite3
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import TypeVar
+
+T = TypeVar("T")
+
+STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+class SQLiteStore:
+    """
+    A SQLite file shared by every process on the host.
+
+    The bot, the Celery worker and the generator_worker.py subprocesses open
+    the same file, so whatever a service keeps here survives each of them.
+    The schema is created on first use, and WAL mode lets readers run next
+    to a writer. Queries run in a worker thread through call().
+    """
+
+    def __init__(
+        self, path: str, schema: str, logger: logging.Logger | None = None
+    ):
+        self.path = path
+        self.schema = schema
+        self.logger = logger or logging.getLogger(__name__)
+        self._initialized = False
+
+    async def call(
+        self, fn: Callable[..., T], *args, default: T, action: str
+    ) -> T:
+        """Run fn(*args) off the loop; on failure log it and return default."""
+        try:
+            return await asyncio.to_thread(fn, *args)
+        except Exception as e:
+            self.logger.warning(f"{action} failed: {e!s}")
+            return default
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Connection committed when the block succeeds."""
+        conn = self._connect()
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Connection holding the write lock from the first statement on."""
+        conn = self._connect(isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def bump_stat(conn: sqlite3.Connection, name: str) -> None:
+        conn.execute(
+            "INSERT INTO stats (name, value) VALUES (?, 1) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,),
+        )
+
+    @staticmethod
+    def hit_stats(conn: sqlite3.Connection) -> dict[str, float]:
+        counters = dict(conn.execute("SELECT name, value FROM stats").fetchall())
+        hits = counters.get("hits", 0)
+        misses = counters.get("misses", 0)
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    def _connect(self, **kwargs) -> sqlite3.Connection:
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        conn = sqlite3.connect(self.path, timeout=10, **kwargs)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self.schema)
+            self._initialized = True
+        return conn
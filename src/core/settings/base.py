@@ -100,6 +100,8 @@ STATICFILES_DIRS = [os.path.join(BASE_DIR, "static")]
 
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media/")
+# Downloads are staged on the media volume so storing them is a rename.
+MEDIA_STAGING_DIR = os.getenv("MEDIA_STAGING_DIR", os.path.join(MEDIA_ROOT, "tmp"))
 
 LANGUAGE_CODE = "uk"
 TIME_ZONE = "Europe/Kiev"
@@ -118,11 +120,21 @@ CELERY_TASK_ACKS_LATE = True
 CELERY_WORKER_PREFETCH_MULTIPLIER = 1
 CELERY_WORKER_CONCURRENCY = 10
 
+CELERY_TASK_ROUTES = {
+    # Publishing gets its own queue and worker so it never waits behind
+    # a long generation run.
+    "bot.tasks.publish_scheduled_posts_task": {"queue": "publishing"},
+}
+
 CELERY_BEAT_SCHEDULE = {
     "check-scheduled-posts": {
         "task": "bot.tasks.run_scheduled_jobs",
         "schedule": 60.0,
     },
+    "publish-scheduled-posts": {
+        "task": "bot.tasks.publish_scheduled_posts_task",
+        "schedule": 60.0,
+    },
     "deactivate-expired-subscriptions": {
         "task": "bot.tasks.deactivate_expired_subscriptions_task",
         "schedule": 3600.0,
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+
+import pytest
+from django.utils import timezone
+
+from admin_panel.models import Channel, Flow, Post, RewriteBatch, User
+from bot.services.post.admission import PostAdmission
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.django_db(transaction=True)]
+
+NOW = timezone.now()
+
+
+def make_flow(telegram_id: int) -> Flow:
+    user = User.objects.create(telegram_id=telegram_id, username=f"user{telegram_id}")
+    channel = Channel.objects.create(
+        user=user, channel_id=str(telegram_id), name="Channel"
+    )
+    return Flow.objects.create(
+        channel=channel,
+        name="Flow",
+        theme="news",
+        content_length=Flow.ContentLength.to_300,
+        frequency=Flow.GenerationFrequency.HOURLY,
+    )
+
+
+@pytest.fixture
+def flow():
+    return make_flow(1)
+
+
+@pytest.fixture
+def other_flow():
+    return make_flow(2)
+
+
+def item(source_id: str | None, age_hours: float = 0) -> dict:
+    return {"source_id": source_id, "original_date": NOW - timedelta(hours=age_hours)}
+
+
+async def admitted(admission: PostAdmission, items: list[dict]) -> list[str | None]:
+    return [
+        i["source_id"]
+        for i in await admission.filter_new(
+            items,
+            source_id=lambda i: i["source_id"],
+            original_date=lambda i: i["original_date"],
+        )
+    ]
+
+
+async def test_for_flow_seeds_latest_date_and_pending_batch_ids(flow):
+    await Post.objects.acreate(
+        flow=flow, content="old", source_id="t:1", original_date=NOW - timedelta(days=2)
+    )
+    await Post.objects.acreate(
+        flow=flow, content="new", source_id="t:2", original_date=NOW - timedelta(days=1)
+    )
+    await RewriteBatch.objects.acreate(
+        flow=flow, openai_batch_id="batch_1", posts=[{"source_id": "t:3"}]
+    )
+    await RewriteBatch.objects.acreate(
+        flow=flow,
+        openai_batch_id="batch_2",
+        status=RewriteBatch.COMPLETED,
+        posts=[{"source_id": "t:4"}],
+    )
+
+    admission = await PostAdmission.for_flow(flow.id)
+
+    assert admission.latest_date == NOW - timedelta(days=1)
+    assert admission.known_source_ids == {"t:3"}
+
+
+async def test_filter_new_skips_posted_stale_and_repeated_items(flow, other_flow):
+    await Post.objects.acreate(flow=flow, content="mine", source_id="t:1")
+    await Post.objects.acreate(flow=other_flow, content="theirs", source_id="t:2")
+    await RewriteBatch.objects.acreate(
+        flow=flow, openai_batch_id="batch_1", posts=[{"source_id": "t:3"}]
+    )
+    admission = await PostAdmission.for_flow(flow.id)
+    admission.latest_date = NOW - timedelta(hours=10)
+
+    result = await admitted(
+        admission,
+        [
+            item("t:1"),
+            item("t:2"),
+            item("t:3"),
+            item("t:4"),
+            item("t:4"),
+            item("t:5", age_hours=20),
+            item(None),
+            item("t:6"),
+        ],
+    )
+
+    assert result == ["t:4", "t:6"]
+
+
+async def test_filter_new_remembers_admitted_items(flow):
+    admission = await PostAdmission.for_flow(flow.id)
+
+    assert await admitted(admission, [item("t:1"), item("t:2")]) == ["t:1", "t:2"]
+    assert await admitted(admission, [item("t:2"), item("t:3")]) == ["t:3"]
+
+
+async def test_naive_dates_are_compared_as_local_time():
+    admission = PostAdmission(latest_date=datetime(2025, 1, 2))
+
+    assert admission.is_stale(timezone.make_aware(datetime(2025, 1, 1)))
+    assert not admission.is_stale(datetime(2025, 1, 3))
+    assert not admission.is_stale(None)
+
+
+async def test_shared_admission_keeps_what_any_flow_can_use(flow, other_flow):
+    await Post.objects.acreate(
+        flow=flow, content="a", source_id="t:1", original_date=NOW - timedelta(days=2)
+    )
+    await Post.objects.acreate(
+        flow=other_flow, content="b", source_id="t:2", original_date=NOW - timedelta(days=1)
+    )
+    await RewriteBatch.objects.acreate(
+        flow=other_flow, openai_batch_id="batch_1", posts=[{"source_id": "t:3"}]
+    )
+
+    admission = await PostAdmission.for_flows([flow.id, other_flow.id])
+
+    assert admission.latest_date == NOW - timedelta(days=2)
+    assert admission.known_source_ids == {"t:3"}
+
+
+async def test_shared_admission_has_no_date_limit_for_a_new_flow(flow, other_flow):
+    await Post.objects.acreate(
+        flow=flow, content="a", source_id="t:1", original_date=NOW - timedelta(days=2)
+    )
+
+    admission = await PostAdmission.for_flows([flow.id, other_flow.id])
+
+    assert admission.latest_date is None
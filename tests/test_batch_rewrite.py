@@ -0,0 +1,219 @@
+import json
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from django.utils import timezone
+
+from admin_panel.models import (
+    Channel,
+    Flow,
+    RewriteBatch,
+    Subscription,
+    Tariff,
+    TariffPeriod,
+    User,
+)
+from bot.database.models import PostDTO
+from bot.database.repositories import FlowRepository
+from bot.services.content_processing.deferred_rewrites import DeferredRewrites
+from bot.services.post.batch_rewrite import BatchRewriteService
+from bot.services.post.generation import PostGenerationService
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def flow():
+    tariff = Tariff.objects.create(code="basic", name="Basic", generations_available=10)
+    period = TariffPeriod.objects.create(tariff=tariff, months=1, price=10)
+    user = User.objects.create(telegram_id=1, username="user", generated_posts_count=2)
+    Subscription.objects.create(
+        user=user, tariff_period=period, end_date=timezone.now() + timedelta(days=30)
+    )
+    channel = Channel.objects.create(user=user, channel_id="1", name="Channel")
+    return Flow.objects.create(
+        channel=channel,
+        name="Flow",
+        theme="news",
+        content_length=Flow.ContentLength.to_300,
+        frequency=Flow.GenerationFrequency.HOURLY,
+    )
+
+
+@pytest.fixture
+def openai_client():
+    client = MagicMock()
+    client.files.create = AsyncMock(return_value=SimpleNamespace(id="file_1"))
+    client.batches.create = AsyncMock(return_value=SimpleNamespace(id="batch_1"))
+    client.batches.retrieve = AsyncMock(
+        return_value=SimpleNamespace(status="completed", output_file_id="out_1")
+    )
+    client.files.content = AsyncMock(return_value=SimpleNamespace(text=""))
+    return client
+
+
+@pytest.fixture
+def processor():
+    return SimpleNamespace(
+        _enforce_length_limit=lambda text: text,
+        _call_ai_with_retry=AsyncMock(return_value="redone"),
+    )
+
+
+@pytest.fixture
+def service(openai_client, processor, monkeypatch):
+    service = BatchRewriteService(MagicMock(), client=openai_client, enabled=True)
+    monkeypatch.setattr(service, "_processor", lambda flow: processor)
+    return service
+
+
+def output_line(custom_id: str, content: str, status_code: int = 200) -> str:
+    return json.dumps(
+        {
+            "custom_id": custom_id,
+            "response": {
+                "status_code": status_code,
+                "body": {"choices": [{"message": {"content": content}}]},
+            },
+        }
+    )
+
+
+async def submitted(service: BatchRewriteService, flow: Flow) -> RewriteBatch:
+    deferred = DeferredRewrites()
+    posts = [
+        PostDTO(
+            flow_id=flow.id,
+            content=deferred.defer(text, "prompt", "gpt-4o-mini", 300),
+            source_id=text,
+        )
+        for text in ("first", "second")
+    ]
+    return await service.submit(flow, deferred, posts)
+
+
+async def test_submit_stores_requests_and_posts(service, openai_client, flow):
+    batch = await submitted(service, flow)
+
+    stored = await RewriteBatch.objects.aget(openai_batch_id="batch_1")
+    assert stored.id == batch.id
+    assert stored.status == RewriteBatch.PENDING
+    assert [request["text"] for request in stored.requests.values()] == [
+        "first",
+        "second",
+    ]
+    assert [post["source_id"] for post in stored.posts] == ["first", "second"]
+
+    _, jsonl = openai_client.files.create.await_args.kwargs["file"]
+    assert len(jsonl.splitlines()) == 2
+    assert openai_client.batches.create.await_args.kwargs["metadata"] == {
+        "flow_id": str(flow.id)
+    }
+
+
+async def test_only_one_worker_claims_a_batch(service, flow):
+    batch = await submitted(service, flow)
+
+    assert await service.claim(batch, RewriteBatch.COMPLETED)
+    assert not await service.claim(batch, RewriteBatch.COMPLETED)
+    assert await service.pending_batches() == []
+
+
+async def test_collect_fills_returned_rewrites_and_redoes_the_rest(
+    service, openai_client, processor, flow
+):
+    batch = await submitted(service, flow)
+    first, second = batch.requests
+    openai_client.files.content.return_value = SimpleNamespace(
+        text="\n".join(
+            [output_line(first, " Rewritten "), output_line(second, "x", 500)]
+        )
+    )
+
+    remote = await service.finished_job(batch)
+    posts = await service.collect(batch, flow, remote)
+
+    assert [post.content for post in posts] == ["Rewritten", "redone"]
+    processor._call_ai_with_retry.assert_awaited_once_with("second", "prompt")
+
+
+async def test_finished_job_is_none_while_running(service, openai_client, flow):
+    batch = await submitted(service, flow)
+    openai_client.batches.retrieve.return_value = SimpleNamespace(
+        status="in_progress", output_file_id=None
+    )
+
+    assert await service.finished_job(batch) is None
+
+
+async def test_mark_failed(service, flow):
+    batch = await submitted(service, flow)
+
+    await service.mark_failed(batch)
+
+    stored = await RewriteBatch.objects.aget(id=batch.id)
+    assert stored.status == RewriteBatch.FAILED
+    assert stored.completed_at is not None
+
+
+@pytest.fixture
+def generation(service):
+    bot = MagicMock(token="1:token")
+    generation = PostGenerationService(
+        userbot_service=MagicMock(),
+        web_service=MagicMock(),
+        flow_repository=FlowRepository(),
+        post_base_service=MagicMock(),
+        bot=bot,
+        batch_rewrite_service=service,
+    )
+    generation._create_posts_from_dtos = AsyncMock(
+        side_effect=lambda flow, posts: posts[:1]
+    )
+    return generation
+
+
+async def used(flow: Flow) -> int:
+    return (await User.objects.aget(channels__flow=flow)).generated_posts_count
+
+
+async def test_complete_rewrite_batches_creates_posts_and_releases_the_rest(
+    generation, service, flow
+):
+    batch = await submitted(service, flow)
+
+    assert await generation.complete_rewrite_batches() == 1
+
+    stored = await RewriteBatch.objects.aget(id=batch.id)
+    assert stored.status == RewriteBatch.COMPLETED
+    # Two generations were reserved for the batch; one post was not created.
+    assert await used(flow) == 1
+    assert await generation.complete_rewrite_batches() == 0
+
+
+async def test_complete_rewrite_batches_waits_for_running_jobs(
+    generation, service, openai_client, flow
+):
+    await submitted(service, flow)
+    openai_client.batches.retrieve.return_value = SimpleNamespace(
+        status="finalizing", output_file_id=None
+    )
+
+    assert await generation.complete_rewrite_batches() == 0
+    assert len(await service.pending_batches()) == 1
+    assert await used(flow) == 2
+
+
+async def test_failed_batch_releases_all_its_generations(
+    generation, service, openai_client, flow
+):
+    batch = await submitted(service, flow)
+    openai_client.files.content.side_effect = RuntimeError("boom")
+
+    assert await generation.complete_rewrite_batches() == 0
+
+    stored = await RewriteBatch.objects.aget(id=batch.id)
+    assert stored.status == RewriteBatch.FAILED
+    assert await used(flow) == 0
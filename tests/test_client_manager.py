@@ -0,0 +1,127 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from telethon.errors import FloodWaitError
+
+from bot.services.telegram_userbot.core.client_manager import TelegramClientManager
+from bot.services.telegram_userbot.types import RateLimitError
+
+
+def make_manager(*session_paths: str) -> TelegramClientManager:
+    return TelegramClientManager(
+        api_id=1,
+        api_hash="hash",
+        bot=MagicMock(),
+        session_paths=list(session_paths) or ["sessions/a.session"],
+    )
+
+
+def make_client(loop) -> MagicMock:
+    client = MagicMock()
+    client.loop = loop
+    return client
+
+
+class TornDownClient:
+    def __init__(self):
+        self.session = MagicMock()
+
+    @property
+    def loop(self):
+        raise RuntimeError("client is torn down")
+
+
+@pytest.mark.asyncio
+async def test_clients_of_an_old_loop_are_disconnected_and_closed():
+    idle_loop = asyncio.new_event_loop()
+    closed_loop = asyncio.new_event_loop()
+    closed_loop.close()
+    try:
+        manager = make_manager("a.session", "b.session", "c.session")
+        idle, closed = make_client(idle_loop), make_client(closed_loop)
+        broken = TornDownClient()
+        manager._clients = {"a.session": idle, "b.session": broken, "c.session": closed}
+        manager._clients_loop = idle_loop
+        manager._session_locks = {"a.session": asyncio.Lock()}
+
+        await manager._drop_clients_of_old_loop()
+
+        assert manager._clients == {}
+        assert manager._session_locks == {}
+        assert manager._clients_loop is asyncio.get_running_loop()
+        idle.disconnect.assert_called_once_with()
+        closed.disconnect.assert_not_called()
+        for client in (idle, broken, closed):
+            client.session.close.assert_called_once_with()
+    finally:
+        idle_loop.close()
+
+
+@pytest.mark.asyncio
+async def test_clients_of_the_current_loop_are_kept():
+    manager = make_manager()
+    client = make_client(asyncio.get_running_loop())
+    manager._clients = {"sessions/a.session": client}
+    manager._clients_loop = asyncio.get_running_loop()
+
+    await manager._drop_clients_of_old_loop()
+
+    assert manager._clients == {"sessions/a.session": client}
+    client.disconnect.assert_not_called()
+    client.session.close.assert_not_called()
+
+
+def stub_clients(manager: TelegramClientManager, monkeypatch) -> dict[str, MagicMock]:
+    clients = {path: MagicMock() for path in manager.session_paths}
+
+    async def acquire(session_path):
+        manager._clients[session_path] = clients[session_path]
+        return clients[session_path]
+
+    monkeypatch.setattr(manager, "_acquire_client", acquire)
+    return clients
+
+
+@pytest.mark.asyncio
+async def test_flood_wait_moves_requests_to_another_session(monkeypatch):
+    manager = make_manager("a.session", "b.session")
+    clients = stub_clients(manager, monkeypatch)
+
+    with pytest.raises(FloodWaitError):
+        async with manager.get_client() as client:
+            assert client is clients["a.session"]
+            raise FloodWaitError(request=None, capture=30)
+
+    stats = manager.get_session_stats()
+    assert stats["a.session"]["flood_waits"] == 1
+    assert 29 < stats["a.session"]["cooldown_remaining"] <= 30
+    assert stats["a.session"]["in_flight"] == 0
+    async with manager.get_client() as client:
+        assert client is clients["b.session"]
+
+
+@pytest.mark.asyncio
+async def test_no_session_is_used_while_all_cool_down(monkeypatch):
+    manager = make_manager("a.session", "b.session")
+    stub_clients(manager, monkeypatch)
+    for path in manager.session_paths:
+        manager._start_cooldown(path, 60)
+
+    with pytest.raises(RateLimitError):
+        async with manager.get_client():
+            pass
+    assert all(s["in_flight"] == 0 for s in manager.get_session_stats().values())
+
+
+@pytest.mark.asyncio
+async def test_get_client_can_ask_for_the_session_that_read_a_message(monkeypatch):
+    manager = make_manager("a.session", "b.session")
+    clients = stub_clients(manager, monkeypatch)
+    manager._sessions["b.session"].requests = 5
+
+    async with manager.get_client() as client:
+        assert client is clients["a.session"]
+    async with manager.get_client("b.session") as client:
+        assert client is clients["b.session"]
+        assert manager.session_of(client) == "b.session"
@@ -0,0 +1,48 @@
+from unittest.mock import MagicMock
+
+import openai
+import pytest
+
+from bot.containers import Container
+
+
+@pytest.fixture
+def container(tmp_path):
+    container = Container()
+    container.bot.override(MagicMock())
+    container.openai_client.add_kwargs(api_key="sk-test")
+    container.llm_cache_service.add_kwargs(cache_path=str(tmp_path / "llm.sqlite3"))
+    container.openai_rate_limiter.add_kwargs(
+        state_path=str(tmp_path / "rate_limit.sqlite3")
+    )
+    return container
+
+
+@pytest.mark.asyncio
+async def test_services_share_one_openai_client(container):
+    client = container.openai_client()
+    userbot = container.userbot_service()
+    web = container.content_processor_service()
+    batch = container.batch_rewrite_service()
+
+    assert isinstance(client, openai.AsyncOpenAI)
+    assert container.openai_client() is client
+    assert userbot.content_processor.openai_client is client
+    assert web.openai_client is client
+    assert batch.client is client
+
+    for service in (userbot.content_processor, web, batch):
+        assert service.llm_cache is container.llm_cache_service()
+        assert service.rate_limiter is container.openai_rate_limiter()
+    for service in (userbot.content_processor, web):
+        assert service.batcher is container.rewrite_batcher()
+
+    await Container.shutdown_resources()
+    assert client.is_closed()
+
+
+def test_no_client_without_api_key(container):
+    container.openai_client.add_kwargs(api_key=None)
+
+    assert container.openai_client() is None
+    assert container.content_processor_service().openai_client is None
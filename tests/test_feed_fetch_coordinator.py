@@ -0,0 +1,136 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from bot.services.feed_fetch_coordinator import FeedFetchCoordinator
+
+CHANNEL = {"type": "telegram", "link": "https://t.me/news", "last_message_id": 5}
+FEED = {
+    "type": "web",
+    "link": "https://example.com",
+    "rss_url": "https://example.com/rss",
+}
+
+
+class Fetcher:
+    def __init__(self, result=None, error: Exception | None = None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return self.result
+
+
+def flow(flow_id: int, *sources: dict) -> SimpleNamespace:
+    return SimpleNamespace(id=flow_id, sources=list(sources))
+
+
+def test_counts_subscribers_per_source():
+    coordinator = FeedFetchCoordinator([flow(1, CHANNEL, FEED), flow(2, CHANNEL)])
+    key = coordinator.telegram_key(CHANNEL)
+
+    assert coordinator.subscribers(key) == 2
+    assert coordinator.subscriber_flow_ids(key) == {1, 2}
+    assert coordinator.subscribers(coordinator.source_key(FEED)) == 1
+    assert coordinator.shared_sources == 1
+    # A channel read from another position is a different source.
+    moved = coordinator.telegram_key({**CHANNEL, "last_message_id": 9})
+    assert coordinator.subscribers(moved) == 1
+
+
+@pytest.mark.asyncio
+async def test_source_is_fetched_once_per_cycle():
+    coordinator = FeedFetchCoordinator()
+    fetch = Fetcher(result=["post"])
+
+    waiters = [
+        asyncio.ensure_future(coordinator.fetch_once("key", fetch)) for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    fetch.release.set()
+
+    assert await asyncio.gather(*waiters) == [["post"]] * 3
+    assert await coordinator.fetch_once("key", fetch) == ["post"]
+    assert fetch.calls == 1
+    assert (coordinator.fetches, coordinator.reused) == (1, 3)
+
+
+@pytest.mark.asyncio
+async def test_fetch_error_reaches_every_waiter():
+    coordinator = FeedFetchCoordinator()
+    fetch = Fetcher(error=ValueError("feed is down"))
+
+    waiters = [
+        asyncio.ensure_future(coordinator.fetch_once("key", fetch)) for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    fetch.release.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+
+    assert all(isinstance(r, ValueError) for r in results)
+    assert fetch.calls == 1
+
+
+@pytest.mark.asyncio
+async def test_waiter_fetches_itself_when_the_fetching_caller_is_cancelled():
+    coordinator = FeedFetchCoordinator()
+    fetch = Fetcher(result="feed")
+
+    first = asyncio.ensure_future(coordinator.fetch_once("key", fetch))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(coordinator.fetch_once("key", fetch))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    fetch.release.set()
+
+    assert await second == "feed"
+    assert first.cancelled()
+    assert fetch.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_runs_are_isolated():
+    async def run(result: str) -> tuple:
+        coordinator = FeedFetchCoordinator()
+        fetch = Fetcher(result=result)
+        fetch.release.set()
+        with coordinator.activate():
+            await asyncio.sleep(0)
+            assert FeedFetchCoordinator.current() is coordinator
+            seen = await FeedFetchCoordinator.current().fetch_once("key", fetch)
+        return seen, coordinator
+
+    (first, first_coordinator), (second, _) = await asyncio.gather(
+        run("first"), run("second")
+    )
+
+    assert (first, second) == ("first", "second")
+    assert FeedFetchCoordinator.current() is None
+    # Results of a finished cycle are not served to the next one.
+    fetch = Fetcher(result="fresh")
+    fetch.release.set()
+    with first_coordinator.activate():
+        assert await first_coordinator.fetch_once("key", fetch) == "fresh"
+
+
+def test_each_item_is_claimed_by_one_flow():
+    coordinator = FeedFetchCoordinator()
+    items = [{"source_id": f"t:{i}"} for i in range(5)]
+
+    def source_id(item):
+        return item["source_id"]
+
+    first = coordinator.claim("key", items, 2, source_id)
+    second = coordinator.claim("key", items, 10, source_id)
+
+    assert [i["source_id"] for i in first] == ["t:0", "t:1"]
+    assert [i["source_id"] for i in second] == ["t:2", "t:3", "t:4"]
+    assert coordinator.claim("key", items, 10, source_id) == []
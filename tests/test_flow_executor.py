@@ -0,0 +1,88 @@
+import asyncio
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+
+from bot.services.flow_executor import FlowExecutor
+
+
+def make_flows(*owners):
+    return [SimpleNamespace(id=i, user=owner) for i, owner in enumerate(owners)]
+
+
+def owner_of(flow):
+    return flow.user
+
+
+def test_interleaves_flows_by_owner():
+    flows = make_flows("a", "a", "a", "b", "c", "c")
+    ordered = FlowExecutor._interleave_by_owner(flows, owner_of)
+    assert [flow.id for flow in ordered] == [0, 3, 4, 1, 5, 2]
+
+
+@pytest.mark.asyncio
+async def test_one_user_does_not_take_every_slot():
+    flows = make_flows("a", "a", "a", "a", "b")
+    started = []
+
+    async def run_flow(flow):
+        started.append(flow.user)
+        await asyncio.sleep(0.01)
+
+    failures = await FlowExecutor(max_concurrency=2).run(flows, run_flow, owner_of)
+
+    assert failures == []
+    assert started[:2] == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_respects_global_and_per_user_limits():
+    flows = make_flows("a", "a", "a", "b", "b", "b", "c", "c")
+    running = Counter()
+    peak_total = 0
+    peak_user = Counter()
+
+    async def run_flow(flow):
+        nonlocal peak_total
+        running[flow.user] += 1
+        peak_total = max(peak_total, sum(running.values()))
+        peak_user[flow.user] = max(peak_user[flow.user], running[flow.user])
+        await asyncio.sleep(0.01)
+        running[flow.user] -= 1
+
+    executor = FlowExecutor(max_concurrency=3, per_user_limit=2)
+    await executor.run(flows, run_flow, owner_of)
+
+    assert peak_total == 3
+    assert max(peak_user.values()) <= 2
+
+
+@pytest.mark.asyncio
+async def test_times_out_stuck_flow_and_runs_the_rest():
+    flows = make_flows("a", "a", "b")
+    finished = []
+
+    async def run_flow(flow):
+        if flow.id == 0:
+            await asyncio.sleep(10)
+        finished.append(flow.id)
+
+    failures = await FlowExecutor(flow_timeout=0.05).run(flows, run_flow, owner_of)
+
+    assert [(flow.id, type(error)) for flow, error in failures] == [(0, TimeoutError)]
+    assert sorted(finished) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_returns_errors_of_failed_flows():
+    flows = make_flows("a", "b")
+    error = ValueError("source unavailable")
+
+    async def run_flow(flow):
+        if flow.user == "b":
+            raise error
+
+    failures = await FlowExecutor().run(flows, run_flow, owner_of)
+
+    assert failures == [(flows[1], error)]
@@ -0,0 +1,81 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from admin_panel.models import Channel, Flow, User
+from bot.database.repositories import FlowRepository
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.django_db(transaction=True)]
+
+NOW = timezone.now()
+
+
+def make_flow(telegram_id: int, next_generation_time=None) -> Flow:
+    user = User.objects.create(telegram_id=telegram_id, username=f"user{telegram_id}")
+    channel = Channel.objects.create(
+        user=user, channel_id=str(telegram_id), name="Channel"
+    )
+    return Flow.objects.create(
+        channel=channel,
+        name=f"Flow {telegram_id}",
+        theme="news",
+        content_length=Flow.ContentLength.to_300,
+        frequency=Flow.GenerationFrequency.HOURLY,
+        next_generation_time=next_generation_time,
+    )
+
+
+@pytest.fixture
+def flows():
+    return [
+        make_flow(1, NOW - timedelta(minutes=5)),
+        make_flow(2),
+        make_flow(3, NOW + timedelta(hours=1)),
+    ]
+
+
+async def test_due_flows_are_claimed_only_once(flows):
+    repository = FlowRepository()
+    lease_until = NOW + timedelta(minutes=30)
+
+    claimed = await repository.claim_due_flows(NOW, lease_until)
+
+    assert [flow.id for flow in claimed] == [flows[1].id, flows[0].id]
+    assert await repository.claim_due_flows(NOW, lease_until) == []
+    assert not await repository.acquire_generation_lease(flows[0].id, NOW, lease_until)
+
+
+async def test_concurrent_claims_never_share_a_flow(flows):
+    repository = FlowRepository()
+    lease_until = NOW + timedelta(minutes=30)
+
+    first, second = await asyncio.gather(
+        repository.claim_due_flows(NOW, lease_until),
+        repository.claim_due_flows(NOW, lease_until),
+    )
+
+    claimed = [flow.id for flow in first + second]
+    assert sorted(claimed) == sorted([flows[0].id, flows[1].id])
+
+
+async def test_expired_lease_can_be_claimed_again(flows):
+    repository = FlowRepository()
+    await repository.claim_due_flows(NOW, NOW + timedelta(minutes=30))
+
+    later = NOW + timedelta(minutes=31)
+    claimed = await repository.claim_due_flows(later, later + timedelta(minutes=30))
+
+    assert {flow.id for flow in claimed} == {flows[0].id, flows[1].id}
+
+
+async def test_released_lease_can_be_acquired(flows):
+    repository = FlowRepository()
+    lease_until = NOW + timedelta(minutes=30)
+    assert await repository.acquire_generation_lease(flows[2].id, NOW, lease_until)
+    assert not await repository.acquire_generation_lease(flows[2].id, NOW, lease_until)
+
+    await repository.release_generation_lease(flows[2].id)
+
+    assert await repository.acquire_generation_lease(flows[2].id, NOW, lease_until)
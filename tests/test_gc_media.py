@@ -0,0 +1,130 @@
+import hashlib
+import os
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from admin_panel.models import (
+    Channel,
+    Flow,
+    Post,
+    PostImage,
+    RewriteBatch,
+    TelegramMediaFile,
+    User,
+)
+from bot.services.media_service import MediaService
+
+
+@pytest.fixture
+def media_root(tmp_path, settings):
+    settings.MEDIA_ROOT = str(tmp_path / "media")
+    settings.MEDIA_STAGING_DIR = str(tmp_path / "media" / "staging")
+    return tmp_path / "media"
+
+
+@pytest.fixture
+def flow():
+    user = User.objects.create(telegram_id=1, username="user")
+    channel = Channel.objects.create(user=user, channel_id="1", name="Channel")
+    return Flow.objects.create(
+        channel=channel,
+        name="Flow",
+        theme="news",
+        content_length=Flow.ContentLength.to_300,
+        frequency=Flow.GenerationFrequency.HOURLY,
+    )
+
+
+def write(path, age_hours: float = 48, content: bytes = b"data") -> str:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+    mtime = time.time() - age_hours * 3600
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def gc_media(*args: str) -> str:
+    out = StringIO()
+    call_command("gc_media", *args, stdout=out)
+    return out.getvalue()
+
+
+def test_identical_media_is_stored_once_under_its_hash(media_root):
+    service = MediaService()
+    first = write(media_root / "staging" / "a.video", content=b"clip")
+    second = write(media_root / "staging" / "b.video", content=b"clip")
+
+    path = service._store_local_media(first, "video")
+
+    digest = hashlib.sha256(b"clip").hexdigest()
+    assert path == f"posts/videos/{digest[:2]}/{digest}.mp4"
+    assert service._store_local_media(second, "video") == path
+    assert not os.path.exists(first) and not os.path.exists(second)
+    # Reusing the file refreshes its mtime, so gc_media leaves it alone.
+    assert time.time() - os.path.getmtime(media_root / path) < 60
+
+
+def test_deletes_old_files_no_post_references(media_root, flow):
+    used = write(media_root / "posts/images/ab/used.jpg")
+    unused = write(media_root / "posts/images/cd/unused.jpg")
+    recent = write(media_root / "posts/videos/ef/recent.mp4", age_hours=1)
+    post = Post.objects.create(flow=flow, content="post", source_id="t:1")
+    PostImage.objects.create(post=post, image="posts/images/ab/used.jpg")
+    TelegramMediaFile.objects.create(
+        path="posts/images/cd/unused.jpg", media_type="image", file_id="f1"
+    )
+
+    output = gc_media()
+
+    assert os.path.exists(used)
+    assert not os.path.exists(unused)
+    assert os.path.exists(recent)
+    assert not TelegramMediaFile.objects.exists()
+    assert "Deleted 1 unreferenced files" in output
+
+
+def test_min_age_guards_recent_files(media_root):
+    recent = write(media_root / "posts/images/ab/recent.jpg", age_hours=1)
+
+    gc_media("--min-age", "2")
+    assert os.path.exists(recent)
+
+    gc_media("--min-age", "0.5")
+    assert not os.path.exists(recent)
+
+
+def test_keeps_staged_files_of_pending_batches(media_root, flow):
+    pending = write(media_root / "staging" / "pending.image")
+    finished = write(media_root / "staging" / "finished.image")
+    orphan = write(media_root / "staging" / "orphan.video")
+    RewriteBatch.objects.create(
+        flow=flow, openai_batch_id="batch_1", posts=[{"images": [{"url": pending}]}]
+    )
+    RewriteBatch.objects.create(
+        flow=flow,
+        openai_batch_id="batch_2",
+        status=RewriteBatch.COMPLETED,
+        posts=[{"videos": [{"url": finished}]}],
+    )
+
+    gc_media()
+
+    assert os.path.exists(pending)
+    assert not os.path.exists(finished)
+    assert not os.path.exists(orphan)
+
+
+def test_dry_run_only_reports(media_root):
+    unused = write(media_root / "posts/images/ab/unused.jpg")
+    TelegramMediaFile.objects.create(
+        path="posts/images/ab/unused.jpg", media_type="image", file_id="f1"
+    )
+
+    output = gc_media("--dry-run")
+
+    assert os.path.exists(unused)
+    assert TelegramMediaFile.objects.exists()
+    assert "Would delete 1 unreferenced files" in output
@@ -0,0 +1,119 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from bot.database.models.web_post import WebPost
+from bot.services.content_processing import input_budget
+from bot.services.content_processing.input_budget import (
+    TOKEN_CAPS,
+    InputBudget,
+    track_token_savings,
+)
+from bot.services.web.web_service import WebService
+
+
+@pytest.fixture(autouse=True)
+def estimated_tokens(monkeypatch):
+    # Count tokens as len // 3 without loading tiktoken encoding files.
+    monkeypatch.setattr(input_budget, "_get_encoding", lambda model: None)
+
+
+def paragraph(label: str, words: int = 60) -> str:
+    return f"{label} " + " ".join(["word"] * words) + "."
+
+
+def test_short_text_is_unchanged():
+    text = "Short news.\nSubscribe to our newsletter"
+    assert InputBudget().trim(text, "to_300") == text
+
+
+def test_drops_boilerplate_and_menu_lines():
+    text = "\n".join(
+        [
+            "Home",
+            "News | Sport",
+            paragraph("Lead"),
+            "Subscribe to our newsletter for daily updates",
+            paragraph("Body"),
+            "© 2025 Example. All rights reserved",
+        ]
+        + [paragraph(f"Tail {i}") for i in range(30)]
+    )
+
+    result = InputBudget().trim(text, "to_300")
+
+    assert result.startswith("Lead ")
+    assert "Body " in result
+    assert "Subscribe" not in result
+    assert "rights reserved" not in result
+    assert "Home" not in result.splitlines()
+
+
+def test_keeps_paragraphs_in_original_order_within_cap():
+    paragraphs = [paragraph(f"P{i}") for i in range(40)]
+    budget = InputBudget()
+
+    result = budget.trim("\n".join(paragraphs), "to_100")
+
+    kept = result.splitlines()
+    assert budget.count_tokens(result) <= TOKEN_CAPS["to_100"]
+    assert kept[0] == paragraphs[0]
+    assert kept == sorted(kept, key=paragraphs.index)
+
+
+def test_truncates_a_single_oversized_paragraph():
+    text = " ".join(["word"] * 2000)
+    result = InputBudget().trim(text, "to_100")
+    assert len(result) == TOKEN_CAPS["to_100"] * 3
+    assert text.startswith(result)
+
+
+def test_unknown_length_uses_default_cap():
+    text = " ".join(["word"] * 2000)
+    result = InputBudget().trim(text, None)
+    assert len(result) == input_budget.DEFAULT_TOKEN_CAP * 3
+
+
+def test_tracks_token_savings():
+    budget = InputBudget()
+    long_text = "\n".join(paragraph(f"P{i}") for i in range(40))
+
+    with track_token_savings() as savings:
+        budget.trim("Short news.", "to_300")
+        budget.trim(long_text, "to_100")
+
+    assert savings.texts == 2
+    assert savings.tokens_in == budget.count_tokens("Short news.") + budget.count_tokens(
+        long_text
+    )
+    assert savings.saved > 0
+
+    budget.trim(long_text, "to_100")
+    assert savings.texts == 2
+
+
+@pytest.mark.asyncio
+async def test_only_scraped_article_bodies_are_trimmed():
+    article = "\n".join(paragraph(f"P{i}") for i in range(40))
+    scraper = MagicMock()
+    scraper.scrape_page = AsyncMock(
+        return_value=WebPost(title="Title", content=article, url="https://example.com/a")
+    )
+    service = WebService(
+        *[MagicMock()] * 5,
+        web_scraper=scraper,
+        aisettings_service=MagicMock(),
+        image_extractor=MagicMock(),
+        post_builder=MagicMock(),
+    )
+    flow = SimpleNamespace(content_length="to_100")
+
+    enriched = await service._enrich_single_post(
+        {"content": "Summary", "original_link": "https://example.com/a"}, flow
+    )
+    assert len(enriched["content"]) < len(article)
+    assert enriched["content"].startswith("P0 ")
+
+    feed_only = {"content": article, "original_link": ""}
+    assert await service._enrich_single_post(feed_only, flow) == feed_only
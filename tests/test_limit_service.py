@@ -0,0 +1,104 @@
+import asyncio
+from datetime import timedelta
+
+import pytest
+from django.db.models import F, QuerySet
+from django.utils import timezone
+
+from admin_panel.models import Subscription, Tariff, TariffPeriod, User
+from bot.database.exceptions import GenerationLimitExceeded
+from bot.services.limit_service import LimitService
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.django_db(transaction=True)]
+
+
+@pytest.fixture
+def user():
+    tariff = Tariff.objects.create(code="basic", name="Basic", generations_available=5)
+    period = TariffPeriod.objects.create(tariff=tariff, months=1, price=10)
+    user = User.objects.create(telegram_id=1, username="user")
+    Subscription.objects.create(
+        user=user, tariff_period=period, end_date=timezone.now() + timedelta(days=30)
+    )
+    return user
+
+
+async def used(user: User) -> int:
+    return (await User.objects.aget(id=user.id)).generated_posts_count
+
+
+async def test_reserves_requested_amount(user):
+    assert await LimitService().reserve_generations(user, 3) == 3
+    assert await used(user) == 3
+
+
+async def test_reserves_what_is_left(user):
+    await User.objects.filter(id=user.id).aupdate(generated_posts_count=2)
+
+    assert await LimitService().reserve_generations(user, 5) == 3
+    assert await used(user) == 5
+
+
+async def test_fails_only_when_nothing_is_left(user):
+    await User.objects.filter(id=user.id).aupdate(generated_posts_count=5)
+
+    with pytest.raises(GenerationLimitExceeded):
+        await LimitService().reserve_generations(user, 1)
+    assert await used(user) == 5
+
+
+async def test_concurrent_reservations_never_exceed_quota(user):
+    service = LimitService()
+    results = await asyncio.gather(
+        *(service.reserve_generations(user, 2) for _ in range(4)),
+        return_exceptions=True,
+    )
+
+    reserved = [r for r in results if isinstance(r, int)]
+    errors = [r for r in results if isinstance(r, BaseException)]
+    assert sum(reserved) == 5
+    assert len(errors) == 1
+    assert isinstance(errors[0], GenerationLimitExceeded)
+    assert await used(user) == 5
+
+
+async def test_retries_when_counter_changes_during_reservation(user, monkeypatch):
+    aupdate = QuerySet.aupdate
+    raced = False
+
+    async def racing_aupdate(queryset, **kwargs):
+        nonlocal raced
+        if not raced:
+            # Another generation takes two slots between read and update.
+            raced = True
+            await aupdate(
+                User.objects.filter(id=user.id),
+                generated_posts_count=F("generated_posts_count") + 2,
+            )
+        return await aupdate(queryset, **kwargs)
+
+    monkeypatch.setattr(QuerySet, "aupdate", racing_aupdate)
+
+    assert await LimitService().reserve_generations(user, 5) == 3
+    assert await used(user) == 5
+
+
+async def test_release_gives_back_unused_generations(user):
+    service = LimitService()
+    reserved = await service.reserve_generations(user, 5)
+
+    await service.release_generations(user, reserved - 2)
+
+    assert await used(user) == 2
+    assert user.generated_posts_count == 2
+
+
+async def test_release_never_goes_below_zero(user):
+    service = LimitService()
+    await service.reserve_generations(user, 1)
+
+    await service.release_generations(user, 3)
+    await service.release_generations(user, 0)
+
+    assert await used(user) == 0
+    assert user.generated_posts_count == 0
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import pytest
+
+from bot.services.content_processing import llm_cache_service
+from bot.services.content_processing.llm_cache_service import LLMCacheService
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCacheService(cache_path=str(tmp_path / "llm_cache.sqlite3"), ttl=60)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(llm_cache_service, "time", SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+def test_key_ignores_whitespace_differences():
+    key = LLMCacheService.make_key("Hello   world\n", " prompt ", "gpt-4o", "short")
+    assert key == LLMCacheService.make_key("Hello world", "prompt", "gpt-4o", "short")
+
+
+@pytest.mark.parametrize(
+    "changed",
+    [
+        ("Other text", "prompt", "gpt-4o", "short"),
+        ("Hello world", "other prompt", "gpt-4o", "short"),
+        ("Hello world", "prompt", "gpt-4o-mini", "short"),
+        ("Hello world", "prompt", "gpt-4o", "long"),
+    ],
+)
+def test_key_depends_on_every_input(changed):
+    key = LLMCacheService.make_key("Hello world", "prompt", "gpt-4o", "short")
+    assert LLMCacheService.make_key(*changed) != key
+
+
+@pytest.mark.asyncio
+async def test_returns_stored_result(cache):
+    key = cache.make_key("text", "prompt", "gpt-4o", "short")
+    assert await cache.get(key) is None
+
+    await cache.set(key, "rewritten")
+    assert await cache.get(key) == "rewritten"
+
+    stats = await cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_entries_expire_after_ttl(cache, clock):
+    await cache.set("key", "rewritten")
+
+    clock[0] += 59
+    assert await cache.get("key") == "rewritten"
+
+    clock[0] += 2
+    assert await cache.get("key") is None
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used(tmp_path, clock):
+    cache = LLMCacheService(cache_path=str(tmp_path / "cache.sqlite3"), max_entries=2)
+    await cache.set("first", "1")
+    clock[0] += 1
+    await cache.set("second", "2")
+    clock[0] += 1
+    assert await cache.get("first") == "1"
+    clock[0] += 1
+    await cache.set("third", "3")
+
+    assert await cache.get("second") is None
+    assert await cache.get("first") == "1"
+    assert await cache.get("third") == "3"
+
+
+@pytest.mark.asyncio
+async def test_unreadable_cache_is_a_miss(tmp_path):
+    cache = LLMCacheService(cache_path=str(tmp_path))
+    assert await cache.get("key") is None
+    await cache.set("key", "rewritten")
@@ -0,0 +1,146 @@
+import errno
+import os
+
+import httpx
+import pytest
+
+from bot.services.media_service import MediaService
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\0" * 56
+
+
+class Server:
+    """Streams the body in 16-byte chunks and counts what was sent."""
+
+    def __init__(self, body: bytes, headers: dict | None = None):
+        self.body = body
+        self.headers = headers or {}
+        self.requests = 0
+        self.chunks_sent = 0
+
+    async def stream(self):
+        for start in range(0, len(self.body), 16):
+            self.chunks_sent += 1
+            yield self.body[start : start + 16]
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        return httpx.Response(200, headers=self.headers, content=self.stream())
+
+
+@pytest.fixture
+def staging(tmp_path, settings):
+    settings.MEDIA_STAGING_DIR = str(tmp_path / "staging")
+    return tmp_path / "staging"
+
+
+def make_service(server: Server, max_download_size: int = 1024) -> MediaService:
+    client = httpx.AsyncClient(transport=httpx.MockTransport(server))
+    return MediaService(
+        client=client, max_download_size=max_download_size, chunk_size=16
+    )
+
+
+@pytest.mark.asyncio
+async def test_downloads_stream_through_the_shared_client(staging):
+    server = Server(PNG)
+    service = make_service(server)
+    client = service.client
+
+    first = await service._download_remote_media("https://x.com/a.png", "image")
+    second = await service._download_remote_media("https://x.com/b", "image")
+
+    assert service.client is client
+    assert server.requests == 2
+    assert (staging / os.path.basename(first)).read_bytes() == PNG
+    assert first.endswith(".png") and second.endswith(".jpg")
+    assert os.path.dirname(first) == str(staging)
+    await service.close()
+
+
+@pytest.mark.asyncio
+async def test_declared_length_over_the_limit_is_not_read(staging):
+    server = Server(PNG, headers={"content-length": "4096"})
+    service = make_service(server)
+
+    with pytest.raises(ValueError, match="too large"):
+        await service._download_remote_media("https://x.com/a.png", "image")
+
+    assert server.chunks_sent == 0
+    assert not os.listdir(staging)
+
+
+@pytest.mark.asyncio
+async def test_stream_stops_once_over_the_limit(staging):
+    server = Server(PNG + b"\0" * 1024)
+    service = make_service(server, max_download_size=32)
+
+    with pytest.raises(ValueError, match="larger than 32"):
+        await service._download_remote_media("https://x.com/a.png", "image")
+
+    assert server.chunks_sent == 3
+    assert not os.listdir(staging)
+
+
+@pytest.mark.asyncio
+async def test_html_instead_of_image_is_rejected(staging):
+    service = make_service(Server(b"<html>blocked</html>"))
+
+    with pytest.raises(ValueError, match="Expected image"):
+        await service._download_remote_media("https://x.com/a.jpg", "image")
+
+    assert not os.listdir(staging)
+
+
+def cross_device_replace(monkeypatch, fail_after_copy: bool = False):
+    """Fail the first os.replace as if the paths were on two filesystems."""
+    real_replace = os.replace
+    calls = []
+
+    def replace(source, target):
+        calls.append((str(source), str(target)))
+        if len(calls) == 1:
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        if fail_after_copy:
+            raise OSError(errno.ENOSPC, "No space left on device")
+        real_replace(source, target)
+
+    monkeypatch.setattr(os, "replace", replace)
+    return calls
+
+
+def test_move_across_filesystems_renames_a_copy_into_place(tmp_path, monkeypatch):
+    source, target = tmp_path / "a.image", tmp_path / "stored" / "a.jpg"
+    source.write_bytes(PNG)
+    target.parent.mkdir()
+    calls = cross_device_replace(monkeypatch)
+
+    MediaService._move_file(str(source), str(target))
+
+    partial, renamed = calls[1]
+    assert partial.endswith(".part")
+    assert os.path.dirname(partial) == str(target.parent)
+    assert renamed == str(target)
+    assert target.read_bytes() == PNG
+    assert not source.exists()
+    assert os.listdir(target.parent) == ["a.jpg"]
+
+
+def test_failed_copy_leaves_no_partial_file(tmp_path, monkeypatch):
+    source, target = tmp_path / "a.image", tmp_path / "stored" / "a.jpg"
+    source.write_bytes(PNG)
+    target.parent.mkdir()
+    cross_device_replace(monkeypatch, fail_after_copy=True)
+
+    with pytest.raises(OSError, match="No space"):
+        MediaService._move_file(str(source), str(target))
+
+    assert source.read_bytes() == PNG
+    assert not os.listdir(target.parent)
+
+
+def test_other_move_errors_are_raised(tmp_path):
+    target = tmp_path / "stored" / "a.jpg"
+
+    with pytest.raises(FileNotFoundError):
+        MediaService._move_file(str(tmp_path / "missing.image"), str(target))
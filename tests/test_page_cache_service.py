@@ -0,0 +1,117 @@
+from types import SimpleNamespace
+
+import pytest
+
+from bot.services.web import page_cache_service
+from bot.services.web.page_cache_service import PageCacheService
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(
+        page_cache_service, "time", SimpleNamespace(time=lambda: now[0])
+    )
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return PageCacheService(
+        cache_path=str(tmp_path / "page_cache.sqlite3"),
+        ttl=60,
+        max_bytes=10,
+        bypass_ttl=120,
+    )
+
+
+@pytest.mark.parametrize(
+    ("url", "normalized"),
+    [
+        ("HTTPS://Example.COM:443/news?b=2&a=1", "https://example.com/news?a=1&b=2"),
+        ("http://example.com:80", "http://example.com/"),
+        ("http://example.com:8080/a", "http://example.com:8080/a"),
+        (
+            "https://example.com/a?utm_source=tg&id=5&fbclid=x#comments",
+            "https://example.com/a?id=5",
+        ),
+    ],
+)
+def test_normalize_url(url, normalized):
+    assert PageCacheService.normalize_url(url) == normalized
+
+
+@pytest.mark.asyncio
+async def test_same_page_under_another_url_form_is_a_hit(cache):
+    await cache.set("https://example.com/a?utm_source=tg", "<p>1</p>")
+
+    assert await cache.get("https://EXAMPLE.com/a") == "<p>1</p>"
+    assert await cache.get("https://example.com/b") is None
+
+    stats = await cache.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_pages_expire_after_ttl(cache, clock):
+    await cache.set("https://example.com/a", "<p>1</p>")
+
+    clock[0] += 59
+    assert await cache.get("https://example.com/a") == "<p>1</p>"
+
+    clock[0] += 2
+    assert await cache.get("https://example.com/a") is None
+
+
+@pytest.mark.asyncio
+async def test_evicts_least_recently_used_beyond_max_bytes(cache, clock):
+    await cache.set("https://example.com/a", "aaaa")
+    clock[0] += 1
+    await cache.set("https://example.com/b", "bbbb")
+    clock[0] += 1
+    assert await cache.get("https://example.com/a") == "aaaa"
+    clock[0] += 1
+    await cache.set("https://example.com/c", "cccc")
+
+    assert await cache.get("https://example.com/b") is None
+    assert await cache.get("https://example.com/a") == "aaaa"
+    assert await cache.get("https://example.com/c") == "cccc"
+    assert (await cache.get_stats())["size_bytes"] == 8
+
+
+@pytest.mark.asyncio
+async def test_identical_bodies_are_stored_once(cache):
+    await cache.set("https://example.com/a", "same")
+    await cache.set("https://example.com/b", "same")
+
+    stats = await cache.get_stats()
+    assert stats["entries"] == 2
+    with cache.store.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM bodies").fetchone()[0] == 1
+
+
+@pytest.mark.asyncio
+async def test_remembers_domains_that_need_bypass(cache, clock):
+    assert not await cache.needs_bypass("example.com")
+
+    await cache.mark_needs_bypass("Example.com")
+    assert await cache.needs_bypass("EXAMPLE.COM")
+
+    await cache.mark_needs_bypass("example.com", needs_bypass=False)
+    assert not await cache.needs_bypass("example.com")
+
+    await cache.mark_needs_bypass("example.com")
+    clock[0] += 121
+    assert not await cache.needs_bypass("example.com")
+
+
+@pytest.mark.asyncio
+async def test_unusable_cache_file_is_a_miss(tmp_path):
+    cache = PageCacheService(cache_path=str(tmp_path))
+
+    assert await cache.get("https://example.com/a") is None
+    await cache.set("https://example.com/a", "<p>1</p>")
+    assert not await cache.needs_bypass("example.com")
+    assert await cache.get_stats() is None
@@ -0,0 +1,76 @@
+from datetime import timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.utils import timezone
+
+from admin_panel.models import Channel, Flow, Post, PostImage, PostVideo, User
+from bot.database.models import MediaType
+from bot.database.models.post import PostStatus
+from bot.database.repositories import PostRepository
+from bot.services.post.base import PostBaseService
+
+NOW = timezone.now()
+
+
+@pytest.fixture
+def flow():
+    user = User.objects.create(telegram_id=1, username="user")
+    channel = Channel.objects.create(user=user, channel_id="1", name="Channel")
+    return Flow.objects.create(
+        channel=channel,
+        name="Flow",
+        theme="news",
+        content_length=Flow.ContentLength.to_300,
+        frequency=Flow.GenerationFrequency.HOURLY,
+    )
+
+
+@pytest.fixture
+def posts(flow):
+    posts = [
+        Post.objects.create(
+            flow=flow,
+            content=f"post {i}",
+            source_id=f"t:{i}",
+            status=PostStatus.DRAFT,
+            original_date=NOW - timedelta(hours=i),
+        )
+        for i in range(4)
+    ]
+    PostImage.objects.create(post=posts[0], image="posts/images/b.jpg", order=1)
+    PostImage.objects.create(post=posts[0], image="posts/images/a.jpg", order=0)
+    PostVideo.objects.create(post=posts[1], video="posts/videos/a.mp4", order=0)
+    return posts
+
+
+def get_all_posts_in_flow(flow_id: int, limit: int):
+    service = PostBaseService(PostRepository(), media_service=MagicMock())
+    return async_to_sync(service.get_all_posts_in_flow)(
+        flow_id, PostStatus.DRAFT, limit=limit
+    )
+
+
+def test_page_is_loaded_newest_first_in_three_queries(
+    flow, posts, django_assert_num_queries
+):
+    with django_assert_num_queries(3):
+        page = get_all_posts_in_flow(flow.id, limit=3)
+
+    assert [post.id for post in page] == [post.id for post in posts[:3]]
+    assert [image.url for image in page[0].images] == [
+        "posts/images/a.jpg",
+        "posts/images/b.jpg",
+    ]
+    assert page[0].media_type == MediaType.IMAGE
+    assert page[1].media_type == MediaType.VIDEO
+    assert page[2].media_type is None
+
+
+def test_limit_is_applied_in_the_query(flow, posts, django_assert_num_queries):
+    with django_assert_num_queries(3) as captured:
+        page = get_all_posts_in_flow(flow.id, limit=1)
+
+    assert [post.id for post in page] == [posts[0].id]
+    assert "LIMIT 1" in captured.captured_queries[0]["sql"]
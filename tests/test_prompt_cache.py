@@ -0,0 +1,86 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from bot.services.content_processing.processors import ChatGPTContentProcessor
+from bot.services.content_processing.prompt_cache import FlowPromptCache
+
+pytestmark = pytest.mark.asyncio
+
+
+def make_flow(flow_id: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=flow_id,
+        theme="news",
+        content_length="to_300",
+        use_emojis=False,
+        use_premium_emojis=False,
+        title_highlight=False,
+        cta=None,
+    )
+
+
+@pytest.fixture
+def aisettings_service():
+    async def get_aisettings_by_flow(flow):
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(use_custom_prompt=True, prompt=f"prompt {flow.id}")
+
+    service = MagicMock()
+    service.get_aisettings_by_flow = AsyncMock(side_effect=get_aisettings_by_flow)
+    return service
+
+
+def processor(flow, aisettings_service) -> ChatGPTContentProcessor:
+    return ChatGPTContentProcessor(
+        client=MagicMock(), flow=flow, aisettings_service=aisettings_service
+    )
+
+
+async def get_prompts(flow, aisettings_service, count: int = 5) -> list[str]:
+    return list(
+        await asyncio.gather(
+            *[
+                processor(flow, aisettings_service)._get_prompt(f"text {i}", flow)
+                for i in range(count)
+            ]
+        )
+    )
+
+
+async def test_one_lookup_per_flow_while_active(aisettings_service):
+    first, second = make_flow(1), make_flow(2)
+
+    with FlowPromptCache().activate():
+        prompts = await get_prompts(first, aisettings_service)
+        prompts += await get_prompts(second, aisettings_service)
+        prompts += await get_prompts(first, aisettings_service)
+
+    assert prompts == ["prompt 1"] * 5 + ["prompt 2"] * 5 + ["prompt 1"] * 5
+    assert aisettings_service.get_aisettings_by_flow.await_count == 2
+
+
+async def test_no_caching_outside_a_run(aisettings_service):
+    flow = make_flow(1)
+    with FlowPromptCache().activate():
+        await get_prompts(flow, aisettings_service)
+
+    assert FlowPromptCache.current() is None
+    await get_prompts(flow, aisettings_service, count=3)
+
+    assert aisettings_service.get_aisettings_by_flow.await_count == 4
+
+
+async def test_failed_load_is_not_cached():
+    cache = FlowPromptCache()
+    load = AsyncMock(side_effect=[RuntimeError("db down"), "prompt"])
+
+    with cache.activate():
+        with pytest.raises(RuntimeError):
+            await cache.get_or_load(1, load)
+        assert await cache.get_or_load(1, load) == "prompt"
+        assert await cache.get_or_load(1, load) == "prompt"
+
+    assert load.await_count == 2
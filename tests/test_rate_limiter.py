@@ -0,0 +1,86 @@
+import pytest
+
+from bot.services.content_processing.rate_limiter import OpenAIRateLimiter
+
+
+@pytest.fixture
+def limiter(tmp_path):
+    return OpenAIRateLimiter(
+        state_path=str(tmp_path / "rate_limit.sqlite3"),
+        requests_per_minute=2,
+        tokens_per_minute=1_000,
+    )
+
+
+@pytest.mark.parametrize(
+    ("value", "seconds"),
+    [("20ms", 0.02), ("1s", 1.0), ("1.5s", 1.5), ("6m0s", 360.0), ("1h2m", 3720.0)],
+)
+def test_parse_duration(value, seconds):
+    assert OpenAIRateLimiter._parse_duration(value) == pytest.approx(seconds)
+
+
+def test_parse_headers():
+    limits = OpenAIRateLimiter._parse_headers(
+        {
+            "x-ratelimit-limit-requests": "5000",
+            "x-ratelimit-remaining-requests": "4999",
+            "x-ratelimit-limit-tokens": "not-a-number",
+            "x-ratelimit-remaining-tokens": "159000",
+            "x-ratelimit-reset-tokens": "6m0s",
+        }
+    )
+    assert limits == {
+        "limit_requests": 5000.0,
+        "remaining_requests": 4999.0,
+        "remaining_tokens": 159000.0,
+        "reset_tokens": 360.0,
+    }
+
+
+def test_retry_after_prefers_milliseconds():
+    headers = {"retry-after-ms": "1500", "retry-after": "7"}
+    assert OpenAIRateLimiter._retry_after(headers) == 1.5
+    assert OpenAIRateLimiter._retry_after({"retry-after": "7"}) == 7.0
+    assert OpenAIRateLimiter._retry_after({"retry-after": "soon"}) is None
+
+
+def test_paces_requests_once_bucket_is_empty(limiter):
+    assert limiter._try_acquire(10) == 0
+    assert limiter._try_acquire(10) == 0
+    # Two requests per minute refill one every 30 seconds.
+    assert 29 < limiter._try_acquire(10) <= 30
+
+
+def test_paces_tokens(limiter):
+    assert limiter._try_acquire(1_000) == 0
+    # 1000 tokens per minute: 500 more are available after 30 seconds.
+    assert 29 < limiter._try_acquire(500) <= 30
+
+
+def test_large_request_waits_for_full_bucket_only(limiter):
+    assert limiter._try_acquire(5_000) == 0
+
+
+@pytest.mark.asyncio
+async def test_headers_cap_remaining_budget(limiter):
+    await limiter.update_from_headers(
+        {"x-ratelimit-limit-requests": "60", "x-ratelimit-remaining-requests": "0"}
+    )
+    # The new limit refills one request per second.
+    assert 0 < limiter._try_acquire(10) <= 1
+
+
+@pytest.mark.asyncio
+async def test_back_off_pauses_all_callers(limiter):
+    pause = await limiter.back_off({"retry-after": "5"})
+    assert pause == 5.0
+
+    other = OpenAIRateLimiter(state_path=limiter.state_path)
+    assert 4 < other._try_acquire(10) <= 5
+
+
+@pytest.mark.asyncio
+async def test_back_off_is_bounded(limiter):
+    assert await limiter.back_off(None) == 1.0
+    assert await limiter.back_off({"x-ratelimit-reset-requests": "5m"}) == 60.0
@@ -0,0 +1,103 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from bot.services.content_processing.processors import ChatGPTContentProcessor
+from bot.services.content_processing.rewrite_batcher import RewriteBatcher
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def processor():
+    processor = ChatGPTContentProcessor(
+        client=MagicMock(),
+        flow=SimpleNamespace(id=1, name="Flow", content_length="to_1000"),
+        aisettings_service=MagicMock(),
+    )
+    processor._create_completion = AsyncMock()
+    processor._call_ai_with_retry = AsyncMock(
+        side_effect=lambda text, _: f"single {text}"
+    )
+    return processor
+
+
+async def rewrite(batcher: RewriteBatcher, processor, texts: list[str]) -> list[str]:
+    return list(
+        await asyncio.gather(
+            *(batcher.submit(processor, text, "prompt") for text in texts)
+        )
+    )
+
+
+def sent_posts(processor) -> list[dict]:
+    messages = processor._create_completion.await_args.args[0]
+    return json.loads(messages[1]["content"])["posts"]
+
+
+async def test_packs_concurrent_rewrites_into_one_json_request(processor):
+    processor._create_completion.return_value = json.dumps(
+        {
+            "posts": [
+                {"id": 2, "text": "C"},
+                {"id": 0, "text": "A"},
+                {"id": 1, "text": "B"},
+            ]
+        }
+    )
+
+    results = await rewrite(
+        RewriteBatcher(max_batch_size=3), processor, ["a", "b", "c"]
+    )
+
+    assert results == ["A", "B", "C"]
+    processor._create_completion.assert_awaited_once()
+    assert sent_posts(processor) == [
+        {"id": 0, "text": "a"},
+        {"id": 1, "text": "b"},
+        {"id": 2, "text": "c"},
+    ]
+    assert processor._create_completion.await_args.kwargs["response_format"] == {
+        "type": "json_object"
+    }
+    processor._call_ai_with_retry.assert_not_awaited()
+
+
+async def test_posts_missing_from_a_malformed_array_are_sent_one_by_one(processor):
+    processor._create_completion.return_value = json.dumps(
+        {"posts": [{"id": 0, "text": "A"}, {"id": 7, "text": "X"}, "junk", {"id": 1}]}
+    )
+
+    results = await rewrite(
+        RewriteBatcher(max_batch_size=3), processor, ["a", "b", "c"]
+    )
+
+    assert results == ["A", "single b", "single c"]
+    assert processor._call_ai_with_retry.await_count == 2
+
+
+@pytest.mark.parametrize("response", ["not json", json.dumps({"posts": "A"})])
+async def test_unparseable_response_falls_back_to_single_requests(processor, response):
+    processor._create_completion.return_value = response
+
+    results = await rewrite(RewriteBatcher(max_batch_size=2), processor, ["a", "b"])
+
+    assert results == ["single a", "single b"]
+
+
+async def test_failed_batch_request_falls_back_to_single_requests(processor):
+    processor._create_completion.side_effect = RuntimeError("boom")
+
+    results = await rewrite(RewriteBatcher(max_batch_size=2), processor, ["a", "b"])
+
+    assert results == ["single a", "single b"]
+
+
+async def test_lone_post_is_sent_alone_after_max_wait(processor):
+    batcher = RewriteBatcher(max_batch_size=5, max_wait=0.01)
+
+    assert await rewrite(batcher, processor, ["a"]) == ["single a"]
+    processor._create_completion.assert_not_awaited()
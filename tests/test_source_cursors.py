@@ -0,0 +1,89 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from admin_panel.models import Channel, Flow, User
+from bot.database.repositories import FlowRepository
+from bot.services.post.source_cursors import SourceCursors
+
+TELEGRAM = "https://t.me/source"
+FEED = "https://example.com/feed.xml"
+
+
+def tracked(current_id: int = 10, reached_id: int | None = 20) -> SourceCursors:
+    cursors = SourceCursors()
+    cursors.track_telegram(
+        TELEGRAM, current_id, reached_id, {"t:12": 12, "t:15": 14, "t:19": 19}
+    )
+    return cursors
+
+
+def test_cursor_passes_everything_once_all_posts_exist():
+    pending = tracked().pending({"t:12", "t:15", "t:19"})
+    assert pending == {TELEGRAM: {"last_message_id": 20}}
+
+
+def test_cursor_stops_below_a_post_that_failed_creation():
+    # The album t:15 starts at message 14, so the cursor stays below it.
+    pending = tracked().pending({"t:12", "t:19"})
+    assert pending == {TELEGRAM: {"last_message_id": 13}}
+
+
+def test_failed_oldest_post_does_not_move_the_cursor():
+    assert tracked(current_id=11).pending({"t:15", "t:19"}) == {}
+
+
+def test_fetch_without_new_messages_is_not_tracked():
+    assert tracked(reached_id=None).pending(set()) == {}
+
+
+def test_feed_validators_are_kept_only_when_every_entry_became_a_post():
+    cursors = SourceCursors()
+    cursors.track_feed(FEED, {"etag": '"v2"', "last_modified": None}, ["w:1", "w:2"])
+
+    assert cursors.pending({"w:1"}) == {}
+    assert cursors.pending({"w:1", "w:2"}) == {FEED: {"etag": '"v2"'}}
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_save_merges_cursor_into_flow_sources():
+    user = await User.objects.acreate(telegram_id=1, username="user")
+    channel = await Channel.objects.acreate(user=user, channel_id="1", name="Channel")
+    flow = await Flow.objects.acreate(
+        channel=channel,
+        name="Flow",
+        theme="news",
+        sources=[
+            {"type": "telegram", "link": TELEGRAM, "last_message_id": 10},
+            {"type": "web", "link": FEED},
+        ],
+        content_length=Flow.ContentLength.to_300,
+        frequency=Flow.GenerationFrequency.HOURLY,
+    )
+
+    await tracked().save(FlowRepository(), flow.id, {"t:12"})
+
+    await flow.arefresh_from_db()
+    assert flow.sources == [
+        {"type": "telegram", "link": TELEGRAM, "last_message_id": 13},
+        {"type": "web", "link": FEED},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_failed_save_is_logged_and_the_rest_still_saved():
+    logger = MagicMock()
+    cursors = SourceCursors(logger=logger)
+    cursors.track_telegram(TELEGRAM, 10, 20, {})
+    cursors.track_feed(FEED, {"etag": '"v2"'}, [])
+    repository = MagicMock()
+    repository.update_source_fields = AsyncMock(
+        side_effect=[RuntimeError("locked"), None]
+    )
+
+    await cursors.save(repository, 1, set())
+
+    assert repository.update_source_fields.await_count == 2
+    repository.update_source_fields.assert_awaited_with(1, FEED, {"etag": '"v2"'})
+    logger.warning.assert_called_once()
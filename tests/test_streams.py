@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+from bot.utils.streams import bounded_map
+
+
+async def delayed(value):
+    await asyncio.sleep(value / 100)
+    return value
+
+
+@pytest.mark.asyncio
+async def test_yields_results_in_completion_order():
+    results = [result async for result in bounded_map([3, 1, 2], delayed, 3)]
+    assert results == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_accepts_async_input():
+    async def source():
+        for value in [2, 1]:
+            yield value
+
+    results = [result async for result in bounded_map(source(), delayed, 1)]
+    assert results == [2, 1]
+
+
+@pytest.mark.asyncio
+async def test_limits_calls_in_flight():
+    running = 0
+    peak = 0
+
+    async def fn(value):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return value
+
+    results = [result async for result in bounded_map(range(10), fn, 3)]
+
+    assert sorted(results) == list(range(10))
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_closing_early_stops_input_and_cancels_calls():
+    pulled, cancelled = [], []
+    source_closed = False
+
+    async def source():
+        nonlocal source_closed
+        try:
+            for value in range(100):
+                pulled.append(value)
+                yield value
+        finally:
+            source_closed = True
+
+    async def fn(value):
+        try:
+            await asyncio.sleep(0 if value == 0 else 10)
+        except asyncio.CancelledError:
+            cancelled.append(value)
+            raise
+        return value
+
+    stream = bounded_map(source(), fn, 2)
+    assert await anext(stream) == 0
+    await stream.aclose()
+
+    assert pulled == [0, 1]
+    assert cancelled == [1]
+    assert source_closed
+
+
+@pytest.mark.asyncio
+async def test_error_cancels_other_calls():
+    cancelled = []
+
+    async def fn(value):
+        if value == 0:
+            raise ValueError("failed")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(value)
+            raise
+
+    with pytest.raises(ValueError):
+        async for _ in bounded_map([0, 1, 2], fn, 3):
+            pass
+
+    assert sorted(cancelled) == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_cancelling_consumer_cancels_calls():
+    started = asyncio.Event()
+    cancelled = []
+
+    async def fn(value):
+        started.set()
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(value)
+            raise
+
+    async def consume():
+        async for _ in bounded_map([1, 2], fn, 2):
+            pass
+
+    task = asyncio.create_task(consume())
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert sorted(cancelled) == [1, 2]
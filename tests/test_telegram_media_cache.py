@@ -0,0 +1,130 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import FSInputFile, InputMediaPhoto
+
+from admin_panel.models import TelegramMediaFile
+from bot.services.telegram_media_cache import TelegramMediaCache
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.django_db(transaction=True)]
+
+
+class FakeBot:
+    """Answers each item with a new file_id; rejects the file_ids in stale."""
+
+    def __init__(self, stale: set[str] = frozenset()):
+        self.stale = set(stale)
+        self.sent: list[list] = []
+        self.uploads = 0
+        self.get_file = AsyncMock(side_effect=self._get_file)
+
+    async def send_media_group(self, chat_id, media):
+        sent = [item.media for item in media]
+        self.sent.append(sent)
+        if self.stale & set(sent):
+            raise bad_request("MEDIA_EMPTY")
+        messages = []
+        for media_item in sent:
+            file_id = media_item
+            if isinstance(media_item, FSInputFile):
+                self.uploads += 1
+                file_id = f"id{self.uploads}"
+            messages.append(message(file_id))
+        return messages
+
+    async def _get_file(self, file_id):
+        if file_id in self.stale:
+            raise bad_request("wrong file identifier/HTTP URL specified")
+        return SimpleNamespace(file_id=file_id)
+
+
+def bad_request(text: str) -> TelegramBadRequest:
+    return TelegramBadRequest(method=MagicMock(), message=f"Bad Request: {text}")
+
+
+def message(file_id: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        message_id=1,
+        photo=[SimpleNamespace(file_id=file_id)],
+        video=None,
+        animation=None,
+        document=None,
+    )
+
+
+@pytest.fixture
+def media_root(tmp_path, settings):
+    settings.MEDIA_ROOT = str(tmp_path)
+    return tmp_path
+
+
+def photos(media_root, *names: str) -> list[InputMediaPhoto]:
+    return [InputMediaPhoto(media=FSInputFile(media_root / name)) for name in names]
+
+
+async def stored() -> dict[str, str]:
+    return {
+        path: file_id
+        async for path, file_id in TelegramMediaFile.objects.values_list(
+            "path", "file_id"
+        )
+    }
+
+
+async def test_uploads_once_and_then_sends_file_ids(media_root):
+    cache, bot = TelegramMediaCache(), FakeBot()
+
+    await cache.send_media_group(bot, 1, photos(media_root, "a.jpg", "b.jpg"))
+    await cache.send_media_group(bot, 1, photos(media_root, "a.jpg", "b.jpg"))
+
+    assert await stored() == {"a.jpg": "id1", "b.jpg": "id2"}
+    assert bot.sent[1] == ["id1", "id2"]
+    assert bot.uploads == 2
+
+
+async def test_only_the_stale_file_id_is_dropped_and_uploaded_again(media_root):
+    await TelegramMediaFile.objects.abulk_create(
+        [
+            TelegramMediaFile(path="a.jpg", media_type="image", file_id="old_a"),
+            TelegramMediaFile(path="b.jpg", media_type="image", file_id="old_b"),
+        ]
+    )
+    bot = FakeBot(stale={"old_a"})
+
+    messages = await TelegramMediaCache().send_media_group(
+        bot, 1, photos(media_root, "a.jpg", "b.jpg")
+    )
+
+    assert len(messages) == 2
+    assert isinstance(bot.sent[1][0], FSInputFile)
+    assert bot.sent[1][1] == "old_b"
+    assert bot.uploads == 1
+    assert await stored() == {"a.jpg": "id1", "b.jpg": "old_b"}
+
+
+async def test_group_is_uploaded_when_no_stale_file_id_is_found(media_root):
+    await TelegramMediaFile.objects.acreate(
+        path="a.jpg", media_type="image", file_id="big_video"
+    )
+    bot = FakeBot()
+    bot.send_media_group = AsyncMock(
+        side_effect=[bad_request("MEDIA_EMPTY"), [message("id1")]]
+    )
+    bot.get_file.side_effect = bad_request("file is too big")
+
+    await TelegramMediaCache().send_media_group(bot, 1, photos(media_root, "a.jpg"))
+
+    retry = bot.send_media_group.await_args_list[1].kwargs["media"]
+    assert isinstance(retry[0].media, FSInputFile)
+    assert await stored() == {"a.jpg": "id1"}
+
+
+async def test_upload_errors_are_raised(media_root):
+    bot = FakeBot()
+    bot.send_media_group = AsyncMock(side_effect=bad_request("MEDIA_EMPTY"))
+
+    with pytest.raises(TelegramBadRequest):
+        await TelegramMediaCache().send_media_group(bot, 1, photos(media_root, "a.jpg"))
+    assert bot.send_media_group.await_count == 1
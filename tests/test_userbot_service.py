@@ -0,0 +1,264 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from django.utils import timezone
+from telethon.errors import FloodWaitError
+
+from admin_panel.models import Channel, Flow, Post, User
+from bot.services.post.admission import PostAdmission
+from bot.services.telegram_userbot.core.base_userbot_service import (
+    BaseUserbotService,
+)
+from bot.services.telegram_userbot.enhanced_userbot_service import (
+    EnhancedUserbotService,
+)
+
+NOW = timezone.now()
+ENTITY = SimpleNamespace(id=100, username="source")
+
+
+def message(msg_id: int, age_hours: float = 0, grouped_id: int | None = None):
+    return SimpleNamespace(
+        id=msg_id,
+        chat_id=100,
+        date=NOW - timedelta(hours=age_hours),
+        grouped_id=grouped_id,
+        text=f"text {msg_id}",
+        media=None,
+        entities=None,
+        reply_markup=None,
+    )
+
+
+class FakeClient:
+    def __init__(self, messages):
+        # Telethon returns the newest messages first.
+        self.messages = sorted(messages, key=lambda m: m.id, reverse=True)
+        self.requests = []
+
+    async def get_messages(self, entity, limit=None, min_id=0, max_id=None):
+        self.requests.append({"limit": limit, "min_id": min_id, "max_id": max_id})
+        found = [
+            m
+            for m in self.messages
+            if m.id > min_id and (max_id is None or m.id < max_id)
+        ]
+        return found[:limit]
+
+
+@pytest.fixture
+def service():
+    return BaseUserbotService(
+        api_id=1, api_hash="hash", bot=MagicMock(), session_paths=["a.session"]
+    )
+
+
+@pytest.fixture
+def processed(service, monkeypatch):
+    ids = []
+
+    async def process(client, entity, msg, source_link, processed_albums, **kwargs):
+        ids.append(msg.id)
+        return {"message_id": msg.id}, 1
+
+    monkeypatch.setattr(service, "_process_message_or_album", process)
+    return ids
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_rejected_messages_are_skipped_before_download(service, processed):
+    client = FakeClient([message(5), message(4, age_hours=20), message(3)])
+    admission = PostAdmission(
+        latest_date=NOW - timedelta(hours=10),
+        known_source_ids={"telegram_100_3"},
+    )
+
+    await service._process_source_messages(
+        client,
+        ENTITY,
+        {"link": "https://t.me/source"},
+        10,
+        [],
+        set(),
+        10,
+        admission=admission,
+    )
+
+    assert processed == [5]
+
+
+@pytest.fixture
+def enhanced(monkeypatch):
+    service = EnhancedUserbotService(
+        api_id=1,
+        api_hash="hash",
+        aisettings_service=MagicMock(),
+        user_service=MagicMock(),
+        bot=MagicMock(),
+        session_paths=["a.session", "b.session"],
+    )
+    service.sessions_used = []
+    service.ai_calls = []
+
+    @asynccontextmanager
+    async def get_client(session_path=None):
+        service.sessions_used.append(session_path)
+        yield "client"
+
+    async def download(client, media, media_type):
+        return f"/staging/{media}.{media_type}"
+
+    async def process(post_dto, flow):
+        service.ai_calls.append(post_dto.content)
+        await asyncio.sleep(0)
+        if post_dto.content == "reject":
+            return None
+        return post_dto.copy(update={"content": post_dto.content.upper()})
+
+    monkeypatch.setattr(service.client_manager, "get_client", get_client)
+    monkeypatch.setattr(service, "_download_media_file", download)
+    monkeypatch.setattr(service.content_processor, "process_post_content", process)
+    return service
+
+
+def raw_post(msg_id: int, text: str) -> dict:
+    return {
+        "text": text,
+        "original_content": text,
+        "media": [{"type": "image", "media_obj": f"photo{msg_id}", "file_id": msg_id}],
+        "message_id": msg_id,
+        "source_id": f"telegram_100_{msg_id}",
+        "session_path": "b.session",
+    }
+
+
+def fetched(monkeypatch, service, raws):
+    async def fetch_source_posts(source, limit, admission=None):
+        return raws, max(raw["message_id"] for raw in raws)
+
+    monkeypatch.setattr(service, "fetch_source_posts", fetch_source_posts)
+
+
+@pytest.mark.asyncio
+async def test_media_is_downloaded_only_for_posts_kept_by_ai(enhanced, monkeypatch):
+    fetched(monkeypatch, enhanced, [raw_post(2, "keep"), raw_post(1, "reject")])
+
+    posts = [
+        post
+        async for post in enhanced.stream_posts(
+            MagicMock(), {"link": "https://t.me/source"}, limit=2
+        )
+    ]
+
+    assert [post.content for post in posts] == ["KEEP"]
+    assert [image.url for image in posts[0].images] == ["/staging/photo2.image"]
+    # Downloads go through the session that read the message.
+    assert enhanced.sessions_used == ["b.session"]
+
+
+@pytest.mark.asyncio
+async def test_no_more_ai_calls_in_flight_than_posts_wanted(enhanced, monkeypatch):
+    fetched(monkeypatch, enhanced, [raw_post(i, f"post {i}") for i in (3, 2, 1)])
+
+    stream = enhanced.stream_posts(
+        MagicMock(), {"link": "https://t.me/source"}, limit=1
+    )
+    first = await anext(stream)
+    await stream.aclose()
+
+    assert first.content == "POST 3"
+    assert enhanced.ai_calls == ["post 3"]
+    assert enhanced.sessions_used == ["b.session"]
+
+
+@pytest.mark.asyncio
+async def test_fetch_retries_on_another_session_after_flood_wait(service, monkeypatch):
+    used = []
+
+    @asynccontextmanager
+    async def get_client(session_path=None):
+        used.append(len(used))
+        yield f"client{len(used)}"
+
+    async def process_source_messages(client, *args, **kwargs):
+        if client == "client1":
+            raise FloodWaitError(request=None, capture=30)
+        args[3].append({"message_id": 1})
+        return 1
+
+    monkeypatch.setattr(service.client_manager, "session_paths", ["a", "b"])
+    monkeypatch.setattr(service.client_manager, "get_client", get_client)
+    monkeypatch.setattr(
+        service.client_manager, "get_entity", AsyncMock(return_value=ENTITY)
+    )
+    monkeypatch.setattr(service, "_process_source_messages", process_source_messages)
+
+    posts, newest_id = await service._fetch_source_posts({"link": "source"}, 5)
+
+    assert [post["message_id"] for post in posts] == [1]
+    assert newest_id == 1
+    assert len(used) == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_posted_messages_are_found_with_one_query(
+    service, processed, monkeypatch
+):
+    user = await User.objects.acreate(telegram_id=1, username="user")
+    channel = await Channel.objects.acreate(user=user, channel_id="1", name="Channel")
+    flow = await Flow.objects.acreate(
+        channel=channel,
+        name="Flow",
+        theme="news",
+        content_length=Flow.ContentLength.to_300,
+        frequency=Flow.GenerationFrequency.HOURLY,
+    )
+    for source_id in ("telegram_100_4", "telegram_100_album_7"):
+        await Post.objects.acreate(flow=flow, content="posted", source_id=source_id)
+    lookups = []
+    filter_posts = Post.objects.filter
+
+    def counting_filter(*args, **kwargs):
+        lookups.append(kwargs)
+        return filter_posts(*args, **kwargs)
+
+    monkeypatch.setattr(Post.objects, "filter", counting_filter)
+    client = FakeClient(
+        [message(5), message(4), message(3, grouped_id=7), message(2, grouped_id=7)]
+    )
+
+    await service._process_source_messages(
+        client, ENTITY, {"link": "https://t.me/source"}, 10, [], set(), 10
+    )
+
+    assert processed == [5]
+    assert len(lookups) == 1
+    assert len(lookups[0]["source_id__in"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_only_albums_at_the_batch_edge_are_fetched_again(service):
+    # Album 1 lies inside the batch; album 2 continues past its oldest message.
+    client = FakeClient(
+        [message(7)]
+        + [message(i, grouped_id=1) for i in (6, 5, 4)]
+        + [message(i, grouped_id=2) for i in (3, 2, 1)]
+    )
+    result = []
+
+    await service._process_source_messages(
+        client, ENTITY, {"link": "https://t.me/source"}, 2, result, set(), 10
+    )
+
+    assert [(post["message_id"], post["album_size"]) for post in result] == [
+        (7, 0),
+        (4, 3),
+        (1, 3),
+    ]
+    assert len(client.requests) == 2
@@ -0,0 +1,65 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from bot.services.web.web_scraper_service import WebScraperService
+from bot.services.web.web_service import WebService
+
+PAGE = """
+<html><head><title>Title</title></head>
+<body><article><p>Article body.</p><img src="/a.jpg"></article></body></html>
+"""
+
+
+@pytest.fixture
+def scraper():
+    image_extractor = MagicMock()
+    image_extractor.extract_images.return_value = ["https://example.com/a.jpg"]
+    scraper = WebScraperService(cf_bypass=MagicMock(), image_extractor=image_extractor)
+    scraper._download_html = AsyncMock(return_value=PAGE)
+    return scraper
+
+
+@pytest.fixture
+def web_service(scraper):
+    return WebService(
+        *[MagicMock()] * 5,
+        web_scraper=scraper,
+        aisettings_service=MagicMock(),
+        image_extractor=MagicMock(),
+        post_builder=MagicMock(),
+    )
+
+
+FLOW = SimpleNamespace(content_length="to_1000")
+
+
+@pytest.mark.asyncio
+async def test_enrichment_downloads_the_page_once(web_service, scraper):
+    post = {"content": "Summary", "original_link": "https://example.com/a"}
+
+    enriched = await web_service._enrich_single_post(post, FLOW)
+
+    scraper._download_html.assert_awaited_once_with("https://example.com/a")
+    assert enriched["content"] == "Article body."
+    assert enriched["images"] == ["https://example.com/a.jpg"]
+    # Images come from the same parse as the text.
+    soup, url = scraper.image_extractor.extract_images.call_args.args
+    assert soup.title.string == "Title"
+    assert url == "https://example.com/a"
+
+
+@pytest.mark.asyncio
+async def test_feed_images_skip_image_extraction(web_service, scraper):
+    post = {
+        "content": "Summary",
+        "original_link": "https://example.com/a",
+        "images": ["https://cdn.example.com/feed.jpg"],
+    }
+
+    enriched = await web_service._enrich_single_post(post, FLOW)
+
+    scraper._download_html.assert_awaited_once()
+    scraper.image_extractor.extract_images.assert_not_called()
+    assert enriched["images"] == ["https://cdn.example.com/feed.jpg"]